@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Compare the generated per-class decoders used by GLTF2.from_json with the generic dataclasses-json decoder.
+
+Checks that both produce the same object graph and reports the speedup on a large synthetic file.
+
+    python benchmarks/bench_decode.py [--meshes 5000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygltflib  # noqa: E402
+from synthetic import make_gltf_json  # noqa: E402
+
+
+def decode_with_dataclasses_json(s):
+    # the decoding path GLTF2.from_json used before the generated decoders
+    from dataclasses_json.core import _decode_dataclass
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        result = _decode_dataclass(pygltflib.GLTF2, json.loads(s), True)
+    for mesh in result.meshes:
+        for primitive in mesh.primitives:
+            if primitive.attributes:
+                primitive.attributes = pygltflib.Attributes(**primitive.attributes)
+    return result
+
+
+def best_of(repeat, function, *args):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GLTF2 json decoding")
+    parser.add_argument("--meshes", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    s = make_gltf_json(args.meshes)
+    print(f"synthetic gltf: {len(s) / 1e6:.1f} MB json, {args.meshes} meshes, {args.meshes * 5} accessors")
+
+    generic_time, expected = best_of(1, decode_with_dataclasses_json, s)
+    generated_time, result = best_of(args.repeat, pygltflib.GLTF2.gltf_from_json, s)
+
+    if pygltflib.gltf_asdict(result) != pygltflib.gltf_asdict(expected):
+        print("FAILED: generated decoders do not match dataclasses-json")
+        sys.exit(1)
+    print("generated decoders match dataclasses-json")
+    print(f"dataclasses-json:   {generic_time:.3f}s")
+    print(f"generated decoders: {generated_time:.3f}s ({generic_time / generated_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Check the startup time of pygltflib and the pipeline CLI against a budget.
+
+Runs each command in a fresh interpreter --repeat times and reports the fastest run minus the time of an empty
+interpreter. Exits with an error if a command is over its budget, or if importing pygltflib pulls in modules it
+should only import when they are used (dataclasses_json, marshmallow, numpy, mimetypes).
+
+    python benchmarks/bench_import.py [--repeat 20] [--budget-import 100] [--budget-cli 40]
+
+Run it once before timing so the .pyc files exist (python -m compileall pygltflib), otherwise every run includes
+compiling the package.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFERRED_MODULES = ["dataclasses_json", "marshmallow", "numpy", "mimetypes"]
+
+
+def best_time(args, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pygltflib and CLI startup")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budget-import", type=float, default=100.0, help="ms for import pygltflib")
+    parser.add_argument("--budget-cli", type=float, default=40.0, help="ms for blender_to_defold.py --help")
+    args = parser.parse_args()
+
+    check = f"import sys, pygltflib; print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    imported = subprocess.run([sys.executable, "-c", check], cwd=ROOT, check=True, capture_output=True,
+                              text=True).stdout.split()
+
+    interpreter = best_time([sys.executable, "-c", "pass"], args.repeat)
+    commands = [
+        ("import pygltflib", [sys.executable, "-c", "import pygltflib"], args.budget_import),
+        ("import pygltflib.utils", [sys.executable, "-c", "import pygltflib.utils"], args.budget_import),
+        ("blender_to_defold.py --help", [sys.executable, "blender_to_defold.py", "--help"], args.budget_cli),
+    ]
+    print(f"empty interpreter:            {interpreter * 1000:.1f} ms")
+    failed = False
+    for name, command, budget in commands:
+        elapsed = (best_time(command, args.repeat) - interpreter) * 1000
+        over = elapsed > budget
+        failed = failed or over
+        print(f"{name + ':':30}{elapsed:.1f} ms (budget {budget:.0f} ms){' OVER BUDGET' if over else ''}")
+    if imported:
+        print(f"FAILED: import pygltflib also imports {', '.join(imported)}")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
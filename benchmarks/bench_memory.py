@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Compare the memory held by a GLTF2 loaded with the regular classes and with the compact (__slots__) classes
+from pygltflib.compact.
+
+    python benchmarks/bench_memory.py [--meshes 20000]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygltflib  # noqa: E402
+from synthetic import make_gltf_json  # noqa: E402
+
+
+def measure(s, compact):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    gltf = pygltflib.GLTF2.gltf_from_json(s, compact=compact)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return gltf, retained, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GLTF2 object graph memory")
+    parser.add_argument("--meshes", type=int, default=20000)
+    args = parser.parse_args()
+
+    s = make_gltf_json(args.meshes)
+    regular, regular_retained, regular_peak, regular_time = measure(s, compact=False)
+    compact, compact_retained, compact_peak, compact_time = measure(s, compact=True)
+
+    if regular.to_json() != compact.to_json():
+        print("FAILED: compact classes do not serialize to the same json")
+        sys.exit(1)
+
+    objects = sum(len(getattr(regular, name)) for name in pygltflib.GLTF2_ARRAY_TYPES)
+    print(f"synthetic gltf: {len(s) / 1e6:.1f} MB json, {objects} top level objects")
+    print(f"regular classes: {regular_retained / 1e6:7.1f} MB retained, {regular_peak / 1e6:7.1f} MB peak, "
+          f"{regular_time:.2f}s")
+    print(f"compact classes: {compact_retained / 1e6:7.1f} MB retained, {compact_peak / 1e6:7.1f} MB peak, "
+          f"{compact_time:.2f}s")
+    print(f"compact classes retain {1 - compact_retained / regular_retained:.0%} less memory")
+
+
+if __name__ == "__main__":
+    main()
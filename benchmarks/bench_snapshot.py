@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Compare loading a large synthetic .gltf with and without a snapshot cache (see pygltflib.snapshot).
+
+Reports a plain load, the first load with the cache (decode and write the snapshot) and a load from the snapshot,
+and checks the snapshot gives the same GLTF2.
+
+    python benchmarks/bench_snapshot.py [--meshes 20000] [--lazy] [--compact]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygltflib  # noqa: E402
+from pygltflib import snapshot  # noqa: E402
+from synthetic import make_gltf_json  # noqa: E402
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GLTF2 snapshots")
+    parser.add_argument("--meshes", type=int, default=20000)
+    parser.add_argument("--lazy", action="store_true")
+    parser.add_argument("--compact", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.gltf")
+        with open(path, "w") as f:
+            f.write(make_gltf_json(args.meshes))
+        print(f"synthetic gltf: {os.path.getsize(path) / 1e6:.1f} MB json, {args.meshes} meshes")
+
+        options = {"lazy": args.lazy, "compact": args.compact}
+        snapshot.set_snapshot_cache(None)
+        plain_time, expected = timed(pygltflib.GLTF2.load, path, **options)
+        cache = snapshot.SnapshotCache(os.path.join(directory, "snapshots"))
+        snapshot.set_snapshot_cache(cache)
+        first_time, _ = timed(pygltflib.GLTF2.load, path, **options)
+        cached_time, result = timed(pygltflib.GLTF2.load, path, **options)
+        snapshot.set_snapshot_cache(None)
+
+        if result.gltf_to_json() != expected.gltf_to_json():
+            print("FAILED: the snapshot does not match the file")
+            sys.exit(1)
+        print(f"snapshot: {cache.size() / 1e6:.1f} MB")
+        print(f"load:                {plain_time:.3f}s")
+        print(f"load, new snapshot:  {first_time:.3f}s")
+        print(f"load from snapshot:  {cached_time:.3f}s ({plain_time / cached_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
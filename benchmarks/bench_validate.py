@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Time the data checks of pygltflib.validator on a large generated mesh.
+
+Writes a glb with one mesh of --vertices vertices (POSITION, NORMAL, TEXCOORD_0 and uint32 indices), loads it
+memory-mapped and reports how long validate(gltf, data=True) takes.
+
+    python benchmarks/bench_validate.py [--vertices 10000000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+import pygltflib  # noqa: E402
+from pygltflib import validator  # noqa: E402
+from pygltflib.arrays import GeometryBuilder  # noqa: E402
+
+
+def make_mesh_glb(path, vertex_count):
+    gltf = pygltflib.GLTF2()
+    gltf.buffers.append(pygltflib.Buffer(byteLength=0))
+    rng = np.random.default_rng(0)
+    positions = rng.random((vertex_count, 3), dtype=np.float32)
+    normals = np.zeros((vertex_count, 3), np.float32)
+    normals[:, 2] = 1
+    uvs = positions[:, :2].copy()
+    indices = rng.integers(0, vertex_count, vertex_count * 2, dtype=np.uint32)
+    with GeometryBuilder(gltf, buffer=0) as builder:
+        primitive = builder.add_primitive(indices=indices, POSITION=positions, NORMAL=normals, TEXCOORD_0=uvs)
+        mesh = builder.add_mesh([primitive], name="mesh")
+    gltf.nodes.append(pygltflib.Node(mesh=mesh))
+    gltf.scenes.append(pygltflib.Scene(nodes=[0]))
+    gltf.save_binary(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark validating accessor data")
+    parser.add_argument("--vertices", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "mesh.glb")
+        make_mesh_glb(path, args.vertices)
+        print(f"generated glb: {os.path.getsize(path) / 1e6:.0f} MB, {args.vertices} vertices")
+
+        gltf = pygltflib.GLTF2.load(path, use_mmap=True)
+        start = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            errors = validator.validate(gltf, warning=True, data=True)
+        elapsed = time.perf_counter() - start
+        del gltf
+
+    if errors:
+        print("FAILED: " + "; ".join(str(error) for error in errors))
+        sys.exit(1)
+    print(f"validate(data=True): {elapsed:.2f}s, no errors")
+
+
+if __name__ == "__main__":
+    main()
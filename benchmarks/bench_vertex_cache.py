@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Time the vertex cache, overdraw and vertex fetch optimizations on a grid mesh with its triangles in random order,
+and report the ACMR and ATVR (see pygltflib.geometry.cache_statistics) before and after each.
+
+    python benchmarks/bench_vertex_cache.py [--size 708] [--cache-size 16]
+
+The default size is a million triangles.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from pygltflib.geometry import (  # noqa: E402
+    cache_statistics,
+    optimize_overdraw,
+    optimize_vertex_cache,
+    optimize_vertex_fetch,
+)
+
+
+def make_shuffled_grid(size):
+    # a wavy size x size grid of quads, two triangles each, in random order
+    xs, ys = np.meshgrid(np.arange(size + 1), np.arange(size + 1))
+    positions = np.stack([xs.ravel(), ys.ravel(), np.sin(xs.ravel() / 20) * 5], axis=1)
+    corners = (np.arange(size)[:, None] * (size + 1) + np.arange(size)).ravel()
+    triangles = np.concatenate([np.stack([corners, corners + 1, corners + size + 2], axis=1),
+                                np.stack([corners, corners + size + 2, corners + size + 1], axis=1)])
+    return triangles[np.random.default_rng(0).permutation(len(triangles))].reshape(-1), positions
+
+
+def sorted_triangles(indices):
+    triangles = np.sort(indices.reshape(-1, 3), axis=1)
+    return triangles[np.lexsort(triangles.T[::-1])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vertex cache optimization")
+    parser.add_argument("--size", type=int, default=708, help="quads along each side of the grid")
+    parser.add_argument("--cache-size", type=int, default=16)
+    args = parser.parse_args()
+
+    indices, positions = make_shuffled_grid(args.size)
+    print(f"{len(indices) // 3} triangles, {len(positions)} vertices")
+    print("shuffled:      ACMR %.3f ATVR %.3f" % cache_statistics(indices, args.cache_size))
+
+    start = time.perf_counter()
+    cache_optimized = optimize_vertex_cache(indices, args.cache_size)
+    elapsed = time.perf_counter() - start
+    print("vertex cache:  ACMR %.3f ATVR %.3f" % cache_statistics(cache_optimized, args.cache_size),
+          f"({elapsed * 1000:.0f} ms)")
+
+    start = time.perf_counter()
+    overdraw_optimized = optimize_overdraw(cache_optimized, positions, args.cache_size)
+    elapsed = time.perf_counter() - start
+    print("overdraw:      ACMR %.3f ATVR %.3f" % cache_statistics(overdraw_optimized, args.cache_size),
+          f"({elapsed * 1000:.0f} ms)")
+
+    start = time.perf_counter()
+    vertices, remap = optimize_vertex_fetch(overdraw_optimized, len(positions))
+    elapsed = time.perf_counter() - start
+    print(f"vertex fetch:  ({elapsed * 1000:.0f} ms)")
+
+    expected = sorted_triangles(indices)
+    if (not np.array_equal(sorted_triangles(cache_optimized), expected) or
+            not np.array_equal(sorted_triangles(overdraw_optimized), expected) or
+            not np.array_equal(sorted_triangles(vertices[remap[overdraw_optimized]]), expected)):
+        print("FAILED: the optimized index buffers do not draw the same triangles")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Time GLTF2.weld on a grid mesh exported the way unindexed exporters write it, with every triangle having its own
+three vertices, and check the welded mesh draws the same triangles.
+
+    python benchmarks/bench_weld.py [--size 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+import pygltflib  # noqa: E402
+from pygltflib.arrays import GeometryBuilder, accessor_array  # noqa: E402
+
+
+def make_unwelded_grid(size):
+    # a size x size grid of quads as an unindexed triangle list, plus one degenerate triangle
+    xs, ys = np.meshgrid(np.arange(size + 1), np.arange(size + 1))
+    grid = np.stack([xs.ravel(), ys.ravel(), np.zeros(xs.size)], axis=1).astype(np.float32)
+    corners = (np.arange(size)[:, None] * (size + 1) + np.arange(size)).ravel()
+    triangles = np.concatenate([np.stack([corners, corners + 1, corners + size + 2], axis=1),
+                                np.stack([corners, corners + size + 2, corners + size + 1], axis=1),
+                                [[0, 1, 1]]]).reshape(-1)
+    gltf = pygltflib.GLTF2()
+    with GeometryBuilder(gltf) as builder:
+        normals = np.tile(np.array([0, 0, 1], np.float32), (len(triangles), 1))
+        primitive = builder.add_primitive(POSITION=grid[triangles], NORMAL=normals,
+                                          TEXCOORD_0=grid[triangles, :2] / size)
+        builder.add_mesh([primitive])
+    return gltf
+
+
+def drawn_triangles(gltf):
+    primitive = gltf.meshes[0].primitives[0]
+    positions = accessor_array(gltf, primitive.attributes.POSITION)
+    indices = accessor_array(gltf, primitive.indices) if primitive.indices is not None else np.arange(len(positions))
+    triangles = positions[indices].reshape(-1, 9)
+    return triangles[np.lexsort(triangles.T[::-1])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vertex welding")
+    parser.add_argument("--size", type=int, default=500, help="quads along each side of the grid")
+    args = parser.parse_args()
+
+    gltf = make_unwelded_grid(args.size)
+    before = drawn_triangles(gltf)
+    start = time.perf_counter()
+    report = gltf.weld()
+    elapsed = time.perf_counter() - start
+    after = drawn_triangles(gltf)
+
+    print(f"vertices: {len(before) * 3} -> {len(before) * 3 - report['vertices']} "
+          f"(expected {(args.size + 1) ** 2})")
+    print(f"triangles: {len(before)} -> {len(after)}, {report['triangles']} degenerate removed")
+    print(f"weld: {elapsed * 1000:.1f} ms")
+    degenerate = np.all(before[:, 0:3] == before[:, 3:6], axis=1) | np.all(before[:, 3:6] == before[:, 6:9], axis=1)
+    if not np.array_equal(before[~degenerate], after) or len(before) * 3 - report["vertices"] != (args.size + 1) ** 2:
+        print("FAILED: the welded mesh is not the same")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Synthetic glTF documents for the benchmarks.
+
+The documents are only json, buffers are declared but never read, which is enough to measure decoding and
+serialization of large object graphs.
+"""
+import json
+import math
+
+
+def make_gltf_dict(mesh_count=20000):
+    """ A scene with one node, one mesh (two primitives) and five accessors per mesh, plus materials. """
+    accessors = []
+    buffer_views = []
+    meshes = []
+    nodes = []
+    materials = []
+    for i in range(mesh_count):
+        first_view = len(buffer_views)
+        for j, (byte_length, target) in enumerate([(3600, 34963), (4800, 34962), (4800, 34962), (3200, 34962)]):
+            buffer_views.append({"buffer": 0, "byteOffset": i * 16400 + j * 4100, "byteLength": byte_length,
+                                 "target": target})
+        first_accessor = len(accessors)
+        accessors.append({"bufferView": first_view, "componentType": 5123, "count": 1800, "type": "SCALAR",
+                          "max": [399], "min": [0]})
+        accessors.append({"bufferView": first_view + 1, "componentType": 5126, "count": 400, "type": "VEC3",
+                          "max": [1, 1, 1], "min": [-1, -1, -1]})
+        accessors.append({"bufferView": first_view + 2, "componentType": 5126, "count": 400, "type": "VEC3"})
+        accessors.append({"bufferView": first_view + 3, "componentType": 5126, "count": 400, "type": "VEC2"})
+        accessors.append({"bufferView": first_view, "byteOffset": 1800, "componentType": 5123, "count": 900,
+                          "type": "SCALAR", "max": [399], "min": [0]})
+        attributes = {"POSITION": first_accessor + 1, "NORMAL": first_accessor + 2,
+                      "TEXCOORD_0": first_accessor + 3}
+        meshes.append({
+            "name": f"Mesh_{i}",
+            "primitives": [
+                {"attributes": attributes, "indices": first_accessor, "material": i % 64, "mode": 4},
+                {"attributes": dict(attributes), "indices": first_accessor + 4, "material": (i + 1) % 64},
+            ],
+        })
+        angle = i * 0.01
+        nodes.append({"name": f"Node_{i}", "mesh": i, "translation": [i, 0, -i],
+                      "rotation": [0, math.sin(angle), 0, math.cos(angle)], "scale": [1, 1, 1],
+                      "extras": {"id": i}})
+    for i in range(64):
+        materials.append({"name": f"Material_{i}", "doubleSided": i % 2 == 0,
+                          "pbrMetallicRoughness": {"baseColorFactor": [1, 0.5, 0.25, 1], "metallicFactor": 0,
+                                                   "roughnessFactor": 0.5}})
+    return {
+        "asset": {"version": "2.0", "generator": "pygltflib benchmarks"},
+        "scene": 0,
+        "scenes": [{"name": "Scene", "nodes": list(range(mesh_count))}],
+        "nodes": nodes,
+        "meshes": meshes,
+        "materials": materials,
+        "accessors": accessors,
+        "bufferViews": buffer_views,
+        "buffers": [{"uri": "synthetic.bin", "byteLength": mesh_count * 16400}],
+    }
+
+
+def make_gltf_json(mesh_count=20000):
+    return json.dumps(make_gltf_dict(mesh_count))
@@ -1,11 +1,13 @@
 import bpy
+import json
+import mathutils
 import sys
 import os
 
 print("\nDefold Pipeline: Split GLTF")
 print("-------------------------------")
 
-def split_gltf(path, outpath):
+def split_gltf(path, outpath, names=None):
     bpy.ops.object.delete()
     bpy.ops.import_scene.gltf(filepath = path)
 
@@ -14,19 +16,33 @@ def split_gltf(path, outpath):
     for x in bpy.context.scene.objects:
         if not x.type == 'MESH':
             continue
+        if names is not None and x.name not in names:
+            continue
         bpy.ops.object.select_all(action='DESELECT')
         x.select_set(True)
         file_path = os.path.join(outpath, "{}.gltf".format(x.name))
-        bpy.ops.export_scene.gltf(filepath         =  file_path,
-                                  use_selection    = True,
-                                  export_format    = 'GLB',
-                                  export_materials = 'NONE',
-                                  export_tangents  = True,
-                                  export_colors    = True)
+        # The world transform is applied by the collection instance, so the mesh is exported at the origin
+        matrix_world = x.matrix_world.copy()
+        x.matrix_world = mathutils.Matrix.Identity(4)
+        try:
+            bpy.ops.export_scene.gltf(filepath         =  file_path,
+                                      use_selection    = True,
+                                      export_format    = 'GLB',
+                                      export_materials = 'NONE',
+                                      export_tangents  = True,
+                                      export_colors    = True)
+        finally:
+            x.matrix_world = matrix_world
 
-gltf_src = sys.argv[-2]
-gltf_out = sys.argv[-1]
+# gltf_src gltf_out [names_json], where names_json lists the objects to export (default all of them)
+script_args = sys.argv[sys.argv.index("--") + 1:]
+gltf_src = script_args[0]
+gltf_out = script_args[1]
+names    = None
+if len(script_args) > 2:
+    with open(script_args[2], "r") as f:
+        names = set(json.load(f))
 
-split_gltf(gltf_src, gltf_out)
+split_gltf(gltf_src, gltf_out, names)
 
 print("-------------------------------")
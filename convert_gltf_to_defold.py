@@ -1,9 +1,12 @@
+import json
 import os
 import shutil
+import numpy
 import defold_content_helpers
 import blender_utils
 import pygltflib
 
+from pygltflib import diff, spatial
 from pygltflib.utils import ImageFormat
 
 # Generated output paths
@@ -14,12 +17,34 @@ MODEL_PATH        = "%s/models"
 GAMEOBJECT_PATH   = "%s/gameobjects"
 COLLECTION_PATH   = "%s/collections"
 
+# Fingerprints of the last build, used by incremental builds
+MANIFEST_NAME     = "build_manifest.json"
+MANIFEST_FORMAT   = 2
+
+def make_names_unique(objects):
+    # Repeated names get a .001, .002 etc suffix the way Blender renames them on import, since output files and
+    # build manifest entries are named after them
+    taken = set([x.name for x in objects if x.name != None])
+    seen  = set()
+    for x in objects:
+        if x.name == None:
+            continue
+        if x.name in seen:
+            n = 1
+            while "%s.%03d" % (x.name, n) in taken:
+                n += 1
+            x.name = "%s.%03d" % (x.name, n)
+            taken.add(x.name)
+        seen.add(x.name)
+
 class projectcontext(object):
-    def __init__(self, gltf_path, output_path, project_relative_path):
+    def __init__(self, gltf_path, output_path, project_relative_path, incremental=False, quantize=False):
         super(projectcontext, self).__init__()
         self.path_gltf     = gltf_path
         self.path_output   = output_path
         self.path_relative = project_relative_path or ""
+        self.incremental   = incremental
+        self.quantize      = quantize
         self.buildpaths()
 
     def buildpaths(self):
@@ -31,6 +56,7 @@ class projectcontext(object):
         self.MODEL_PATH      = "%s/models" % self.path_output
         self.GAMEOBJECT_PATH = "%s/gameobjects" % self.path_output
         self.COLLECTION_PATH = "%s/collections" % self.path_output
+        self.MANIFEST_PATH   = "%s/%s" % (self.path_output, MANIFEST_NAME)
 
         # Scene content paths
         self.TEXTURE_2D_BLANK_PATH   = "/defold-pbr/textures/blank_1x1.png"
@@ -43,46 +69,154 @@ class projectcontext(object):
         if tex != None:
             return self.defold_texture_lut[tex.index]
 
+    def write_file(self, path, data):
+        # Files that would not change are left untouched, so only regenerated content looks new to Defold
+        if os.path.isfile(path):
+            with open(path, "r") as f:
+                if f.read() == data:
+                    return False
+        with open(path, "w") as f:
+            f.write(data)
+        return True
+
     def write_material(self, material):
         data = material.serialize()
         path = "%s/%s.material" % (self.MATERIAL_PATH, material.name)
-        with open(path, "w") as f:
-            f.write(data)
+        self.write_file(path, data)
 
     def write_model(self, model):
         data = model.serialize()
         path = "%s/%s.model" % (self.MODEL_PATH, model.name)
-        with open(path, "w") as f:
-            f.write(data)
+        self.write_file(path, data)
 
     def write_gameobject(self, go):
         data = go.serialize()
         path = "%s/%s.go" % (self.GAMEOBJECT_PATH, go.name)
-        with open(path, "w") as f:
-            f.write(data)
+        self.write_file(path, data)
 
     def write_collection(self, col):
         data = col.serialize()
         path = "%s/%s.collection" % (self.COLLECTION_PATH, col.name)
-        with open(path, "w") as f:
-            f.write(data)
+        self.write_file(path, data)
+
+    def write_bounds(self, col, bounds):
+        path = "%s/%s.bounds.json" % (self.COLLECTION_PATH, col.name)
+        self.write_file(path, json.dumps(bounds, indent=4, sort_keys=True))
 
     def write_collection_proxy(self, col_proxy):
         data = col_proxy.serialize()
         path = "%s/%s.collectionproxy" % (self.path_output, os.path.basename(self.path_gltf))
-        with open(path, "w") as f:
-            f.write(data)
+        self.write_file(path, data)
+
+    def read_manifest(self):
+        # The fingerprints of the previous build of this gltf, or None for a full build
+        if not self.incremental or not os.path.isfile(self.MANIFEST_PATH):
+            return None
+        try:
+            with open(self.MANIFEST_PATH, "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            print("Unable to read %s, doing a full build" % self.MANIFEST_PATH)
+            return None
+        if manifest.get("format") != MANIFEST_FORMAT or manifest.get("gltf") != os.path.abspath(self.path_gltf):
+            return None
+        if manifest.get("quantize", False) != self.quantize:
+            # Every mesh is written differently
+            return None
+        return manifest
+
+    def write_manifest(self, nodes, images):
+        manifest = {"format": MANIFEST_FORMAT, "gltf": os.path.abspath(self.path_gltf), "quantize": self.quantize, "nodes": nodes, "images": images}
+        self.write_file(self.MANIFEST_PATH, json.dumps(manifest, indent=4, sort_keys=True))
+
+    def remove_outputs(self, names):
+        for name in sorted(names):
+            for path in ["%s/%s.glb" % (self.MESH_PATH, name), "%s/%s.model" % (self.MODEL_PATH, name), "%s/%s.go" % (self.GAMEOBJECT_PATH, name)]:
+                if os.path.isfile(path):
+                    os.remove(path)
+                    print("Removed %s" % path)
+
+    def split_meshes(self, names=None):
+        # Export each mesh object to its own .glb, or only the objects in names
+        convert_gltf_separate_files_path = os.path.join(os.path.dirname(__file__), "convert_gltf_separate_files.py")
+        if names is None:
+            blender_utils.run_blender_script(convert_gltf_separate_files_path, [self.path_gltf, self.MESH_PATH])
+            return
+        names_path = "%s/split_names.json" % self.path_output
+        with open(names_path, "w") as f:
+            json.dump(sorted(names), f)
+        try:
+            blender_utils.run_blender_script(convert_gltf_separate_files_path, [self.path_gltf, self.MESH_PATH, names_path])
+        finally:
+            os.remove(names_path)
+
+    def process_meshes(self, names=None):
+        # Weld vertices, drop degenerate triangles, remove duplicate and unused data, reorder triangles and vertices
+        # for the GPU and optionally quantize vertex attributes in the exported meshes
+        for name in sorted(os.listdir(self.MESH_PATH)):
+            if not name.endswith(".glb"):
+                continue
+            if names is not None and name[:-len(".glb")] not in names:
+                continue
+            path = os.path.join(self.MESH_PATH, name)
+            mesh_file = pygltflib.GLTF2().load(path)
+            welded = mesh_file.weld()
+            saved = mesh_file.deduplicate()["bytes"] + mesh_file.prune()["bytes"]
+            optimized = mesh_file.optimize_meshes(overdraw=True)
+            print("Processed %s, %d vertices welded, %d degenerate triangles removed, %d bytes saved" % (name, welded["vertices"], welded["triangles"], saved))
+            print("    ACMR %.3f -> %.3f, ATVR %.3f -> %.3f" % (optimized["acmr_before"], optimized["acmr_after"], optimized["atvr_before"], optimized["atvr_after"]))
+            if self.quantize:
+                quantized = mesh_file.quantize()
+                errors = ", ".join("%s %g" % (x, quantized["errors"][x]) for x in sorted(quantized["errors"]))
+                print("    Quantized vertex data %d -> %d bytes, largest errors: %s" % (quantized["bytes_before"], quantized["bytes_after"], errors or "none"))
+            mesh_file.save_binary(path)
 
     def build(self):
         print("Building %s to %s" % (self.path_gltf, self.path_output))
-        gltf_file = pygltflib.GLTF2().load(self.path_gltf)
+        gltf_file = pygltflib.GLTF2().load(self.path_gltf, lazy=True)
 
         for x in [self.MATERIAL_PATH, self.MESH_PATH, self.TEXTURE_PATH, self.MODEL_PATH, self.GAMEOBJECT_PATH, self.COLLECTION_PATH]:
             os.makedirs(x, exist_ok=True)
 
-
-        convert_gltf_separate_files_path = os.path.join(os.path.dirname(__file__), "convert_gltf_separate_files.py")
-        blender_utils.run_blender_script(convert_gltf_separate_files_path, [self.path_gltf, self.MESH_PATH])
+        # Output files are named after these, so name everything before taking fingerprints
+        for i in range(len(gltf_file.images)):
+            if gltf_file.images[i].name == None:
+                gltf_file.images[i].name = "Texture_%d" % i
+        for i in range(len(gltf_file.materials)):
+            if gltf_file.materials[i].name == None:
+                gltf_file.materials[i].name = "Material_%d" % i
+        for i in range(len(gltf_file.nodes)):
+            if gltf_file.nodes[i].mesh != None and gltf_file.nodes[i].name == None:
+                gltf_file.nodes[i].name = "Model_%d" % i
+        for x in [gltf_file.images, gltf_file.materials, gltf_file.nodes]:
+            make_names_unique(x)
+
+        # Meshes are exported without their transform or materials, so a node's exported mesh only depends on the
+        # mesh's fingerprint, which covers its accessor data. The transform goes on the collection instance.
+        world_matrices = spatial.world_matrices(gltf_file)
+        fingerprints   = diff.fingerprints(gltf_file)
+        node_fingerprints = {}
+        for i in range(len(gltf_file.nodes)):
+            if gltf_file.nodes[i].mesh != None:
+                node_fingerprints[gltf_file.nodes[i].name] = fingerprints["meshes"][gltf_file.nodes[i].mesh]
+        image_fingerprints = {gltf_file.images[i].name: fingerprints["images"][i] for i in range(len(gltf_file.images))}
+
+        manifest = self.read_manifest()
+        if manifest == None:
+            self.split_meshes()
+            self.process_meshes()
+            unchanged_images = set()
+        else:
+            node_diff  = diff.diff_fingerprints(manifest["nodes"], node_fingerprints)
+            image_diff = diff.diff_fingerprints(manifest["images"], image_fingerprints)
+            rebuild    = node_diff.added | node_diff.changed
+            rebuild   |= {name for name in node_diff.unchanged if not os.path.isfile("%s/%s.glb" % (self.MESH_PATH, name))}
+            print("Incremental build: %d added, %d changed, %d removed, %d unchanged nodes" % (len(node_diff.added), len(node_diff.changed), len(node_diff.removed), len(node_diff.unchanged)))
+            self.remove_outputs(node_diff.removed)
+            if rebuild:
+                self.split_meshes(rebuild)
+                self.process_meshes(rebuild)
+            unchanged_images = image_diff.unchanged
 
         defold_collection = defold_content_helpers.collection("content")
 
@@ -94,29 +228,22 @@ class projectcontext(object):
 
         gltf_base_path = os.path.dirname(os.path.abspath(self.path_gltf))
 
-        gltf_file.convert_images(ImageFormat.FILE, path=self.TEXTURE_PATH)
         for i in range(len(gltf_file.images)):
-            if gltf_file.images[i].name == None:
-                gltf_file.images[i].name = "Texture_%d" % i
-
-            ext = "png"
-            if gltf_file.images[i].mimeType != None and gltf_file.images[i].mimeType == "image/jpeg":
-                ext = "jpg"
-
             self.defold_texture_lut[i] = gltf_file.images[i].name
-            image_path_i     = "%s/%s" %  (self.TEXTURE_PATH, gltf_file.images[i].uri) # (gltf_base_path, gltf_file.images[i].uri) #(self.TEXTURE_PATH, i, ext)
             image_path_named = "%s/%s.png" % (self.TEXTURE_PATH, gltf_file.images[i].name)
 
-            if gltf_file.images[i].uri == None:
-                image_path_i = "%s/%s.%s" % (self.TEXTURE_PATH, i, ext)
-                shutil.move(image_path_i, image_path_named)
+            # Unchanged textures from the last build are not exported again
+            if gltf_file.images[i].name in unchanged_images and os.path.isfile(image_path_named):
+                continue
+
+            file_name = gltf_file.export_image_to_file(i, self.TEXTURE_PATH, override=True)
+            if file_name != None:
+                shutil.move("%s/%s" % (self.TEXTURE_PATH, file_name), image_path_named)
             else:
+                image_path_i = "%s/%s" %  (self.TEXTURE_PATH, gltf_file.images[i].uri) # (gltf_base_path, gltf_file.images[i].uri)
                 shutil.copy(image_path_i, image_path_named)
 
         for i in range(len(gltf_file.materials)):
-            if gltf_file.materials[i].name == None:
-                gltf_file.materials[i].name = "Material_%d" % i
-
             defold_material = defold_content_helpers.material(gltf_file.materials[i].name)
 
             defold_material.set_vertex_space(defold_content_helpers.VERTEX_SPACE_LOCAL)
@@ -176,13 +303,14 @@ class projectcontext(object):
 
             self.defold_material_lut[defold_material.name] = defold_material
 
+        world_bounds   = spatial.world_bounds(gltf_file, world_matrices)
+        positions, rotations, scales = spatial.decompose(world_matrices)
+        defold_bounds  = {}
+
         for i in range(len(gltf_file.nodes)):
             if gltf_file.nodes[i].mesh == None:
                 continue
 
-            if gltf_file.nodes[i].name == None:
-                gltf_file.nodes[i].name = "Model_%d" % i
-
             mesh          = gltf_file.meshes[gltf_file.nodes[i].mesh]
             mesh_path     = "/%s/meshes/%s.glb" % (self.PROJECT_BASE_PATH, gltf_file.nodes[i].name)
             primitive     = mesh.primitives[0]
@@ -213,14 +341,32 @@ class projectcontext(object):
             self.write_gameobject(defold_go)
 
             defold_go_path = "/%s/gameobjects/%s.go" % (self.PROJECT_BASE_PATH, gltf_file.nodes[i].name)
-            defold_collection.add_go(gltf_file.nodes[i].name, defold_go_path)
+            defold_collection.add_go(gltf_file.nodes[i].name, defold_go_path, positions[i].tolist(), rotations[i].tolist(), scales[i].tolist())
+            if not numpy.isnan(world_bounds[i]).any():
+                defold_bounds[gltf_file.nodes[i].name] = {"min": world_bounds[i][0].tolist(), "max": world_bounds[i][1].tolist()}
 
         self.write_collection(defold_collection)
+        self.write_bounds(defold_collection, defold_bounds)
 
         self.write_collection_proxy(defold_collection_proxy)
+        self.write_manifest(node_fingerprints, image_fingerprints)
 
-def do_build_project(args, relative_path=None):
+def do_build_project(args, relative_path=None, incremental=False, quantize=False):
     for x in args:
         output_path = os.path.splitext(os.path.abspath(x))[0] + "_Build"
-        ctx = projectcontext(x, output_path, relative_path)
+        ctx = projectcontext(x, output_path, relative_path, incremental, quantize)
         ctx.build()
+
+def do_merge_gltf(args):
+    # args is the merged .glb followed by the files merged into it
+    output_path = args[0]
+    merged = pygltflib.GLTF2().load(args[1])
+    others = [pygltflib.GLTF2().load(x) for x in args[2:]]
+    if not merged.merge(others, dedupe_materials=True, dedupe_images=True):
+        print("Unable to merge %s" % ", ".join(args[1:]))
+        return
+    for items in [merged.nodes, merged.materials, merged.images]:
+        make_names_unique(items)
+    merged.convert_images(ImageFormat.BUFFERVIEW)
+    merged.save_binary(output_path)
+    print("Merged %d files into %s" % (len(args) - 1, output_path))
@@ -324,23 +324,29 @@ instances {
 scale_along_z: 0
 """
 
-def serialize_instance(id, path):
+def serialize_instance(id, path, position=(0,0,0), rotation=(0,0,0,1), scale=(1,1,1)):
     INSTANCE_TEMPLATE = inspect.cleandoc("""
         instances: {{
             {id}
             {prototype}
+            {position}
+            {rotation}
+            {scale}
         }}
         """)
     return INSTANCE_TEMPLATE.format(
         id = serialize_escaped_str("id", id),
-        prototype = serialize_escaped_str("prototype", path))
+        prototype = serialize_escaped_str("prototype", path),
+        position  = serialize_vec3("position", position),
+        rotation  = serialize_vec4("rotation", rotation),
+        scale     = serialize_vec3("scale3", scale))
 
 class collection(object):
     def __init__(self, name):
         self.name = name
         self.instances = {}
-    def add_go(self, id, path):
-        self.instances[id] = path
+    def add_go(self, id, path, position=(0,0,0), rotation=(0,0,0,1), scale=(1,1,1)):
+        self.instances[id] = (path, position, rotation, scale)
     def serialize(self):
         print("Serializing collection " + self.name)
 
@@ -352,7 +358,7 @@ class collection(object):
 
         i_str = ""
         for k,v in self.instances.items():
-            i_str += serialize_instance(k, v) + "\n"
+            i_str += serialize_instance(k, *v) + "\n"
 
         return output_template.format(
             name = serialize_escaped_str("name", self.name),
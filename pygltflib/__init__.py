@@ -22,7 +22,11 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+from abc import ABCMeta
 import base64
+import binascii
+from collections import OrderedDict
+from collections.abc import Collection, Mapping, MutableSequence
 import copy
 from dataclasses import (
     _is_dataclass_instance,
@@ -32,20 +36,22 @@ from dataclasses import (
 )
 from datetime import date, datetime
 from enum import Enum
+import functools
+import io
 import json
-import mimetypes
+from json.encoder import encode_basestring, encode_basestring_ascii
+import mmap
+import os
 from pathlib import Path
-from shutil import copyfile
 from typing import Any, Dict, List
 from typing import Callable, Optional, Tuple, TypeVar, Union
-from urllib.parse import unquote
+from typing import get_args, get_origin
+import threading
+from urllib.parse import quote, unquote
 import struct
+import sys
 import warnings
 
-from dataclasses_json import dataclass_json as dataclass_json
-from dataclasses_json.core import _decode_dataclass
-from dataclasses_json.core import _ExtendedEncoder as JsonEncoder
-
 __version__ = "1.15.6"
 
 """
@@ -158,6 +164,9 @@ GLTF_MAX_VERSION = 2  # maximum supported version this library can load
 
 DATA_URI_HEADER = "data:application/octet-stream;base64,"
 
+BUFFER_CACHE_SIZE = 512 * 1024 * 1024  # default bytes of decoded buffer data each GLTF2 keeps for reuse
+DATA_URI_CHUNK_SIZE = 3 * 1024 * 1024  # bytes encoded or decoded at a time, a multiple of 3 (4 base64 chars)
+
 
 class BufferFormat(Enum):
     DATAURI = "data uri"
@@ -208,6 +217,31 @@ def json_serial(obj):
     raise TypeError("Type %s not serializable" % type(obj))
 
 
+def _json_default(obj):
+    # the conversions of the dataclasses_json encoder for values json can not write, without importing it. UUID and
+    # Decimal values can only exist once their modules have been imported, so they are looked up in sys.modules
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, Collection):
+        return list(obj)
+    if isinstance(obj, datetime):
+        return obj.timestamp()
+    if isinstance(obj, Enum):
+        return obj.value
+    uuid = sys.modules.get("uuid")
+    decimal = sys.modules.get("decimal")
+    if (uuid and isinstance(obj, uuid.UUID)) or (decimal and isinstance(obj, decimal.Decimal)):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JsonEncoder(json.JSONEncoder):
+    """ A JSONEncoder that writes values the way the dataclasses_json encoder does (see _json_default) """
+
+    def default(self, o):
+        return _json_default(o)
+
+
 def gltf_asdict(obj, *, dict_factory=dict):
     # convert a dataclass object to a dict
     if not _is_dataclass_instance(obj):
@@ -215,10 +249,439 @@ def gltf_asdict(obj, *, dict_factory=dict):
     return _asdict_inner(obj, dict_factory)
 
 
+class _Overlay:
+    """ An object written as json with some of its fields replaced, used to save without mutating the GLTF2 """
+    __slots__ = ("obj", "fields")
+
+    def __init__(self, obj, fields):
+        self.obj = obj
+        self.fields = fields
+
+
+class _JsonWriter:
+    """
+    Write GLTF objects as json to a text stream in a single pass over the dataclasses.
+
+    The output is the same as json.dumps(delete_empty_keys(gltf_asdict(obj))): None and empty values are skipped
+    while walking the objects (nothing inside "extensions" is pruned), so no intermediate dict tree is built.
+    """
+    FLUSH_SIZE = 8192  # number of pieces to collect before writing to the stream
+
+    def __init__(self, fp, *, skipkeys=False, ensure_ascii=True, allow_nan=True, indent=None, separators=None,
+                 default=None, sort_keys=False):
+        self.fp = fp
+        self.skipkeys = skipkeys
+        self.allow_nan = allow_nan
+        self.sort_keys = sort_keys
+        self.default = _json_default if default is None else default
+        self.encode_str = encode_basestring_ascii if ensure_ascii else encode_basestring
+        if indent is not None and not isinstance(indent, str):
+            indent = " " * indent
+        self.indent = indent
+        if separators is not None:
+            self.item_separator, self.key_separator = separators
+        elif indent is not None:
+            self.item_separator, self.key_separator = ",", ": "
+        else:
+            self.item_separator, self.key_separator = ", ", ": "
+        self.newlines = []  # newline plus indentation for each nesting level
+        self.field_names = {}  # dataclass type: field names
+        self.chunks = []
+
+    def write(self, obj, overlay=None):
+        if overlay:
+            self._object([(key, overlay.get(key, value)) for key, value in self._items(obj)], True, 0)
+        else:
+            self._value(obj, True, 0)
+        self.flush()
+
+    def flush(self):
+        self.fp.write("".join(self.chunks))
+        self.chunks.clear()
+
+    def _newline(self, level):
+        while len(self.newlines) <= level:
+            self.newlines.append("" if self.indent is None else "\n" + self.indent * len(self.newlines))
+        return self.newlines[level]
+
+    def _float(self, value):
+        if value != value:
+            text = "NaN"
+        elif value == float("inf"):
+            text = "Infinity"
+        elif value == -float("inf"):
+            text = "-Infinity"
+        else:
+            return float.__repr__(value)
+        if not self.allow_nan:
+            raise ValueError("Out of range float values are not JSON compliant: " + repr(value))
+        return text
+
+    def _scalar(self, value):
+        # the json text for str, None, bool, int and float values, None for anything else
+        if isinstance(value, str):
+            return self.encode_str(value)
+        if value is None:
+            return "null"
+        if value is True:
+            return "true"
+        if value is False:
+            return "false"
+        if isinstance(value, int):
+            return int.__repr__(value)
+        if isinstance(value, float):
+            return self._float(value)
+        return None
+
+    def _key(self, key):
+        if isinstance(key, str):
+            return key
+        if isinstance(key, (int, float)) or key is None:
+            return self._scalar(key)
+        if self.skipkeys:
+            return None
+        raise TypeError(f"keys must be str, int, float, bool or None, not {key.__class__.__name__}")
+
+    def _items(self, value):
+        # the (key, value) pairs of an object-like value, None if the value is not written as an object
+        if isinstance(value, dict):
+            return value.items()
+        names = self.field_names.get(type(value))  # before the slower isinstance check against the Attributes ABC
+        if names is None:
+            if isinstance(value, ATTRIBUTES_CLASSES):
+                return value.__dict__.items()
+            if type(value) is _Overlay:
+                overlay = value.fields
+                return [(key, overlay.get(key, item)) for key, item in self._items(value.obj)]
+            if not _is_dataclass_instance(value):
+                return None
+            names = self.field_names[type(value)] = tuple(f.name for f in fields(value))
+        return [(name, getattr(value, name)) for name in names]
+
+    def _value(self, value, prune, level):
+        text = self._scalar(value)
+        if text is not None:
+            self.chunks.append(text)
+            return
+        items = self._items(value)
+        if items is not None:
+            self._object(items, prune, level)
+        elif isinstance(value, (list, tuple, LazyList)):
+            self._array(value, prune, level)
+        else:
+            self._value(self.default(value), prune, level)
+
+    def _object(self, items, prune, level):
+        if self.sort_keys:
+            items = sorted(items, key=lambda item: item[0])
+        chunks = self.chunks
+        opening = "{" + self._newline(level + 1)
+        separator = self.item_separator + self._newline(level + 1)
+        first = True
+        for key, value in items:
+            if prune and (value is None or (hasattr(value, "__iter__") and len(value) == 0)):
+                continue
+            key = self._key(key)
+            if key is None:  # skipkeys
+                continue
+            chunks.append((opening if first else separator) + self.encode_str(key) + self.key_separator)
+            first = False
+            text = self._scalar(value)
+            if text is not None:
+                chunks.append(text)
+                continue
+            child_items = self._items(value)
+            if child_items is not None:
+                # extensions are stored as plain dicts and are written as they are
+                self._object(child_items, prune and key != "extensions", level + 1)
+            else:
+                self._value(value, prune, level + 1)
+        chunks.append("{}" if first else self._newline(level) + "}")
+        if len(chunks) >= self.FLUSH_SIZE:
+            self.flush()
+
+    def _array(self, values, prune, level):
+        if len(values) == 0:
+            self.chunks.append("[]")
+            return
+        chunks = self.chunks
+        opening = "[" + self._newline(level + 1)
+        separator = self.item_separator + self._newline(level + 1)
+        first = True
+        for value in values:
+            chunks.append(opening if first else separator)
+            first = False
+            text = self._scalar(value)
+            if text is not None:
+                chunks.append(text)
+                continue
+            items = self._items(value)
+            if items is not None:
+                self._object(items, prune, level + 1)
+            else:
+                # only objects directly inside a list are pruned, not the contents of nested lists
+                self._value(value, False, level + 1)
+        chunks.append(self._newline(level) + "]")
+        if len(chunks) >= self.FLUSH_SIZE:
+            self.flush()
+
+
+def write_gltf_json(obj, fp, overlay=None, **kwargs):
+    """
+    Write a GLTF dataclass (usually a GLTF2) as json to the text stream fp, skipping None and empty values.
+
+    overlay (dict): Values to write instead of the fields of obj with the same name, eg {"buffers": [Buffer()]}.
+        obj itself is not changed.
+
+    Takes the same formatting arguments as json.dump (skipkeys, ensure_ascii, allow_nan, indent, separators,
+    default, sort_keys).
+    """
+    _JsonWriter(fp, **kwargs).write(obj, overlay)
+
+
+def map_file(fname):
+    """
+    Memory-map a file read-only and return a zero-copy memoryview over its contents.
+
+    The mapping stays alive for as long as the memoryview (or any slice of it) is referenced.
+    """
+    with open(fname, "rb") as f:
+        if Path(fname).stat().st_size == 0:  # mmap can not map empty files
+            return memoryview(b"")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped)
+
+
+def _max_write_chunks():
+    try:
+        return os.sysconf("SC_IOV_MAX")
+    except (AttributeError, ValueError, OSError):
+        return 1024
+
+
+WRITE_BATCH_CHUNKS = _max_write_chunks()  # most chunks passed to one os.writev call
+WRITE_BATCH_BYTES = 64 * 1024 * 1024  # most bytes passed to one os.writev call (chunks may be decoded on the fly)
+
+
+def write_chunks(f, chunks):
+    """
+    Write an iterable of bytes-like chunks to the binary file f without joining them, using vectored writes
+    (os.writev) when the platform and file object support it.
+    """
+    try:
+        fd = f.fileno() if hasattr(os, "writev") else None
+    except (AttributeError, io.UnsupportedOperation):
+        fd = None
+    if fd is None:
+        for chunk in chunks:
+            f.write(chunk)
+        return
+    f.flush()
+
+    batch = []
+    batch_bytes = 0
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        batch.append(chunk)
+        batch_bytes += len(chunk)
+        if len(batch) >= WRITE_BATCH_CHUNKS or batch_bytes >= WRITE_BATCH_BYTES:
+            _writev_all(fd, batch)
+            batch = []
+            batch_bytes = 0
+    _writev_all(fd, batch)
+
+
+def _writev_all(fd, batch):
+    # os.writev may write less than asked for, so continue from where it stopped
+    start = 0
+    while start < len(batch):
+        written = os.writev(fd, batch[start:start + WRITE_BATCH_CHUNKS])
+        while start < len(batch) and written >= len(batch[start]):
+            written -= len(batch[start])
+            start += 1
+        if written:
+            batch[start] = memoryview(batch[start]).cast("B")[written:]
+
+
+class BufferCache:
+    """
+    Size bounded LRU cache of decoded buffer data, so data uris are decoded and bin files read once instead of
+    once per bufferView or image.
+
+    Data uris are keyed by the uri itself and bin files by (path, mtime, size), so changing a buffer.uri or
+    rewriting its file is a cache miss. Data larger than max_bytes is returned without being cached.
+    """
+
+    def __init__(self, max_bytes=BUFFER_CACHE_SIZE):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # copies and pickles of a GLTF2 start with an empty cache (the lock can not be copied)
+        return BufferCache, (self.max_bytes,)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def peek(self, key):
+        """ The cached data for key, or None """
+        with self._lock:
+            return self._entries.get(key)
+
+    def get(self, key, load):
+        """ Return the cached data for key, or call load() and cache the result """
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+        data = load()
+        self.put(key, data)
+        return data
+
+    def put(self, key, data):
+        with self._lock:
+            self._discard(key)
+            if data is None or len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def discard(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key):
+        data = self._entries.pop(key, None)
+        if data is not None:
+            self.size -= len(data)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class DataUri:
+    """
+    Random access to the bytes of a base64 data uri.
+
+    Base64 decodes in independent groups of 4 characters (3 bytes), so any byte range can be decoded from the
+    matching slice of the uri without decoding the rest. This only works when the base64 text has no line
+    breaks or spaces, see seekable.
+    """
+
+    def __init__(self, uri):
+        self.uri = uri
+        self.start = uri.index(",") + 1  # start of the base64 text
+        self.mime = uri[len("data:"):self.start - 1].split(";")[0]
+        # str.find is much faster than a regular expression over a uri of hundreds of MB
+        self.seekable = (len(uri) - self.start) % 4 == 0 and all(uri.find(c, self.start) == -1 for c in "\n\r \t")
+        padding = 2 if uri.endswith("==") else 1 if uri.endswith("=") else 0
+        self.length = (len(uri) - self.start) // 4 * 3 - padding if self.seekable else None
+
+    def __len__(self):
+        if self.length is None:
+            raise TypeError("the length of a data uri with line breaks is not known without decoding it")
+        return self.length
+
+    def chunks(self, offset=0, length=None, chunk_size=DATA_URI_CHUNK_SIZE):
+        """ Decode length bytes (the rest of the data by default) from offset, chunk_size bytes at a time """
+        if not self.seekable:  # line breaks etc, so decode it all
+            data = binascii.a2b_base64(self.uri[self.start:])
+            end = len(data) if length is None else offset + length
+            for position in range(offset, end, chunk_size):
+                yield data[position:min(position + chunk_size, end)]
+            return
+        end = self.length if length is None else offset + length
+        if offset < 0 or end > self.length:
+            raise ValueError(f"bytes {offset} to {end} are outside of the {self.length} bytes of the data uri")
+        chunk_size -= chunk_size % 3
+        first = offset - offset % 3
+        for position in range(first, end, chunk_size):
+            chunk_end = min(position + chunk_size, end)
+            text = self.uri[self.start + position // 3 * 4:self.start + (chunk_end + 2) // 3 * 4]
+            data = binascii.a2b_base64(text)
+            yield data[max(offset - position, 0):chunk_end - position]
+
+    def read(self, offset=0, length=None):
+        """ Decode length bytes (the rest of the data by default) from offset """
+        if length is None and self.seekable:
+            length = self.length - offset
+        if length is not None:
+            data = bytearray(length)
+            position = 0
+            for chunk in self.chunks(offset, length):
+                data[position:position + len(chunk)] = chunk
+                position += len(chunk)
+            return memoryview(data).toreadonly()
+        return memoryview(b"".join(self.chunks(offset))).toreadonly()
+
+    def range(self, offset, length):
+        """ A DataUriRange of the data, clipped to the end of the data """
+        return DataUriRange(self, offset, max(0, min(length, len(self) - offset)))
+
+
+class DataUriRange:
+    """ A byte range of a DataUri that is decoded chunk by chunk when iterated """
+    __slots__ = ("data_uri", "offset", "length")
+
+    def __init__(self, data_uri, offset, length):
+        self.data_uri = data_uri
+        self.offset = offset
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return self.data_uri.chunks(self.offset, self.length)
+
+
+@functools.lru_cache(maxsize=16)
+def parse_data_uri(uri):
+    """ The DataUri for a data uri string, cached so the uri is only scanned once """
+    return DataUri(uri)
+
+
+def encode_data_uri(data, mime="application/octet-stream", chunk_size=DATA_URI_CHUNK_SIZE):
+    """
+    Encode bytes-like data (or an iterable of bytes-like chunks) as a base64 data uri, chunk by chunk so no
+    encoded copy of the data is made besides the uri itself.
+    """
+    chunk_size -= chunk_size % 3
+
+    def encoded_chunks():
+        if isinstance(data, (bytes, bytearray, memoryview, mmap.mmap)):
+            view = memoryview(data).cast("B")
+            chunks = (view[i:i + chunk_size] for i in range(0, len(view), chunk_size))
+        else:
+            chunks = data
+        remainder = b""  # base64 needs multiples of 3 bytes except at the end
+        for chunk in chunks:
+            if remainder:
+                chunk = remainder + bytes(chunk)
+            cut = len(chunk) - len(chunk) % 3
+            yield binascii.b2a_base64(chunk[:cut], newline=False).decode("ascii")
+            remainder = bytes(chunk[cut:])
+        yield binascii.b2a_base64(remainder, newline=False).decode("ascii")
+
+    return "".join([f"data:{mime};base64,", *encoded_chunks()])
+
+
 def _asdict_inner(obj, dict_factory):
     # return the same result as dataclass _asdict_inner except for Attributes, which can have custom specifiers.
-    if type(obj) == Attributes:
+    if isinstance(obj, ATTRIBUTES_CLASSES):
         return copy.deepcopy(obj.__dict__)
+    if isinstance(obj, LazyList):
+        # decode any remaining items so the output is the same as for an eagerly loaded GLTF2
+        return [_asdict_inner(v, dict_factory) for v in obj]
     if _is_dataclass_instance(obj):
         result = []
         for f in fields(obj):
@@ -238,9 +701,107 @@ def _asdict_inner(obj, dict_factory):
         return copy.deepcopy(obj)
 
 
+class LazyList(MutableSequence):
+    """
+    A list of GLTF objects that keeps the raw json dicts and only decodes an item the first time it is accessed.
+
+    Used by GLTF2.from_json(..., lazy=True) for the top level arrays (nodes, accessors, etc). Decoded items are
+    stored back in place, so changes made to them are kept.
+    """
+
+    def __init__(self, raw_items, decode):
+        self._items = raw_items
+        self._decode = decode
+
+    def _get(self, index):
+        item = self._items[index]
+        if type(item) is dict:
+            item = self._items[index] = self._decode(item)
+        return item
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self._items)))]
+        return self._get(index)
+
+    def __setitem__(self, index, value):
+        self._items[index] = value
+
+    def __delitem__(self, index):
+        del self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        for i in range(len(self._items)):
+            yield self._get(i)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, LazyList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __reduce__(self):
+        # pickle and copy as a plain, fully decoded list
+        return list, (list(self),)
+
+    def insert(self, index, value):
+        self._items.insert(index, value)
+
+    def raw_items(self):
+        """ The underlying items, a mix of decoded objects and raw json dicts """
+        return self._items
+
+    def materialize(self):
+        """ Decode every item and return them as a plain list """
+        return list(self)
+
+
+# the methods dataclasses_json adds to a class, and the classes still waiting for them
+DATACLASS_JSON_METHODS = ("to_json", "from_json", "to_dict", "from_dict", "schema")
+_dataclass_json_pending = []
+_dataclass_json_lock = threading.Lock()
+
+
+class _DataclassJsonMethod:
+    """ Stands in for a method added by dataclasses_json until it is first looked up """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, owner):
+        _apply_dataclass_json()
+        return getattr(owner if obj is None else obj, self.name)
+
+
+def _apply_dataclass_json():
+    # decorate the waiting classes, which replaces the stand-ins with the dataclasses_json methods
+    from dataclasses_json import dataclass_json as decorate
+    with _dataclass_json_lock:
+        while _dataclass_json_pending:
+            decorate(_dataclass_json_pending.pop(0))
+
+
+def dataclass_json(cls):
+    """
+    Add the dataclasses_json methods (to_json, from_json, to_dict, from_dict, schema) to a dataclass. Importing
+    dataclasses_json and decorating the classes is deferred until one of the methods is first used, since GLTF2
+    itself is loaded and saved without them.
+    """
+    for name in DATACLASS_JSON_METHODS:
+        setattr(cls, name, _DataclassJsonMethod(name))
+    _dataclass_json_pending.append(cls)
+    return cls
+
+
+# Property and Attributes are ABCs so pygltflib.compact can register its __slots__ twins as virtual subclasses
 @dataclass_json
 @dataclass
-class Property:
+class Property(metaclass=ABCMeta):
     extensions: Optional[Dict[str, Any]] = field(default_factory=dict)
     extras: Optional[Dict[str, Any]] = field(default_factory=dict)
 
@@ -255,7 +816,7 @@ class Asset(Property):
 
 
 # Attributes is a special case so we provide our own json handling
-class Attributes:
+class Attributes(metaclass=ABCMeta):
     def __init__(self,
                  POSITION=None,
                  NORMAL=None,
@@ -290,6 +851,11 @@ class Attributes:
                       "Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
 
 
+# classes handled as Attributes when reading and writing json (the compact Attributes is a virtual subclass, see
+# pygltflib.compact.register)
+ATTRIBUTES_CLASSES = (Attributes,)
+
+
 @dataclass_json
 @dataclass
 class Primitive(Property):
@@ -569,11 +1135,28 @@ class GLTF2(Property):
         if hasattr(self, "_glb_data"):
             setattr(self, "_glb_data", None)
 
+    def buffer_cache(self):
+        """ The BufferCache holding this GLTF2's decoded data uris and loaded bin files """
+        cache = getattr(self, "_buffer_cache", None)
+        if cache is None:
+            cache = BufferCache()
+            setattr(self, "_buffer_cache", cache)
+        return cache
+
+    def _bin_file_key(self, uri):
+        file_path = Path(getattr(self, "_path", Path()), uri)
+        stat = file_path.stat()
+        return str(file_path.resolve()), stat.st_mtime_ns, stat.st_size, getattr(self, "_use_mmap", False)
+
     def load_file_uri(self, uri):
         """
         Loads a file pointed to by a uri
+
+        If the GLTF was loaded with use_mmap=True the file is memory-mapped and a memoryview is returned.
         """
         path = getattr(self, "_path", Path())
+        if getattr(self, "_use_mmap", False):
+            return map_file(Path(path, uri))
         with open(Path(path, uri), 'rb') as fb:
             data = fb.read()
         return data
@@ -581,11 +1164,11 @@ class GLTF2(Property):
     @staticmethod
     def decode_data_uri(uri):
         """
-        Decodes the binary portion of a data uri.
+        Decodes the binary portion of a data uri (as a read-only memoryview).
+
+        The base64 text is decoded in chunks, see DataUri for decoding only part of it.
         """
-        data = uri.split(DATA_URI_HEADER)[1]
-        data = base64.decodebytes(bytes(data, "utf8"))
-        return data
+        return parse_data_uri(uri).read()
 
     def identify_uri(self, uri):
         """
@@ -616,13 +1199,15 @@ class GLTF2(Property):
         No matter how the buffer data is stored (the uri may be a long string, a file name or imply
         a binary blob), strip off any headers and do any conversions are return a universal binary
         blob for manipulation.
+
+        Decoded data uris and loaded bin files are kept in buffer_cache() for the next call.
         """
         current_buffer_format = self.identify_uri(uri)
 
         if current_buffer_format == BufferFormat.BINFILE:
-            data = self.load_file_uri(uri)
+            data = self.buffer_cache().get(self._bin_file_key(uri), lambda: self.load_file_uri(uri))
         elif current_buffer_format == BufferFormat.DATAURI:
-            data = self.decode_data_uri(uri)
+            data = self.buffer_cache().get(uri, lambda: self.decode_data_uri(uri))
         elif current_buffer_format == BufferFormat.BINARYBLOB:
             data = self.binary_blob()
         else:
@@ -630,41 +1215,342 @@ class GLTF2(Property):
 
         return data
 
+    def get_data_from_buffer_view(self, buffer_view_index):
+        """
+        The bytes of a bufferView (a memoryview slice of the buffer data), or None if the buffer has no data
+
+        For a data uri buffer that has not been decoded already only the bufferView's range is decoded.
+        """
+        buffer_view = self.bufferViews[buffer_view_index]
+        uri = self.buffers[buffer_view.buffer].uri
+        byte_offset = buffer_view.byteOffset or 0
+        if uri is not None and uri.startswith("data") and self.buffer_cache().peek(uri) is None:
+            data_uri = parse_data_uri(uri)
+            if data_uri.seekable:
+                byte_length = max(0, min(buffer_view.byteLength, len(data_uri) - byte_offset))
+                return data_uri.read(byte_offset, byte_length)
+        data = self.get_data_from_buffer_uri(uri)
+        if data is None:
+            return None
+        return memoryview(data)[byte_offset:byte_offset + buffer_view.byteLength]
+
+    def accessor_array(self, accessor_index, normalized=True):
+        """
+        Read an accessor as a NumPy array (a view of the buffer data where possible). Requires numpy.
+
+        See pygltflib.arrays.accessor_array
+        """
+        from .arrays import accessor_array
+        return accessor_array(self, accessor_index, normalized)
+
+    def world_matrices(self):
+        """
+        The world matrix of every node as a NumPy array of shape (len(nodes), 4, 4). Requires numpy.
+
+        See pygltflib.spatial.world_matrices
+        """
+        from .spatial import world_matrices
+        return world_matrices(self)
+
+    def world_bounds(self, use_data=False):
+        """
+        The world space bounds of the mesh of every node as a NumPy array of shape (len(nodes), 2, 3), NaN for
+        nodes without a mesh. Requires numpy.
+
+        See pygltflib.spatial.world_bounds
+        """
+        from .spatial import world_bounds
+        return world_bounds(self, use_data=use_data)
+
+    def weld(self, meshes=None, epsilons=None, area_epsilon=0.0):
+        """
+        Merge the vertices of triangle list primitives that are the same within a tolerance, and remove degenerate
+        triangles. Requires numpy.
+
+        Returns
+            (dict): {"vertices": vertices removed, "triangles": triangles removed}
+
+        See pygltflib.geometry.weld_meshes
+        """
+        from .geometry import weld_meshes
+        return weld_meshes(self, meshes=meshes, epsilons=epsilons, area_epsilon=area_epsilon)
+
+    def optimize_meshes(self, meshes=None, cache_size=16, overdraw=False, overdraw_threshold=0.75):
+        """
+        Reorder the triangles of indexed triangle list primitives for the post-transform vertex cache (and
+        optionally for less overdraw), and their vertices in order of first use. Requires numpy.
+
+        Returns
+            (dict): the ACMR and ATVR before and after, {"triangles", "acmr_before", "acmr_after", "atvr_before",
+            "atvr_after"}
+
+        See pygltflib.geometry.optimize_meshes
+        """
+        from .geometry import optimize_meshes
+        return optimize_meshes(self, meshes=meshes, cache_size=cache_size, overdraw=overdraw,
+                               overdraw_threshold=overdraw_threshold)
+
+    def quantize(self, meshes=None, position_bits=16, normal_bits=8, texcoord_bits=16):
+        """
+        Store mesh positions, normals, tangents and texture coordinates as integers with KHR_mesh_quantization,
+        folding the position dequantization into the node transforms. Requires numpy.
+
+        Returns
+            (dict): {"bytes_before", "bytes_after", "errors": {semantic: largest error}}
+
+        See pygltflib.geometry.quantize_meshes
+        """
+        from .geometry import quantize_meshes
+        return quantize_meshes(self, meshes=meshes, position_bits=position_bits, normal_bits=normal_bits,
+                               texcoord_bits=texcoord_bits)
+
+    def get_index(self):
+        """
+        The GLTFIndex of this GLTF2, for finding objects by name and what refers to them, created on first use
+
+        See pygltflib.references.GLTFIndex
+        """
+        index = getattr(self, "_index", None)
+        if index is None:
+            from .references import GLTFIndex
+            index = GLTFIndex(self)
+            setattr(self, "_index", index)
+        return index
+
+    def invalidate_index(self, kind=None):
+        """ Tell the index (if there is one) that names or indices of kind (or anything) were changed by hand """
+        index = getattr(self, "_index", None)
+        if index is not None:
+            index.invalidate(kind)
+
     # noinspection PyPep8Naming
     def remove_bufferView(self, buffer_view_id):
         """
         Remove a bufferView and update all the bufferView pointers in the GLTF object
         """
+        index = self.get_index()
+        references = [index.references_to("bufferViews", target)
+                      for target in range(buffer_view_id, len(self.bufferViews))]
+        for (referrer_kind, i), _ in references[0]:
+            warnings.warn(f"Removing bufferView {buffer_view_id} but gltf.{referrer_kind}[{i}] still points to it. "
+                          "This may corrupt the GLTF.")
         bufferView = self.bufferViews.pop(buffer_view_id)
 
-        def update_obj(title, obj):
-            if obj:
-                if obj.bufferView == buffer_view_id:
-                    warnings.warn(f"Removing bufferView {buffer_view_id} but "
-                                  f"{title}.bufferView still points to it. This may corrupt the GLTF.")
-                if obj.bufferView >= buffer_view_id:
-                    obj.bufferView -= 1
+        for target, target_references in enumerate(references, buffer_view_id):
+            for _, reference in target_references:
+                reference.set(target - 1)
+
+        if references[0]:  # the references to the removed bufferView now point to the one before it
+            index.invalidate("bufferViews")
+        index.removed("bufferViews", buffer_view_id)
+        return bufferView
+
+    def _collapse_duplicates(self, kind, duplicates):
+        # remove the items of a top level array that are duplicates (index: index of the item kept instead) and
+        # remap all references in one pass
+        from .references import remap_references
+        items = getattr(self, kind)
+        new_indices = []
+        kept = []
+        for i, item in enumerate(items):
+            new_indices.append(None if i in duplicates else len(kept))
+            if i not in duplicates:
+                kept.append(item)
+        remap_references(self, kind, [new_indices[duplicates.get(i, i)] for i in range(len(items))])
+        setattr(self, kind, kept)
+        self.invalidate_index(kind)
+
+    def deduplicate(self):
+        """
+        Collapse bufferViews with identical contents, then accessors with identical definitions, and point all
+        references (accessors, sparse accessors, images, meshes, skins, animations) to the ones that are kept.
+
+        BufferViews are compared by a hash of their bytes plus byteLength, byteStride and target. Accessors are
+        compared by every field except name and min/max. Objects with extensions are left alone. The removed
+        bufferViews are not written to glb files, although their bytes stay in the buffers until those are
+        rewritten.
+
+        Returns
+            (dict): {"bufferViews": number removed, "accessors": number removed, "bytes": bytes saved in a glb}
+        """
+        import hashlib
+        buffer_view_duplicates = {}
+        saved = 0
+        seen = {}  # key: indices of the bufferViews kept with that key
+        for i, buffer_view in enumerate(self.bufferViews):
+            if buffer_view.extensions:
+                continue
+            data = self.get_data_from_buffer_view(i)
+            if data is None or len(data) < buffer_view.byteLength:
+                continue
+            key = (hashlib.blake2b(data, digest_size=16).digest(), buffer_view.byteLength, buffer_view.byteStride,
+                   buffer_view.target)
+            for candidate in seen.get(key, ()):
+                if self.get_data_from_buffer_view(candidate) == data:
+                    buffer_view_duplicates[i] = candidate
+                    saved += buffer_view.byteLength + -buffer_view.byteLength % 4  # glb bufferViews are padded
+                    break
             else:
-                print(f"{obj} empty")
+                seen.setdefault(key, []).append(i)
+        self._collapse_duplicates("bufferViews", buffer_view_duplicates)
 
+        accessor_duplicates = {}
+        seen = {}  # key: index of the accessor kept with that key
         for i, accessor in enumerate(self.accessors):
-            update_obj(f"gltf.accessors[{i}]", accessor)
-            if accessor and accessor.sparse:
-                update_obj(f"gltf.accessors[{i}].sparse.indices", accessor.sparse.indices)
-                update_obj(f"gltf.accessors[{i}].sparse.values", accessor.sparse.values)
+            if accessor.extensions or (accessor.sparse and (accessor.sparse.extensions or
+                                                            accessor.sparse.indices.extensions or
+                                                            accessor.sparse.values.extensions)):
+                continue
+            sparse = accessor.sparse
+            key = (accessor.bufferView, accessor.byteOffset or 0, accessor.componentType, bool(accessor.normalized),
+                   accessor.count, accessor.type)
+            if sparse:
+                key += (sparse.count, sparse.indices.bufferView, sparse.indices.byteOffset or 0,
+                        sparse.indices.componentType, sparse.values.bufferView, sparse.values.byteOffset or 0)
+            if key in seen:
+                kept = self.accessors[seen[key]]
+                if not kept.min and not kept.max:  # keep the bounds, eg POSITION needs them
+                    kept.min, kept.max = accessor.min, accessor.max
+                accessor_duplicates[i] = seen[key]
+            else:
+                seen[key] = i
+        self._collapse_duplicates("accessors", accessor_duplicates)
+
+        return {"bufferViews": len(buffer_view_duplicates), "accessors": len(accessor_duplicates), "bytes": saved}
+
+    def _remove_objects(self, kind, removed):
+        # remove the items of a top level array whose indices are in removed and remap all references in one pass,
+        # references to the removed items are dropped from lists and set to None elsewhere
+        from .references import remap_references
+        items = getattr(self, kind)
+        new_indices = []
+        kept = []
+        for i, item in enumerate(items):
+            new_indices.append(None if i in removed else len(kept))
+            if i not in removed:
+                kept.append(item)
+        remap_references(self, kind, new_indices)
+        setattr(self, kind, kept)
+        self.invalidate_index(kind)
+
+    def _reachable(self):
+        # kind: set of indices of the objects that can be reached from the scenes and animations (or from every
+        # node if there are no scenes)
+        from .references import REFERENCE_KINDS, object_references
+        reachable = {kind: set() for kind in REFERENCE_KINDS}
+        pending = [("scenes", i) for i in range(len(self.scenes))]
+        pending += [("animations", i) for i in range(len(self.animations))]
+        if not self.scenes:
+            pending += [("nodes", i) for i in range(len(self.nodes))]
+        while pending:
+            kind, i = pending.pop()
+            items = getattr(self, kind)
+            if i in reachable[kind] or not 0 <= i < len(items):
+                continue
+            reachable[kind].add(i)
+            for reference_kind, reference in object_references(kind, items[i]):
+                target = reference.get()
+                if isinstance(target, int) and target not in reachable[reference_kind]:
+                    pending.append((reference_kind, target))
+        return reachable
+
+    def compact_binary_blob(self):
+        """
+        Drop the bytes of the binary blob that nothing points to and move the data that is kept up. The ranges kept
+        are those of the bufferViews and of the compressed data of EXT_meshopt_compression and
+        KHR_meshopt_compression. Each range keeps its byteOffset modulo 4, so the alignment of the data inside it
+        is kept.
+
+        Returns
+            (int): The number of bytes removed from the binary blob
+        """
+        from .references import object_references
+
+        blob = self.binary_blob()
+        blob_buffers = [i for i, buffer in enumerate(self.buffers) if buffer.uri is None]
+        if not blob or len(blob_buffers) != 1:
+            return 0
+        blob = memoryview(blob).cast("B")
+        owners = []  # the bufferViews and extension dicts with a byteOffset and byteLength in the blob
+        for buffer_view in self.bufferViews:
+            for _, reference in object_references("bufferViews", buffer_view):
+                if reference.get() == blob_buffers[0]:
+                    owners.append(reference.owner)
+
+        def byte_offset(owner):
+            return (owner.get("byteOffset") if isinstance(owner, dict) else owner.byteOffset) or 0
+
+        def byte_length(owner):
+            return owner.get("byteLength", 0) if isinstance(owner, dict) else owner.byteLength
+
+        owners.sort(key=byte_offset)
+        ranges = []  # [start, end, [owners]] of the used parts of the blob, overlapping ranges merged
+        for owner in owners:
+            start = byte_offset(owner)
+            end = start + byte_length(owner)
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], end)
+                ranges[-1][2].append(owner)
+            else:
+                ranges.append([start, end, [owner]])
+
+        compacted = bytearray()
+        for start, end, range_owners in ranges:
+            compacted += bytes((start - len(compacted)) % 4)
+            shift = len(compacted) - start
+            compacted += blob[start:end]
+            for owner in range_owners:
+                if not shift:
+                    continue
+                if isinstance(owner, dict):
+                    owner["byteOffset"] = byte_offset(owner) + shift
+                else:
+                    owner.byteOffset = byte_offset(owner) + shift
+        removed = len(blob) - len(compacted)
+        if removed > 0:
+            self.buffers[blob_buffers[0]].byteLength = len(compacted)
+            self.set_binary_blob(memoryview(compacted).toreadonly())
+        return max(removed, 0)
+
+    def prune(self):
+        """
+        Remove the nodes, meshes, skins, cameras, materials, textures, images, samplers, accessors, bufferViews
+        and buffers that can not be reached from the scenes or animations, remap every reference to the objects
+        that are kept in one pass per kind, and compact the binary blob. If there are no scenes every node is
+        kept.
 
-        for i, obj in enumerate(self.images):
-            update_obj(f"gltf.images[{i}]", obj)
+        Only the references known to pygltflib.references are followed, extensions that point at top level
+        objects in other ways may be left pointing at the wrong objects.
 
-        return bufferView
+        Returns
+            (dict): {kind: number removed, ..., "bytes": bytes saved in a glb}
+        """
+        reachable = self._reachable()
+        report = {}
+        saved = 0
+        for kind, indices in reachable.items():
+            if kind in ("scenes", "animations"):
+                continue
+            removed = set(range(len(getattr(self, kind)))) - indices
+            if kind == "bufferViews":
+                saved = sum(self.bufferViews[i].byteLength + -self.bufferViews[i].byteLength % 4 for i in removed)
+            if kind == "buffers" and any(self.buffers[i].uri is None for i in removed):
+                self.destroy_binary_blob()
+            if removed:
+                self._remove_objects(kind, removed)
+            report[kind] = len(removed)
+        self.compact_binary_blob()
+        report["bytes"] = saved
+        return report
 
     def export_datauri_as_image_file(self, data_uri, name, destination, override=False, index=0):
         """ convert data uri to image file
             If destination is full path and file name, use that.
             If destination is just a directory, use the name of the data_uri
         """
-        header, encoded = data_uri.split(",", 1)
-        mime = header.split(":")[1].split(";")[0]
+        import mimetypes
+        data_uri = parse_data_uri(data_uri)
+        mime = data_uri.mime
         if name:  # use image.name
             file_name = name
         else:
@@ -678,14 +1564,13 @@ class GLTF2(Property):
         if image_path.is_file() and not override:
             warnings.warn(f"Unable to write image file, a file already exists at {image_path}")
             return None
-        data = base64.b64decode(encoded)
-
         with open(image_path, "wb") as image_file:
-            image_file.write(data)
+            write_chunks(image_file, data_uri.chunks())
         return file_name
 
     def export_fileuri_as_image_file(self, file_uri, destination, override=False):
         """ Export file uri as another image file (ie copy out of GLTF into own location) """
+        from shutil import copyfile
         path = getattr(self, "_path", Path())
         image_path = Path(path / unquote(file_uri))
         if not image_path.exists():
@@ -700,15 +1585,25 @@ class GLTF2(Property):
 
     def export_image(self, image_index, destination='', override=False):
         """ Directly export an image to a file without affecting GLTF """
+        import mimetypes
         destination = Path(destination)
         image = self.images[image_index]
         if image.uri and not image.uri.startswith('data:'):  # copy file to new location
             self.export_fileuri_as_image_file(image.uri, destination)
         elif image.bufferView is not None:
-            warnings.warn("pygltflib.export_image currently unable to convert image stored buffers to image file. "
-                          "Try GLTF.convert_images() first. "
-                          "Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
-
+            image_data = self._buffer_view_source(image.bufferView)
+            if image_data is None:
+                warnings.warn("pygltflib.export_image unable to load the buffer data of the image. "
+                              "Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
+                return None
+            file_name = image.name or f"{image_index}{mimetypes.guess_extension(image.mimeType)}"
+            image_path = destination / unquote(file_name) if destination.is_dir() else destination
+            if image_path.is_file() and not override:
+                warnings.warn(f"Unable to write image file, a file already exists at {image_path}")
+                return None
+            with open(image_path, "wb") as image_file:
+                write_chunks(image_file, image_data if isinstance(image_data, DataUriRange) else [image_data])
+            return file_name
         elif image.uri.startswith('data:'):
             file_name = self.export_datauri_as_image_file(image.uri, image.name, destination, override, image_index)
             return file_name
@@ -721,6 +1616,7 @@ class GLTF2(Property):
         destination_path (str|Path): Path where to save images. Images will also be loaded from this path if needed.
         override (bool): Only save image if it does not already exist
         """
+        import mimetypes
         destination_path = Path(destination_path)
         image = self.images[image_index]
         if image.uri and not image.uri.startswith('data:'):
@@ -731,28 +1627,21 @@ class GLTF2(Property):
                               f"does not appear to exist.")
             return None
         elif image.bufferView is not None:
-            # TODO: remove bufferView from GLTF when create images or datauris from buffer data
-            bufferView = self.bufferViews[image.bufferView]
-            buffer = self.buffers[bufferView.buffer]
-            if buffer.uri:  # buffer is stored as a data uri or an uri pointing to a non-existent file
+            image_data = self._buffer_view_source(image.bufferView)
+            if image_data is None:  # buffer uri points to a non-existent file
                 warnings.warn("pygltflib currently unable to convert image stored buffers to image file."
                               "Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
-            else:  # buffer is stored in the binary blob
-                warnings.warn(
-                    "pygltflib currently does not remove image data from the buffer when converting to files."
-                    "Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
-                data = self.binary_blob()
-                extension = mimetypes.guess_extension(image.mimeType)
-                file_name = f"{image_index}{extension}"
-                image_path = destination_path / file_name
-                if image_path.is_file() and not override:
-                    warnings.warn(f"Unable to write image file, a file already exists at {image_path}")
-                    return None
-
-                with open(image_path, "wb") as f:
-                    f.write(data[bufferView.byteOffset:bufferView.byteOffset + bufferView.byteLength])
-                return file_name
-            return None
+                return None
+            extension = mimetypes.guess_extension(image.mimeType)
+            file_name = f"{image_index}{extension}"
+            image_path = destination_path / file_name
+            if image_path.is_file() and not override:
+                warnings.warn(f"Unable to write image file, a file already exists at {image_path}")
+                return None
+
+            with open(image_path, "wb") as f:
+                write_chunks(f, image_data if isinstance(image_data, DataUriRange) else [image_data])
+            return file_name
         elif image.uri.startswith('data:'):
             file_name = self.export_datauri_as_image_file(
                 image.uri,
@@ -772,7 +1661,13 @@ class GLTF2(Property):
         path (str|Path): Path to the directory to use for loading or saving images
         override (bool): Override an image file if it already exists and is about to be replaced
 
+        Images moved out of bufferViews no longer point to them, and the bufferViews (and their bytes in the
+        binary blob) are removed if nothing else uses them. Images moved into bufferViews are appended to the
+        binary blob (see append_to_binary_blob), ready to be saved as a single glb.
         """
+        import mimetypes
+        released = set()  # the bufferViews of images moved to files or data uris
+        embedded = []  # (image, data, mime type) of images moved into bufferViews
         if path is None:
             path = getattr(self, "_path", Path())
         else:
@@ -790,20 +1685,16 @@ class GLTF2(Property):
                         mime: str
                         mime, _ = mimetypes.guess_type(str(image_path))
 
-                        with open(image_path, "rb") as image_file:
-                            encoded_string = str(base64.b64encode(image_file.read()).decode('utf-8'))
-                            image.name = copy.copy(image.uri) if not image.name else image.name
-                            image.uri = f'data:{mime};base64,{encoded_string}'
+                        image.name = copy.copy(image.uri) if not image.name else image.name
+                        image.uri = encode_data_uri(map_file(image_path), mime)
                 elif image.bufferView is not None:
-                    # TODO: remove bufferView from GLTF when create images or datauris from buffer data
-                    warnings.warn("pygltflib currently does not remove image data "
-                                  "from the buffer when converting to data uri."
-                                  "Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
-                    data = self.binary_blob()
-                    bufferView = self.bufferViews[image.bufferView]
-                    image_data = data[bufferView.byteOffset:bufferView.byteOffset + bufferView.byteLength]
-                    encoded_string = str(base64.b64encode(image_data).decode('utf-8'))
-                    image.uri = f'data:{image.mimeType};base64,{encoded_string}'
+                    image_data = self._buffer_view_source(image.bufferView)
+                    if image_data is None:
+                        warnings.warn(f"Unable to load the buffer data of image {image_index}.")
+                        continue
+                    image.uri = encode_data_uri(image_data, image.mimeType)
+                    released.add(image.bufferView)
+                    image.bufferView = None
                 else:
                     warnings.warn(f"Image {image_index} appears to have neither a uri nor a buffer view.")
 
@@ -812,13 +1703,47 @@ class GLTF2(Property):
                 if image.bufferView is not None:
                     # already in bufferview format
                     continue
-                warnings.warn("pygltflib currently unable to add image data to buffers."
-                              "Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
-                continue
+                if not image.uri:
+                    warnings.warn(f"Image {image_index} appears to have neither a uri nor a buffer view.")
+                    continue
+                if image.uri.startswith('data:'):
+                    data_uri = parse_data_uri(image.uri)
+                    mime = image.mimeType or data_uri.mime
+                    image_data = data_uri.read()
+                else:
+                    image_path = Path(path / unquote(image.uri))
+                    if not image_path.exists():
+                        warnings.warn(f"Expected image file at {image_path} not found.")
+                        continue
+                    mime = image.mimeType or mimetypes.guess_type(str(image_path))[0]
+                    image_data = map_file(image_path)
+                if not mime:
+                    warnings.warn(f"Unable to work out the mime type of image {image_index}, it was not embedded.")
+                    continue
+                embedded.append((image, image_data, mime))
             elif image_format == ImageFormat.FILE:  # convert to images
                 file_name = self.export_image_to_file(image_index, path, override)
                 if file_name:  # replace data uri with pointer to file
                     image.uri = file_name
+                    if image.bufferView is not None:
+                        released.add(image.bufferView)
+                        image.bufferView = None
+
+        if embedded:
+            buffer_views = self.append_to_binary_blob([image_data for _, image_data, _ in embedded])
+            for (image, _, mime), buffer_view in zip(embedded, buffer_views):
+                if not image.name and not image.uri.startswith('data:'):
+                    image.name = image.uri
+                image.uri = None
+                image.mimeType = mime
+                image.bufferView = buffer_view
+            self.invalidate_index("images")
+
+        if released:  # remove the image bufferViews nothing else uses, and their bytes in the binary blob
+            self.invalidate_index("images")
+            index = self.get_index()
+            self._remove_objects("bufferViews", {i for i in released if not index.is_referenced("bufferViews", i)})
+            self.compact_binary_blob()
 
     def convert_buffers(self, buffer_format, override=False):
         """
@@ -830,30 +1755,34 @@ class GLTF2(Property):
         """
         path: Path = getattr(self, "_path", Path())
 
+        if buffer_format == BufferFormat.BINARYBLOB and len(self.buffers) > 1:
+            self.merge_buffers()
+            return
+
         for i, buffer in enumerate(self.buffers):
             current_buffer_format = self.identify_uri(buffer.uri)
             if current_buffer_format == buffer_format:  # already in the format
                 continue
             if current_buffer_format == BufferFormat.BINFILE:
                 warnings.warn(f"Conversion will leave {buffer.uri} file orphaned since data is now in the GLTF object.")
-            data = self.get_data_from_buffer_uri(buffer.uri)
+            # a DataUri or a mapped bin file is converted chunk by chunk rather than loaded in full
+            data = self._buffer_source(buffer)
 
-            if not data:
+            if data is None or len(data) == 0:
                 return
 
             self.destroy_binary_blob()  # free up any binary blob floating around
 
             if buffer_format == BufferFormat.BINARYBLOB:
-                if len(self.buffers) > 1:
-                    warnings.warn("pygltflib currently unable to convert multiple buffers to a single binary blob."
-                                  "Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
-                    return
-                self.set_binary_blob(data)
+                self.set_binary_blob(data.read() if isinstance(data, DataUri) else data)
+                if current_buffer_format == BufferFormat.DATAURI:
+                    self.buffer_cache().discard(buffer.uri)
                 buffer.uri = None
             elif buffer_format == BufferFormat.DATAURI:
                 # convert buffer to a data uri
-                data = base64.b64encode(data).decode('utf-8')
-                buffer.uri = f'{DATA_URI_HEADER}{data}'
+                if current_buffer_format == BufferFormat.BINFILE:
+                    self.buffer_cache().discard(self._bin_file_key(buffer.uri))
+                buffer.uri = encode_data_uri(data)
             elif buffer_format == BufferFormat.BINFILE:
                 filename = Path(f"{i}").with_suffix(".bin")
                 binfile_path = path / filename
@@ -861,9 +1790,230 @@ class GLTF2(Property):
                     warnings.warn(f"Unable to write buffer file, a file already exists at {binfile_path}")
                     continue
                 with open(binfile_path, "wb") as f:  # save bin file with the gltf file
-                    f.write(data)
+                    write_chunks(f, data.chunks() if isinstance(data, DataUri) else [data])
+                if current_buffer_format == BufferFormat.DATAURI:
+                    self.buffer_cache().discard(buffer.uri)
                 buffer.uri = str(filename)
 
+    def merge_buffers(self):
+        """
+        Concatenate all the buffers into one binary blob buffer, ready for a glb, and point the bufferViews into it.
+
+        Each buffer starts on a 4 byte boundary so the alignment of the bufferViews inside it is kept. Nothing is
+        changed if the data of a buffer can not be loaded.
+
+        Returns
+            (bool): True if the buffers were merged
+        """
+        sources = []  # (data, byte length, offset in the merged buffer)
+        offset = 0
+        for i, buffer in enumerate(self.buffers):
+            data = self._buffer_source(buffer)
+            if data is None:
+                warnings.warn(f"Unable to load the data of buffer {i}, buffers have not been merged. "
+                              "Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
+                return False
+            offset += -offset % 4
+            sources.append((data, min(buffer.byteLength, len(data)), offset))
+            offset += buffer.byteLength
+
+        blob = bytearray(offset)
+        for data, byte_length, start in sources:
+            if isinstance(data, DataUri):
+                for chunk in data.chunks(0, byte_length):
+                    blob[start:start + len(chunk)] = chunk
+                    start += len(chunk)
+            else:
+                blob[start:start + byte_length] = memoryview(data).cast("B")[:byte_length]
+
+        for bufferView in self.bufferViews:
+            start = sources[bufferView.buffer][2]
+            if start:
+                bufferView.byteOffset = (bufferView.byteOffset or 0) + start
+            bufferView.buffer = 0
+
+        for buffer in self.buffers:
+            if buffer.uri is None:
+                continue
+            if buffer.uri.startswith("data"):
+                self.buffer_cache().discard(buffer.uri)
+            else:
+                warnings.warn(f"Conversion will leave {buffer.uri} file orphaned since data is now in the GLTF object.")
+                self.buffer_cache().discard(self._bin_file_key(buffer.uri))
+        merged = self.buffers[0]
+        merged.uri = None
+        merged.byteLength = len(blob)
+        self.buffers = [merged]
+        self.invalidate_index("buffers")
+        self.set_binary_blob(memoryview(blob).toreadonly())
+        return True
+
+    def merge(self, others, dedupe_materials=False, dedupe_images=False):
+        """
+        Append the scenes, nodes, meshes, materials, textures, images, samplers, skins, cameras, animations,
+        accessors and bufferViews of other GLTF2 objects to this one, eg to assemble a level from separately exported
+        pieces. The other objects are not changed.
+
+        The references held by the objects of each merged file are offset in one pass. The buffers of the others are
+        appended to the binary blob in a single allocation, each starting on a 4 byte boundary, so the result can be
+        saved as a glb straight away. The root nodes of the default scene of each merged file are added to the
+        default scene and any other scenes are appended. Image file uris are rewritten relative to this file.
+
+        Top level extensions of the merged files (eg the lights of KHR_lights_punctual) are not merged.
+
+        others (GLTF2|iterable): The GLTF2 objects to merge into this one
+        dedupe_materials (bool): Collapse identical samplers, textures and materials after merging
+        dedupe_images (bool): Collapse images with the same data and mime type, and then identical textures
+
+        Returns
+            (bool): True if merged, nothing is changed if the data of a buffer can not be loaded
+        """
+        from .references import REFERENCE_KINDS, object_references
+        if isinstance(others, GLTF2):
+            others = [others]
+        others = list(others)  # read twice, once for the buffers and once for the objects
+
+        sources = []  # (data, byte length, offset in the appended data) of each buffer of the others
+        buffer_starts = []  # the offsets of the buffers of each other file in the appended data
+        length = 0
+        for other in others:
+            starts = []
+            for i, buffer in enumerate(other.buffers):
+                data = other._buffer_source(buffer)
+                if data is None:
+                    warnings.warn(f"Unable to load the data of buffer {i} of a merged file, nothing has been merged. "
+                                  "Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
+                    return False
+                length += -length % 4
+                starts.append(length)
+                sources.append((data, min(buffer.byteLength, len(data)), length))
+                length += buffer.byteLength
+            buffer_starts.append(starts)
+
+        blob_index = next((i for i, buffer in enumerate(self.buffers) if buffer.uri is None), None)
+        base = 0
+        if sources:
+            if blob_index is None:
+                self.buffers.append(Buffer(byteLength=0))
+                blob_index = len(self.buffers) - 1
+            blob = self.binary_blob()
+            blob = memoryview(blob).cast("B") if blob is not None else memoryview(b"")
+            base = len(blob) + -len(blob) % 4
+            new_blob = bytearray(base + length)
+            new_blob[:len(blob)] = blob
+            for data, byte_length, start in sources:
+                start += base
+                if isinstance(data, DataUri):
+                    for chunk in data.chunks(0, byte_length):
+                        new_blob[start:start + len(chunk)] = chunk
+                        start += len(chunk)
+                else:
+                    new_blob[start:start + byte_length] = memoryview(data).cast("B")[:byte_length]
+            self.buffers[blob_index].byteLength = len(new_blob)
+            self.set_binary_blob(memoryview(new_blob).toreadonly())
+
+        kinds = [kind for kind in REFERENCE_KINDS if kind != "buffers"]
+        path = getattr(self, "_path", None)
+        for other, starts in zip(others, buffer_starts):
+            offsets = {kind: len(getattr(self, kind)) for kind in kinds}
+            items = copy.deepcopy({kind: list(getattr(other, kind)) for kind in kinds})
+            for kind in kinds:
+                for obj in items[kind]:
+                    for reference_kind, reference in object_references(kind, obj):
+                        value = reference.get()
+                        if not isinstance(value, int):
+                            continue
+                        if reference_kind != "buffers":
+                            reference.set(value + offsets[reference_kind])
+                            continue
+                        reference.set(blob_index)  # every buffer of the other file is now part of the binary blob
+                        owner = reference.owner
+                        if isinstance(owner, dict):  # eg EXT_meshopt_compression
+                            owner["byteOffset"] = owner.get("byteOffset", 0) + base + starts[value]
+                        else:
+                            owner.byteOffset = (owner.byteOffset or 0) + base + starts[value]
+
+            other_path = getattr(other, "_path", None)
+            if path is not None and other_path is not None and Path(other_path).resolve() != Path(path).resolve():
+                for image in items["images"]:
+                    if image.uri and not image.uri.startswith("data:"):
+                        image_path = os.path.relpath(Path(other_path, unquote(image.uri)), path)
+                        image.uri = quote(Path(image_path).as_posix())
+
+            scenes = items["scenes"]
+            default = other.scene if other.scene is not None else (0 if scenes else None)
+            if default is not None and self.scenes:
+                scene = self.scenes[self.scene if self.scene is not None else 0]
+                scene.nodes = (scene.nodes or []) + (scenes.pop(default).nodes or [])
+            elif default is not None:
+                self.scene = offsets["scenes"] + default
+
+            for kind in kinds:
+                getattr(self, kind).extend(items[kind])
+            for extension in other.extensionsUsed or []:
+                if extension not in self.extensionsUsed:
+                    self.extensionsUsed.append(extension)
+            for extension in other.extensionsRequired or []:
+                if extension not in self.extensionsRequired:
+                    self.extensionsRequired.append(extension)
+            if other.extensions:
+                warnings.warn(f"The top level extensions of a merged file ({', '.join(other.extensions)}) have not "
+                              "been merged, references to them may be wrong.")
+        self.invalidate_index()
+
+        if dedupe_images:
+            self._dedupe_images()
+        if dedupe_materials:
+            for kind in ("samplers", "textures", "materials"):
+                self._collapse_duplicates(kind, self._duplicate_definitions(kind))
+        elif dedupe_images:
+            self._collapse_duplicates("textures", self._duplicate_definitions("textures"))
+        return True
+
+    def _duplicate_definitions(self, kind):
+        # index: index of the first item of a top level array with the same definition, ignoring names
+        duplicates = {}
+        seen = {}
+        for i, item in enumerate(getattr(self, kind)):
+            definition = gltf_asdict(item)
+            definition.pop("name", None)
+            key = json.dumps(definition, sort_keys=True, default=json_serial)
+            duplicates[i] = seen.setdefault(key, i)
+        return {i: kept for i, kept in duplicates.items() if i != kept}
+
+    def _dedupe_images(self):
+        # collapse images with the same mime type and data, and remove the bufferViews only they used
+        import hashlib
+        duplicates = {}
+        seen = {}  # key: index of the image kept with that key
+        for i, image in enumerate(self.images):
+            if image.bufferView is not None:
+                data = self._buffer_view_source(image.bufferView)
+                if data is None:
+                    continue
+                digest = hashlib.blake2b(digest_size=16)
+                for chunk in data if isinstance(data, DataUriRange) else [data]:
+                    digest.update(chunk)
+                key = (image.mimeType, digest.digest())
+            elif image.uri is None:
+                continue
+            elif image.uri.startswith("data:"):
+                key = (image.mimeType, image.uri)
+            else:
+                image_path = Path(getattr(self, "_path", Path()), unquote(image.uri))
+                if not image_path.is_file():
+                    continue
+                data = map_file(image_path) if image_path.stat().st_size else b""
+                key = (image.mimeType, hashlib.blake2b(data, digest_size=16).digest())
+            duplicates[i] = seen.setdefault(key, i)
+        duplicates = {i: kept for i, kept in duplicates.items() if i != kept}
+        released = {self.images[i].bufferView for i in duplicates} - {None}
+        self._collapse_duplicates("images", duplicates)
+        if released:
+            index = self.get_index()
+            self._remove_objects("bufferViews", {i for i in released if not index.is_referenced("bufferViews", i)})
+            self.compact_binary_blob()
+
     def to_json(self,
                 *,
                 skipkeys: bool = False,
@@ -879,7 +2029,20 @@ class GLTF2(Property):
         to_json and from_json from dataclasses_json
         courtesy https://github.com/lidatong/dataclasses-json
         """
-
+        if not kw:
+            stream = io.StringIO()
+            write_gltf_json(self,
+                            stream,
+                            skipkeys=skipkeys,
+                            ensure_ascii=ensure_ascii,
+                            allow_nan=allow_nan,
+                            indent=indent,
+                            separators=separators,
+                            default=default,
+                            sort_keys=sort_keys)
+            return stream.getvalue()
+
+        # extra json.dumps options, so go through a dict
         data = gltf_asdict(self)
         data = delete_empty_keys(data)
         return json.dumps(data,
@@ -902,115 +2065,241 @@ class GLTF2(Property):
                   parse_int=None,
                   parse_constant=None,
                   infer_missing=False,
+                  lazy=False,
+                  compact=False,
                   **kw) -> A:
+        """
+        Decode a GLTF2 from a json string using the generated decoders (see decoder_for).
+
+        infer_missing (bool): Kept for compatibility with dataclasses-json, every field has a default so missing
+            values are always filled in.
+        lazy (bool): Keep the top level arrays (nodes, accessors, etc) as LazyLists that only decode an item
+            when it is accessed.
+        compact (bool): Decode the items of the top level arrays into the __slots__ classes from
+            pygltflib.compact, which use much less memory.
+        """
         init_kwargs = json.loads(s,
                                  parse_float=parse_float,
                                  parse_int=parse_int,
                                  parse_constant=parse_constant,
                                  **kw)
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore", RuntimeWarning)
-            result = _decode_dataclass(cls, init_kwargs, infer_missing)  # type: GLTF2
-        for mesh in result.meshes:
-            for primitive in mesh.primitives:
-                raw_attributes = primitive.attributes
-                if raw_attributes:
-                    attributes = Attributes(**raw_attributes)
-                    primitive.attributes = attributes
+        array_types = GLTF2_ARRAY_TYPES
+        if compact:
+            from . import compact as compact_classes
+            compact_classes.register()
+            array_types = compact_classes.GLTF2_ARRAY_TYPES
+        raw_arrays = {}
+        if lazy or compact:
+            for name in array_types:
+                if isinstance(init_kwargs.get(name), list):
+                    raw_arrays[name] = init_kwargs.pop(name)
+        result = decoder_for(cls)(init_kwargs)  # type: GLTF2
+        for name, raw_items in raw_arrays.items():
+            decode = decoder_for(array_types[name])
+            setattr(result, name, LazyList(raw_items, decode) if lazy else [decode(item) for item in raw_items])
         return result
 
     def gltf_to_json(self, separators=None, indent="  ") -> str:
         return self.to_json(default=json_serial, indent=indent, allow_nan=False, skipkeys=True, separators=separators)
 
+    def write_gltf_json(self, fp, separators=None, indent="  ", overlay=None):
+        """
+        Same output as gltf_to_json, but written straight to the text stream fp
+
+        overlay (dict): Values to write instead of the GLTF2 fields with the same name (see write_gltf_json)
+        """
+        write_gltf_json(self, fp, overlay=overlay, default=json_serial, indent=indent, allow_nan=False,
+                        skipkeys=True, separators=separators)
+
     @staticmethod
     def get_bin_name_from_path(path: Path):
         """ remove an extension and path and return a bin filename (sans path) """
         return str(Path(path.stem)) + ".bin"
 
-    def save_json(self, fname):
+    def save_json(self, fname, asset=None):
+        """
+        Save as a gltf json file. A binary blob is saved to a .bin file next to it.
+
+        asset (Asset): Written instead of self.asset if given. The GLTF2 object is not changed by saving.
+        """
         path = Path(fname)
-        original_buffers = copy.deepcopy(self.buffers)
-        for i, buffer in enumerate(self.buffers):
+        overlay = {} if asset is None else {"asset": asset}
+        buffers = list(self.buffers)
+        for i, buffer in enumerate(buffers):
             if buffer.uri is None:  # save glb_data as bin file
-                # update the buffer uri to point to our new local bin file
+                # point the saved buffer uri to our new local bin file
                 glb_data = self.binary_blob()
                 if glb_data:
-                    buffer.uri = self.get_bin_name_from_path(path)
+                    buffers[i] = _Overlay(buffer, {"uri": self.get_bin_name_from_path(path)})
                     with open(path.with_suffix(".bin"), "wb") as f:  # save bin file with the gltf file
                         f.write(glb_data)
+                    overlay["buffers"] = buffers
                 else:
                     warnings.warn(f"buffer {i} is empty: {buffer}")
 
         with open(path, "w") as f:
-            f.write(self.gltf_to_json())
-
-        self.buffers = original_buffers  # restore buffers
+            self.write_gltf_json(f, overlay=overlay)
         return True
 
-    def buffers_to_binary_blob(self):
-        """ Flatten all buffers into a single buffer """
-        buffer_blob = bytearray()
+    def _buffer_source(self, buffer):
+        # the data of a buffer for writing it elsewhere: bin files that are not already cached are memory-mapped
+        # rather than read in full, and data uris that are not already decoded are returned as a DataUri
+        path = getattr(self, "_path", Path())
+        if buffer.uri is None:  # assume loaded from glb binary file
+            return self.binary_blob()
+        if buffer.uri.startswith("data"):
+            cached = self.buffer_cache().peek(buffer.uri)
+            if cached is None and parse_data_uri(buffer.uri).seekable:
+                return parse_data_uri(buffer.uri)
+            return self.get_data_from_buffer_uri(buffer.uri)
+        if Path(path, buffer.uri).is_file():
+            cached = self.buffer_cache().get(self._bin_file_key(buffer.uri), lambda: None)
+            return cached if cached is not None else map_file(Path(path, buffer.uri))
+        return None
+
+    def _buffer_view_source(self, buffer_view_index):
+        # the data of a bufferView for writing it elsewhere without loading the rest of its buffer: a memoryview
+        # slice of the binary blob, of cached data or of a memory-mapped bin file, or a DataUriRange, or None
+        buffer_view = self.bufferViews[buffer_view_index]
+        data = self._buffer_source(self.buffers[buffer_view.buffer])
+        if data is None:
+            return None
+        byte_offset = buffer_view.byteOffset or 0
+        if isinstance(data, DataUri):
+            return data.range(byte_offset, buffer_view.byteLength)
+        return memoryview(data).cast("B")[byte_offset:byte_offset + buffer_view.byteLength]
 
+    def append_to_binary_blob(self, items):
+        """
+        Append bytes-like items to the binary blob, each as a new bufferView starting on a 4 byte boundary. A
+        buffer without a uri is added for the binary blob if there is none. The new blob is allocated once, with
+        room for all the items.
+
+        items (list): bytes-like objects, eg bytes, memoryviews or the memoryview of a mapped file
+
+        Returns
+            (list): The index of the new bufferView of each item
+        """
+        buffer_index = next((i for i, buffer in enumerate(self.buffers) if buffer.uri is None), None)
+        if buffer_index is None:
+            self.buffers.append(Buffer(byteLength=0))
+            buffer_index = len(self.buffers) - 1
+        blob = self.binary_blob()
+        blob = memoryview(blob).cast("B") if blob is not None else memoryview(b"")
+        views = [memoryview(item).cast("B") for item in items]
+        offsets = []
+        length = len(blob)
+        for view in views:
+            length += -length % 4
+            offsets.append(length)
+            length += len(view)
+
+        new_blob = bytearray(length)
+        new_blob[:len(blob)] = blob
+        indices = []
+        for view, offset in zip(views, offsets):
+            new_blob[offset:offset + len(view)] = view
+            self.bufferViews.append(BufferView(buffer=buffer_index, byteOffset=offset, byteLength=len(view)))
+            indices.append(len(self.bufferViews) - 1)
+        self.buffers[buffer_index].byteLength = length
+        self.set_binary_blob(memoryview(new_blob).toreadonly())
+        return indices
+
+    def glb_layout(self):
+        """
+        Work out where each bufferView goes in the single buffer of a glb, without copying any data.
+
+        Each bufferView is padded to 4 bytes. BufferViews whose buffer can not be loaded are left out.
+
+        Returns
+            (layout, length): layout is a list of (buffer_view_index, data, byte_offset) where data is a
+            memoryview of the bufferView contents (a DataUriRange for data uris that are not decoded yet) and
+            byte_offset is where it goes. length is the padded size of the buffer.
+        """
+        layout = []
         offset = 0
-        path = getattr(self, "_path", Path())
-        binary_blob: Optional[bytearray] = None
+        buffer_data = {}  # buffer index: data, so each buffer is looked up once
 
         for i, bufferView in enumerate(self.bufferViews):
-            buffer = self.buffers[bufferView.buffer]
-            if buffer.uri is None:  # assume loaded from glb binary file
-                if binary_blob is None:
-                    binary_blob = self.binary_blob()
-                data = binary_blob
-            elif buffer.uri.startswith("data"):
-                data = self.decode_data_uri(buffer.uri)
-            elif Path(path, buffer.uri).is_file():
-                with open(Path(path, buffer.uri), 'rb') as fb:
-                    data = fb.read()
-            else:
-                warnings.warn(f"Unable to save bufferView {buffer.uri[:20]} to glb, skipping. "
-                              "Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
+            if bufferView.buffer not in buffer_data:
+                data = self._buffer_source(self.buffers[bufferView.buffer])
+                if data is not None and not isinstance(data, DataUri):
+                    data = memoryview(data).cast("B")
+                buffer_data[bufferView.buffer] = data
+            data = buffer_data[bufferView.buffer]
+            if data is None:
+                warnings.warn(f"Unable to save bufferView {str(self.buffers[bufferView.buffer].uri)[:20]} to glb, "
+                              "skipping. Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
                 continue
             byte_offset = bufferView.byteOffset if bufferView.byteOffset is not None else 0
             byte_length = bufferView.byteLength
 
-            bufferView.byteOffset = offset
-            bufferView.byteLength = byte_length
-            bufferView.buffer = 0
-
-            buffer_blob += data[byte_offset:byte_offset + byte_length]
+            if isinstance(data, DataUri):
+                layout.append((i, data.range(byte_offset, byte_length), offset))
+            else:
+                layout.append((i, data[byte_offset:byte_offset + byte_length], offset))
+            offset += byte_length
             if byte_length % 4 != 0:  # Pad each buffer to 4 bytes to make following data happy
-                buffer_blob += b'\0\0\0'[0:4 - byte_length % 4]
                 offset += 4 - byte_length % 4
-            offset += byte_length
 
-        return buffer_blob
+        return layout, offset
+
+    @staticmethod
+    def _layout_chunks(layout, length):
+        # the bufferView slices of a glb_layout with zero padding between them
+        position = 0
+        for _, data, offset in layout:
+            if offset > position:
+                yield bytes(offset - position)
+            if isinstance(data, DataUriRange):
+                yield from data
+            else:
+                yield data
+            position = offset + len(data)
+        if length > position:
+            yield bytes(length - position)
 
-    def save_to_bytes(self):
-        # setup
-        original_buffer_views = copy.deepcopy(self.bufferViews)
-        original_buffers = copy.deepcopy(self.buffers)
-        new_buffer = Buffer()
+    def buffers_to_binary_blob(self):
+        """ Flatten all buffers into a single buffer """
+        layout, length = self.glb_layout()
+        buffer_blob = bytearray(length)
+
+        for i, data, offset in layout:
+            if isinstance(data, DataUriRange):
+                data = b"".join(data)
+            buffer_blob[offset:offset + len(data)] = data
+            bufferView = self.bufferViews[i]
+            bufferView.byteOffset = offset
+            bufferView.buffer = 0
+        self.invalidate_index("buffers")
 
-        buffer_blob = self.buffers_to_binary_blob()
-        new_buffer.byteLength = len(buffer_blob)
+        return buffer_blob
 
-        self.buffers = [new_buffer]
-        json_blob = self.gltf_to_json(separators=(',', ':'), indent=None).encode("utf-8")
+    def _glb_json(self, layout, length, asset=None):
+        # the json chunk of a glb, written with an overlay pointing the bufferViews into the single glb buffer
+        buffer_views = list(self.bufferViews)
+        for i, _, offset in layout:
+            buffer_views[i] = _Overlay(buffer_views[i], {"buffer": 0, "byteOffset": offset})
+        overlay = {"bufferViews": buffer_views, "buffers": [Buffer(byteLength=length)]}
+        if asset is not None:
+            overlay["asset"] = asset
+        stream = io.StringIO()
+        self.write_gltf_json(stream, separators=(',', ':'), indent=None, overlay=overlay)
+        json_blob = stream.getvalue().encode("utf-8")
 
         # pad each blob if needed
         if len(json_blob) % 4 != 0:
             json_blob += b'   '[0:4 - len(json_blob) % 4]
+        return json_blob
 
-        version = struct.pack('<I', GLTF_VERSION)
-        chunk_header_len = 8
-        length = len(MAGIC) + len(version) + 4 + chunk_header_len * 2 + len(json_blob) + len(buffer_blob)
-
-        self.bufferViews = original_buffer_views  # restore unpacked bufferViews
-        self.buffers = original_buffers  # restore unpacked buffers
-
+    @staticmethod
+    def _glb_header(json_blob, buffer_length):
         # header is MAGIC, version, length
         # json chunk is json_blob length, JSON, json_blob
         # buffer chunk is length of buffer_blob, utf-8, buffer_blob
+        version = struct.pack('<I', GLTF_VERSION)
+        chunk_header_len = 8
+        length = len(MAGIC) + len(version) + 4 + chunk_header_len * 2 + len(json_blob) + buffer_length
         return [
             MAGIC,
             version,
@@ -1018,46 +2307,69 @@ class GLTF2(Property):
             struct.pack('<I', len(json_blob)),
             bytes(JSON, 'utf-8'),
             json_blob,
-            struct.pack('<I', len(buffer_blob)),
+            struct.pack('<I', buffer_length),
             bytes(BIN, 'utf-8'),
-            buffer_blob
         ]
 
-    def save_binary(self, fname):
+    def save_to_bytes(self, asset=None):
+        """
+        The glb file contents as a list of bytes objects. The GLTF2 object is not changed.
+
+        asset (Asset): Written instead of self.asset if given
+        """
+        layout, length = self.glb_layout()
+        json_blob = self._glb_json(layout, length, asset)
+        buffer_blob = b"".join(self._layout_chunks(layout, length))
+        return self._glb_header(json_blob, length) + [buffer_blob]
+
+    def save_binary(self, fname, asset=None):
+        """
+        Save as a glb file. The bufferView data is streamed from its source (binary blob, memory-mapped bin file
+        or decoded data uri) into the file, so the binary chunk is never assembled in memory.
+
+        asset (Asset): Written instead of self.asset if given. The GLTF2 object is not changed by saving.
+        """
+        layout, length = self.glb_layout()
+        json_blob = self._glb_json(layout, length, asset)
         with open(fname, 'wb') as f:
-            glb_structure = self.save_to_bytes()
-            if not glb_structure:
-                return False
-            for data in glb_structure:
-                f.write(data)
+            write_chunks(f, self._glb_header(json_blob, length))
+            write_chunks(f, self._layout_chunks(layout, length))
         return True
 
     def save(self, fname, asset=Asset()):
-        self.asset = asset
-        self._path = Path(fname).parent
-        self._name = Path(fname).name
+        """
+        Save as glb or gltf json depending on the extension of fname, writing asset as the file's asset.
+
+        Saving does not change or copy the GLTF2 object, so one object can be saved from several threads at once.
+        """
         ext = Path(fname).suffix
         if ext.lower() in [".glb"]:
-            return self.save_binary(fname)
+            return self.save_binary(fname, asset=asset)
         else:
             if getattr(self, "_glb_data", None):
                 warnings.warn(
                     f"This file ({fname}) contains a binary blob loaded from a .glb file, "
                     "and this will be saved to a .bin file next to the json file.")
-            return self.save_json(fname)
+            return self.save_json(fname, asset=asset)
 
     @classmethod
-    def gltf_from_json(cls, json_data):
-        return cls.from_json(json_data, infer_missing=True)
+    def gltf_from_json(cls, json_data, lazy=False, compact=False):
+        return cls.from_json(json_data, infer_missing=True, lazy=lazy, compact=compact)
 
     @classmethod
-    def load_json(cls, fname):
+    def load_json(cls, fname, lazy=False, compact=False):
         with open(fname, "r") as f:
-            obj = cls.gltf_from_json(f.read())
+            obj = cls.gltf_from_json(f.read(), lazy=lazy, compact=compact)
         return obj
 
-    @classmethod
-    def load_from_bytes(cls, data):
+    @staticmethod
+    def glb_chunks(data):
+        """
+        Check the header of glb data and find its JSON and BIN chunks, without decoding them.
+
+        Returns
+            (list): (chunk_type, start, length) of each JSON and BIN chunk, in file order
+        """
         magic = struct.unpack("<BBBB", data[:4])
         version, length = struct.unpack("<II", data[4:12])
         if bytearray(magic) != MAGIC:
@@ -1067,9 +2379,9 @@ class GLTF2(Property):
                           "this file is version {version}, "
                           "it may not import correctly. "
                           "Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
+        chunks = []
         index = 12
         i = 0
-        obj = None
         while index < length:
             chunk_length = struct.unpack("<I", data[index:index + 4])[0]
             index += 4
@@ -1078,39 +2390,149 @@ class GLTF2(Property):
             if chunk_type not in [JSON, BIN]:
                 warnings.warn(f"Ignoring chunk {i} with unknown type '{chunk_type}', probably glTF extensions. "
                               "Please open an issue at https://gitlab.com/dodgyville/pygltflib/issues")
-            elif chunk_type == JSON:
-                raw_json = data[index:index + chunk_length].decode("utf-8")
-                obj = cls.from_json(raw_json, infer_missing=True)
             else:
-                obj.set_binary_blob(data[index:index + chunk_length])
+                chunks.append((chunk_type, index, chunk_length))
             index += chunk_length
             i += 1
+        return chunks
+
+    @classmethod
+    def load_from_bytes(cls, data, lazy=False, compact=False):
+        """
+        Load a glb from bytes. If data is a memoryview (eg from map_file) the binary blob is a
+        zero-copy slice of it.
+        """
+        obj = None
+        for chunk_type, index, chunk_length in cls.glb_chunks(data):
+            if chunk_type == JSON:
+                raw_json = str(data[index:index + chunk_length], "utf-8")
+                obj = cls.from_json(raw_json, infer_missing=True, lazy=lazy, compact=compact)
+            else:
+                obj.set_binary_blob(data[index:index + chunk_length])
         return obj
 
     @classmethod
-    def load_binary(cls, fname):
+    def load_binary(cls, fname, use_mmap=False, lazy=False, compact=False):
+        if use_mmap:
+            return cls.load_from_bytes(map_file(fname), lazy=lazy, compact=compact)
         with open(fname, "rb") as f:
             data = f.read()
-        return cls.load_from_bytes(data)
+        return cls.load_from_bytes(data, lazy=lazy, compact=compact)
 
     @classmethod
-    def load_binary_from_file_object(cls, f):
+    def load_binary_from_file_object(cls, f, lazy=False, compact=False):
         data = f.read()
-        return cls.load_from_bytes(data)
+        return cls.load_from_bytes(data, lazy=lazy, compact=compact)
 
     @classmethod
-    def load(cls, fname):
+    def load(cls, fname, use_mmap=False, lazy=False, compact=False):
+        """
+        Load a .gltf or .glb file.
+
+        fname (str|Path): File to load
+        use_mmap (bool): Memory-map the glb and any external .bin buffers instead of reading them into memory.
+            binary_blob() and get_data_from_buffer_uri() then return memoryviews over the mapped files.
+        lazy (bool): Only decode nodes, accessors, etc when they are first accessed (see LazyList).
+        compact (bool): Use the memory compact classes from pygltflib.compact for nodes, accessors, etc.
+
+        When a snapshot cache is enabled (see pygltflib.snapshot) the decoded json is taken from a valid snapshot
+        of the file instead of being decoded again.
+        """
+        from .snapshot import snapshot_cache
         path = Path(fname)
         ext = path.suffix
-        if ext.lower() in [".bin", ".glb"]:
-            obj = cls.load_binary(fname)
+        cache = snapshot_cache()
+        if cache is not None:
+            obj = cache.load(cls, path, use_mmap=use_mmap, lazy=lazy, compact=compact)
+        elif ext.lower() in [".bin", ".glb"]:
+            obj = cls.load_binary(fname, use_mmap=use_mmap, lazy=lazy, compact=compact)
         else:
-            obj = cls.load_json(fname)
+            obj = cls.load_json(fname, lazy=lazy, compact=compact)
         obj._path = path.parent
         obj._name = path.name
+        obj._use_mmap = use_mmap
         return obj
 
 
+# the dataclass of the items in each of the top level GLTF2 arrays, eg "nodes": Node
+GLTF2_ARRAY_TYPES = {
+    f.name: get_args(f.type)[0]
+    for f in fields(GLTF2)
+    if get_args(f.type) and hasattr(get_args(f.type)[0], "__dataclass_fields__")
+}
+
+
+def _unwrap_optional(field_type):
+    # Optional[X] -> X
+    if get_origin(field_type) is Union:
+        args = [arg for arg in get_args(field_type) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return field_type
+
+
+def _convert_expression(field_type, var, namespace):
+    """
+    Return a python expression that converts the json value in `var` to field_type, following the same rules as
+    dataclasses-json: nested dataclasses are decoded, lists are converted item by item and int/float/str/bool
+    values are coerced to the declared type. Anything else (dicts, Any) is passed through untouched.
+    """
+    field_type = _unwrap_optional(field_type)
+    if isinstance(field_type, type) and issubclass(field_type, ATTRIBUTES_CLASSES):
+        # Attributes can hold custom attributes so they are not decoded as a dataclass
+        namespace["Attributes"] = field_type
+        return f"(Attributes(**{var}) if {var} else {var})"
+    if hasattr(field_type, "__dataclass_fields__"):
+        decoder_name = f"decode_{field_type.__name__}"
+        namespace[decoder_name] = decoder_for(field_type)
+        return f"{decoder_name}({var})"
+    if get_origin(field_type) is list:
+        item_type = get_args(field_type)[0]
+        if isinstance(item_type, type) and issubclass(item_type, ATTRIBUTES_CLASSES):  # morph targets stay dicts
+            return var
+        item = var + "_"
+        item_expression = _convert_expression(item_type, item, namespace)
+        if item_expression == item:
+            return var
+        return f"[{item_expression} for {item} in {var}]"
+    if field_type in (int, float, str, bool):
+        return f"({var} if isinstance({var}, {field_type.__name__}) else {field_type.__name__}({var}))"
+    return var
+
+
+def _make_decoder(cls):
+    """
+    Generate a function that decodes a json dict into cls. Field names and type hints are resolved once here
+    instead of for every object that is decoded.
+    """
+    namespace = {"cls": cls}
+    lines = [f"def decode_{cls.__name__}(d):", "    kw = {}"]
+    for f in fields(cls):
+        if not f.init:
+            continue
+        expression = _convert_expression(f.type, "v", namespace)
+        lines.append(f"    if {f.name!r} in d:")
+        if expression == "v":
+            lines.append(f"        kw[{f.name!r}] = d[{f.name!r}]")
+        else:
+            lines.append(f"        v = d[{f.name!r}]")
+            lines.append(f"        kw[{f.name!r}] = None if v is None else {expression}")
+    lines.append("    return cls(**kw)")
+    exec("\n".join(lines), namespace)
+    return namespace[f"decode_{cls.__name__}"]
+
+
+_DECODERS = {}
+
+
+def decoder_for(cls):
+    """ Return the generated json decoder for a dataclass, creating it on first use. """
+    decoder = _DECODERS.get(cls)
+    if decoder is None:
+        decoder = _DECODERS[cls] = _make_decoder(cls)
+    return decoder
+
+
 def main():
     import doctest
     doctest.testfile("../README.md")
@@ -0,0 +1,326 @@
+"""
+pygltflib.arrays : Read and write GLTF2 accessor data as NumPy arrays.
+
+Reads are views of the buffer data where the layout allows it, so strided and memory-mapped bufferViews are not
+copied, while sparse accessors and normalized integers give a new array. Writes go through GeometryBuilder, which
+packs the arrays with the alignment and padding the spec requires.
+"""
+import numpy as np
+
+from . import (
+    ARRAY_BUFFER,
+    BYTE,
+    DATA_URI_HEADER,
+    ELEMENT_ARRAY_BUFFER,
+    FLOAT,
+    MAT2,
+    MAT3,
+    MAT4,
+    SCALAR,
+    SHORT,
+    UNSIGNED_BYTE,
+    UNSIGNED_INT,
+    UNSIGNED_SHORT,
+    VEC2,
+    VEC3,
+    VEC4,
+    Accessor,
+    Attributes,
+    Buffer,
+    BufferView,
+    Mesh,
+    Primitive,
+    encode_data_uri,
+)
+
+COMPONENT_DTYPES = {
+    BYTE: np.dtype("i1"),
+    UNSIGNED_BYTE: np.dtype("u1"),
+    SHORT: np.dtype("<i2"),
+    UNSIGNED_SHORT: np.dtype("<u2"),
+    UNSIGNED_INT: np.dtype("<u4"),
+    FLOAT: np.dtype("<f4"),
+}
+
+TYPE_COMPONENTS = {SCALAR: 1, VEC2: 2, VEC3: 3, VEC4: 4, MAT2: 4, MAT3: 9, MAT4: 16}
+
+MATRIX_COLUMNS = {MAT2: 2, MAT3: 3, MAT4: 4}
+
+
+def element_layout(component_type, accessor_type):
+    """
+    The byte layout of one accessor element.
+
+    Returns
+        (columns, column_size, element_size): matrix columns are padded to 4 byte boundaries, so
+        MAT2 of bytes and MAT3 of bytes or shorts have unused bytes after each column.
+    """
+    dtype = COMPONENT_DTYPES[component_type]
+    components = TYPE_COMPONENTS[accessor_type]
+    columns = MATRIX_COLUMNS.get(accessor_type, 1)
+    column_size = components // columns * dtype.itemsize
+    if columns > 1 and column_size % 4:
+        column_size += 4 - column_size % 4
+    return columns, column_size, columns * column_size
+
+
+def buffer_view_data(gltf, buffer_view_index):
+    """
+    The bytes of a bufferView as a zero-copy memoryview where the underlying buffer allows it (data uris are
+    decoded for just the bufferView's range)
+    """
+    data = gltf.get_data_from_buffer_view(buffer_view_index)
+    if data is None:
+        raise ValueError(f"bufferView {buffer_view_index} has no buffer data")
+    if len(data) < gltf.bufferViews[buffer_view_index].byteLength:
+        raise ValueError(f"bufferView {buffer_view_index} extends beyond the end of its buffer")
+    return data
+
+
+def read_elements(gltf, buffer_view_index, byte_offset, count, component_type, accessor_type):
+    """
+    View count elements of a bufferView as an array of shape (count, components), honouring byteStride.
+
+    The result is a view of the buffer when the layout allows it (read-only for bytes and memory-mapped data).
+    Matrices are returned with their components flattened in column-major order, as they are stored.
+    """
+    dtype = COMPONENT_DTYPES[component_type]
+    components = TYPE_COMPONENTS[accessor_type]
+    columns, column_size, element_size = element_layout(component_type, accessor_type)
+    data = buffer_view_data(gltf, buffer_view_index)
+    stride = gltf.bufferViews[buffer_view_index].byteStride or element_size
+    byte_offset = byte_offset or 0
+    if count and byte_offset + stride * (count - 1) + element_size > len(data):
+        raise ValueError(f"{count} elements of {element_size} bytes with stride {stride} at offset {byte_offset} do "
+                         f"not fit in bufferView {buffer_view_index} ({len(data)} bytes)")
+    if count == 0:
+        return np.zeros((0, components), dtype)
+    rows = components // columns
+    if column_size == rows * dtype.itemsize:  # no column padding
+        return np.ndarray((count, components), dtype, buffer=data, offset=byte_offset,
+                          strides=(stride, dtype.itemsize))
+    padded = np.ndarray((count, columns, rows), dtype, buffer=data, offset=byte_offset,
+                        strides=(stride, column_size, dtype.itemsize))
+    return padded.reshape(count, components)
+
+
+def normalize(array):
+    """ Convert normalized integer values to float32 in the [0, 1] or [-1, 1] range """
+    if array.dtype.kind == "f":
+        return array
+    maximum = np.iinfo(array.dtype).max
+    result = array.astype(np.float32) / np.float32(maximum)
+    if array.dtype.kind == "i":
+        np.maximum(result, -1.0, out=result)
+    return result
+
+
+def accessor_array(gltf, accessor_index, normalized=True):
+    """
+    The data of an accessor as a NumPy array.
+
+    SCALAR accessors give an array of shape (count,), the others (count, components), with matrices flattened in
+    column-major order. Without sparse substitution or normalization this is a view of the buffer data, which is
+    read-only for glb blobs, memory-mapped files and data uris.
+
+    gltf (GLTF2): The gltf containing the accessor
+    accessor_index (int): Index of the accessor
+    normalized (bool): Convert accessors flagged as normalized to float32. When False the stored integer values
+        are returned (as accessor.min and accessor.max describe them).
+    """
+    accessor = gltf.accessors[accessor_index]
+    components = TYPE_COMPONENTS[accessor.type]
+    if accessor.bufferView is not None:
+        array = read_elements(gltf, accessor.bufferView, accessor.byteOffset, accessor.count,
+                              accessor.componentType, accessor.type)
+    else:  # all zeros, unless sparse values are substituted below
+        array = np.zeros((accessor.count, components), COMPONENT_DTYPES[accessor.componentType])
+
+    sparse = accessor.sparse
+    if sparse and sparse.count:
+        indices = read_elements(gltf, sparse.indices.bufferView, sparse.indices.byteOffset, sparse.count,
+                                sparse.indices.componentType, SCALAR)[:, 0]
+        values = read_elements(gltf, sparse.values.bufferView, sparse.values.byteOffset, sparse.count,
+                               accessor.componentType, accessor.type)
+        if len(indices) and indices.max() >= accessor.count:
+            raise ValueError(f"accessor {accessor_index} has sparse indices beyond its count of {accessor.count}")
+        array = array.copy()
+        array[indices] = values
+
+    if normalized and accessor.normalized:
+        array = normalize(array)
+    if accessor.type == SCALAR:
+        return array[:, 0]
+    return array
+
+
+def component_type_for(dtype):
+    """ The accessor componentType that stores values of a NumPy dtype without loss, or None """
+    dtype = np.dtype(dtype)
+    for component_type, component_dtype in COMPONENT_DTYPES.items():
+        if component_dtype.kind == dtype.kind and component_dtype.itemsize == dtype.itemsize:
+            return component_type
+    return None
+
+
+def accessor_type_for(array):
+    """ The accessor type for an array of shape (count,) or (count, components) """
+    if array.ndim == 1:
+        return SCALAR
+    components = {n: accessor_type for accessor_type, n in TYPE_COMPONENTS.items() if accessor_type != MAT2}
+    if array.ndim != 2 or array.shape[1] not in components:
+        raise ValueError(f"can not infer the accessor type of an array with shape {array.shape}")
+    return components[array.shape[1]]
+
+
+def pack_elements(array, component_type, accessor_type, stride=None):
+    """
+    The bytes of an array of shape (count, components) laid out as accessor elements, with matrix columns
+    padded to 4 bytes and each element padded to stride bytes.
+    """
+    dtype = COMPONENT_DTYPES[component_type]
+    columns, column_size, element_size = element_layout(component_type, accessor_type)
+    stride = stride or element_size
+    array = np.ascontiguousarray(array, dtype=dtype).reshape(len(array), -1)
+    if stride == element_size and column_size * columns == array.shape[1] * dtype.itemsize:
+        return array.tobytes()
+    rows = array.shape[1] // columns
+    out = np.zeros((len(array), stride), np.uint8)
+    for column in range(columns):
+        start = column * column_size
+        out[:, start:start + rows * dtype.itemsize] = array[:, column * rows:(column + 1) * rows].view(np.uint8)
+    return out.tobytes()
+
+
+class GeometryBuilder:
+    """
+    Append NumPy arrays to a GLTF2 as bufferViews and accessors over one growing buffer.
+
+    The data is collected in a bytearray and written to the buffer by flush() (or when leaving a with block):
+    to the binary blob when the buffer has no uri, as a data uri otherwise. Each bufferView starts on a 4 byte
+    boundary and vertex attribute elements are padded to a multiple of 4 bytes, as the spec requires.
+
+        with GeometryBuilder(gltf) as builder:
+            primitive = builder.add_primitive(indices=triangles, POSITION=positions, NORMAL=normals)
+            builder.add_mesh([primitive], name="generated")
+
+    gltf (GLTF2): The gltf to add to
+    buffer (int): Index of the buffer to append to. By default the binary blob buffer, which is created when the
+        gltf has no buffers yet. A gltf with only uri buffers gets a new data uri buffer.
+    """
+
+    def __init__(self, gltf, buffer=None):
+        self.gltf = gltf
+        if buffer is None:
+            buffer = next((i for i, b in enumerate(gltf.buffers) if b.uri is None), None)
+        if buffer is None:
+            uri = None if not gltf.buffers else DATA_URI_HEADER
+            gltf.buffers.append(Buffer(uri=uri, byteLength=0))
+            buffer = len(gltf.buffers) - 1
+        self.buffer = buffer
+        uri = gltf.buffers[buffer].uri
+        existing = gltf.get_data_from_buffer_uri(uri) if uri != DATA_URI_HEADER else None
+        self.data = bytearray(existing[:gltf.buffers[buffer].byteLength] if existing else b"")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def flush(self):
+        """ Write the collected data to the buffer """
+        buffer = self.gltf.buffers[self.buffer]
+        buffer.byteLength = len(self.data)
+        if buffer.uri is None:
+            self.gltf.set_binary_blob(bytes(self.data))
+        elif buffer.uri.startswith("data"):
+            buffer.uri = encode_data_uri(self.data)
+        else:
+            raise ValueError(f"GeometryBuilder can only write to binary blob or data uri buffers, "
+                             f"not {buffer.uri}")
+
+    def add_buffer_view(self, data, target=None, byte_stride=None):
+        """ Append raw bytes as a new bufferView starting on a 4 byte boundary. Returns its index """
+        self.data.extend(b"\0" * (-len(self.data) % 4))
+        buffer_view = BufferView(buffer=self.buffer, byteOffset=len(self.data), byteLength=len(data),
+                                 byteStride=byte_stride, target=target)
+        self.data.extend(data)
+        self.gltf.bufferViews.append(buffer_view)
+        return len(self.gltf.bufferViews) - 1
+
+    def add_accessor(self, array, accessor_type=None, component_type=None, target=None, normalized=False,
+                     name=None):
+        """
+        Append an array as a new accessor (with its own bufferView) and return the accessor index.
+
+        array (array like): Values of shape (count,) for SCALAR or (count, components)
+        accessor_type (str): SCALAR, VEC3, MAT4, ... inferred from the shape when not given (4 components is VEC4)
+        component_type (int): FLOAT, UNSIGNED_SHORT, ... inferred from the dtype when not given. float64 arrays
+            are stored as FLOAT.
+        target (int): ARRAY_BUFFER for vertex attributes, ELEMENT_ARRAY_BUFFER for indices
+        normalized (bool): The integer values are normalized
+        """
+        array = np.asarray(array)
+        if accessor_type is None:
+            accessor_type = accessor_type_for(array)
+        if component_type is None:
+            component_type = FLOAT if array.dtype.kind == "f" else component_type_for(array.dtype)
+            if component_type is None:
+                raise ValueError(f"no accessor componentType for dtype {array.dtype}, please give component_type")
+        components = TYPE_COMPONENTS[accessor_type]
+        values = np.ascontiguousarray(array, dtype=COMPONENT_DTYPES[component_type]).reshape(-1, components)
+        if array.size != values.size or (array.dtype.kind in "iu" and not np.array_equal(values, array.reshape(
+                -1, components))):
+            raise ValueError(f"values of dtype {array.dtype} do not fit componentType {component_type}")
+
+        _, _, element_size = element_layout(component_type, accessor_type)
+        stride = None
+        if target == ARRAY_BUFFER and element_size % 4:
+            stride = element_size + 4 - element_size % 4
+        buffer_view = self.add_buffer_view(pack_elements(values, component_type, accessor_type, stride),
+                                           target=target, byte_stride=stride)
+
+        accessor = Accessor(bufferView=buffer_view, byteOffset=0, componentType=component_type,
+                            normalized=normalized or None, count=len(values), type=accessor_type, name=name)
+        if len(values):
+            accessor.min = values.min(axis=0).tolist()
+            accessor.max = values.max(axis=0).tolist()
+        self.gltf.accessors.append(accessor)
+        return len(self.gltf.accessors) - 1
+
+    def add_indices(self, indices):
+        """
+        Append vertex indices (flattened) as an UNSIGNED_SHORT accessor, or UNSIGNED_INT when they do not fit.
+        Returns the accessor index.
+        """
+        indices = np.asarray(indices).reshape(-1)
+        if len(indices) and indices.min() < 0:
+            raise ValueError("negative vertex index")
+        # the largest value of each type is reserved for primitive restart
+        component_type = UNSIGNED_SHORT if not len(indices) or indices.max() < 65535 else UNSIGNED_INT
+        return self.add_accessor(indices, SCALAR, component_type, target=ELEMENT_ARRAY_BUFFER)
+
+    def add_primitive(self, indices=None, mode=None, material=None, **attributes):
+        """
+        Append the indices and vertex attributes of a primitive and return the Primitive (not yet added to a mesh).
+
+        attributes are arrays keyed by semantic, eg POSITION=positions, TEXCOORD_0=uvs. Integer arrays for
+        COLOR_n, TEXCOORD_n and WEIGHTS_n are stored normalized.
+        """
+        primitive = Primitive(attributes=Attributes(), material=material)
+        if mode is not None:
+            primitive.mode = mode
+        if indices is not None:
+            primitive.indices = self.add_indices(indices)
+        for semantic, values in attributes.items():
+            values = np.asarray(values)
+            normalized = values.dtype.kind in "iu" and semantic.startswith(("COLOR_", "TEXCOORD_", "WEIGHTS_"))
+            setattr(primitive.attributes, semantic, self.add_accessor(values, target=ARRAY_BUFFER,
+                                                                      normalized=normalized))
+        return primitive
+
+    def add_mesh(self, primitives, name=None):
+        """ Add a mesh made of primitives and return its index """
+        self.gltf.meshes.append(Mesh(primitives=list(primitives), name=name))
+        return len(self.gltf.meshes) - 1
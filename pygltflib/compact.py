@@ -0,0 +1,300 @@
+"""
+pygltflib.compact : Memory compact versions of the pygltflib Property classes.
+
+Every class in pygltflib (Accessor, BufferView, Node, Primitive, ...) has a compact twin here with the same name,
+fields, defaults and json handling, but stored in __slots__ instead of a per-instance __dict__. The extensions and
+extras dicts are not allocated per object: an unset one reads as an empty dict that is only stored on the object
+when something is written to it. Attributes keeps the standard semantics in slots and only allocates a dict for
+custom attributes.
+
+Load a GLTF2 with compact classes using GLTF2.load(fname, compact=True). The GLTF2 object itself is the regular
+class, only the objects in its arrays are compact. The compact classes are registered as virtual subclasses of the
+regular ones by register(), which loading with compact=True calls, so isinstance checks against pygltflib.Node etc.
+keep working. Importing this module does not change pygltflib.
+"""
+import copy
+from dataclasses import MISSING, fields
+import json
+from typing import List, Union, get_args, get_origin
+
+import pygltflib
+
+
+class _PendingDict(dict):
+    """
+    The empty dict returned for an unset extensions/extras slot. It attaches itself to the owner on first write,
+    so objects that never get extensions or extras never allocate them. Writes through a pending dict taken before
+    another one was attached go to the attached dict, which this one then mirrors.
+    """
+    __slots__ = ("_owner", "_slot")
+
+    def __init__(self, *args, **kwargs):
+        # behaves as a plain dict when created the usual way (eg by dataclasses.asdict)
+        super().__init__(*args, **kwargs)
+        self._owner = None
+        self._slot = None
+
+    @classmethod
+    def for_slot(cls, owner, slot):
+        pending = cls()
+        pending._owner = owner
+        pending._slot = slot
+        return pending
+
+    def _write(self, method, *args, attach=True, **kwargs):
+        # call the dict method on the dict stored in the slot, which is this one if the slot is still unset (and
+        # attach is True, removals leave an unset slot alone)
+        store = self
+        if self._owner is not None:
+            store = getattr(self._owner, self._slot)
+            if store is None:
+                if attach:
+                    setattr(self._owner, self._slot, self)
+                store = self
+        if store is self:
+            return getattr(dict, method)(self, *args, **kwargs)
+        result = getattr(store, method)(*args, **kwargs)
+        dict.clear(self)
+        dict.update(self, store)
+        return result
+
+    def __setitem__(self, key, value):
+        self._write("__setitem__", key, value)
+
+    def __delitem__(self, key):
+        self._write("__delitem__", key, attach=False)
+
+    def __ior__(self, other):
+        self._write("update", other)
+        return self
+
+    def update(self, *args, **kwargs):
+        self._write("update", *args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        return self._write("setdefault", key, default)
+
+    def pop(self, *args):
+        return self._write("pop", *args, attach=False)
+
+    def popitem(self):
+        return self._write("popitem", attach=False)
+
+    def clear(self):
+        self._write("clear", attach=False)
+
+    def __reduce__(self):
+        # copies and pickles are plain dicts
+        return dict, (dict(self),)
+
+
+class _OptionalDict:
+    """ Descriptor for the extensions/extras fields, backed by a slot that stays None until written to. """
+
+    def __init__(self, slot):
+        self.slot = slot
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        return _PendingDict.for_slot(obj, self.slot) if value is None else value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.slot, value)
+
+
+OPTIONAL_DICT_FIELDS = ("extensions", "extras")
+STANDARD_ATTRIBUTES = ("POSITION", "NORMAL", "TANGENT", "TEXCOORD_0", "TEXCOORD_1", "COLOR_0", "JOINTS_0",
+                       "WEIGHTS_0")
+
+
+class Attributes:
+    """
+    Compact pygltflib.Attributes: the standard semantics are slots, custom attributes (eg TEXCOORD_2 or
+    _CUSTOM) go into a dict that is only created when the first one is set.
+    """
+    __slots__ = STANDARD_ATTRIBUTES + ("_custom",)
+
+    def __init__(self,
+                 POSITION=None,
+                 NORMAL=None,
+                 TANGENT=None,
+                 TEXCOORD_0=None,
+                 TEXCOORD_1=None,
+                 COLOR_0=None,
+                 JOINTS_0=None,
+                 WEIGHTS_0=None, *args, **kwargs):
+        object.__setattr__(self, "_custom", None)
+        self.POSITION = POSITION
+        self.NORMAL = NORMAL
+        self.TANGENT = TANGENT
+        self.TEXCOORD_0 = TEXCOORD_0
+        self.TEXCOORD_1 = TEXCOORD_1
+        self.COLOR_0 = COLOR_0
+        self.JOINTS_0 = JOINTS_0
+        self.WEIGHTS_0 = WEIGHTS_0
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def __getattr__(self, name):
+        # only called for names that are not slots
+        custom = object.__getattribute__(self, "_custom")
+        if custom is not None and name in custom:
+            return custom[name]
+        raise AttributeError(f"'{self.__class__.__qualname__}' object has no attribute '{name}'")
+
+    def __setattr__(self, name, value):
+        if name in STANDARD_ATTRIBUTES:
+            object.__setattr__(self, name, value)
+        else:
+            if self._custom is None:
+                object.__setattr__(self, "_custom", {})
+            self._custom[name] = value
+
+    def __delattr__(self, name):
+        if name in STANDARD_ATTRIBUTES:
+            object.__setattr__(self, name, None)
+        elif self._custom is not None and name in self._custom:
+            del self._custom[name]
+        else:
+            raise AttributeError(name)
+
+    @property
+    def __dict__(self):
+        # the same mapping pygltflib.Attributes.__dict__ would hold, used for json output and repr
+        data = {name: getattr(self, name) for name in STANDARD_ATTRIBUTES}
+        if self._custom:
+            data.update(self._custom)
+        return data
+
+    def __getstate__(self):
+        return self.__dict__
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.__dict__ == other.__dict__
+
+    def __repr__(self):
+        return self.__class__.__qualname__ + '(' + ', '.join([f"{f}={v}" for f, v in self.__dict__.items()]) + ')'
+
+    def to_json(self, *args, **kwargs):
+        return json.dumps(copy.deepcopy(self.__dict__))
+
+
+def _compact_type(field_type, classes):
+    # rewrite a field type hint so it refers to the compact classes
+    if field_type in classes:
+        return classes[field_type]
+    origin = get_origin(field_type)
+    if origin is Union:
+        return Union[tuple(_compact_type(arg, classes) for arg in get_args(field_type))]
+    if origin is list:
+        return List[_compact_type(get_args(field_type)[0], classes)]
+    return field_type
+
+
+def _make_compact(cls, classes):
+    """ Create the __slots__ version of the dataclass cls, sharing its fields and defaults. """
+    dataclass_fields = {}
+    for f in fields(cls):
+        compact_field = copy.copy(f)
+        compact_field.type = _compact_type(f.type, classes)
+        dataclass_fields[f.name] = compact_field
+
+    slots = tuple("_" + name if name in OPTIONAL_DICT_FIELDS else name for name in dataclass_fields)
+    namespace = {"MISSING": MISSING}
+    arguments = []
+    body = []
+    for name, f in dataclass_fields.items():
+        if name in OPTIONAL_DICT_FIELDS:
+            arguments.append(f"{name}=None")
+            body.append(f"    self._{name} = {name}")
+        elif f.default_factory is not MISSING:
+            namespace[f"factory_{name}"] = f.default_factory
+            arguments.append(f"{name}=MISSING")
+            body.append(f"    self.{name} = factory_{name}() if {name} is MISSING else {name}")
+        else:
+            namespace[f"default_{name}"] = f.default
+            arguments.append(f"{name}=default_{name}")
+            body.append(f"    self.{name} = {name}")
+    exec(f"def __init__(self, {', '.join(arguments)}):\n" + "\n".join(body), namespace)
+
+    names = tuple(dataclass_fields)
+
+    def __repr__(self):
+        return f"{cls.__qualname__}(" + ", ".join(f"{name}={getattr(self, name)!r}" for name in names) + ")"
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in names)
+
+    class_namespace = {
+        "__slots__": slots,
+        "__dataclass_fields__": dataclass_fields,
+        "__dataclass_params__": cls.__dataclass_params__,
+        "__match_args__": names,
+        "__init__": namespace["__init__"],
+        "__repr__": __repr__,
+        "__eq__": __eq__,
+        "__hash__": None,
+        "__module__": __name__,
+        "__qualname__": cls.__qualname__,
+        "__doc__": f"Compact (__slots__) version of pygltflib.{cls.__qualname__}",
+    }
+    for name in OPTIONAL_DICT_FIELDS:
+        class_namespace[name] = _OptionalDict("_" + name)
+    return type(cls.__name__, (), class_namespace)
+
+
+def _dependencies_first(classes):
+    # order the classes so that the classes used in field types are created before the classes using them
+    ordered = []
+
+    def visit(cls):
+        if cls in ordered:
+            return
+        for f in fields(cls):
+            for used in _used_classes(f.type):
+                if used in classes:
+                    visit(used)
+        ordered.append(cls)
+
+    for cls in classes:
+        visit(cls)
+    return ordered
+
+
+def _used_classes(field_type):
+    if hasattr(field_type, "__dataclass_fields__"):
+        return [field_type]
+    return [cls for arg in get_args(field_type) for cls in _used_classes(arg)]
+
+
+_ORIGINAL_CLASSES = [
+    obj for obj in vars(pygltflib).values()
+    if isinstance(obj, type) and issubclass(obj, pygltflib.Property) and obj not in (pygltflib.Property,
+                                                                                     pygltflib.GLTF2)
+]
+
+COMPACT_CLASSES = {pygltflib.Attributes: Attributes}  # pygltflib class: compact class
+for _cls in _dependencies_first(_ORIGINAL_CLASSES):
+    COMPACT_CLASSES[_cls] = globals()[_cls.__name__] = _make_compact(_cls, COMPACT_CLASSES)
+
+# the compact class of the items in each of the top level GLTF2 arrays, eg "nodes": compact.Node
+GLTF2_ARRAY_TYPES = {name: COMPACT_CLASSES[cls] for name, cls in pygltflib.GLTF2_ARRAY_TYPES.items()}
+
+
+def register():
+    """
+    Register each compact class as a virtual subclass of its pygltflib class, so isinstance(node, pygltflib.Node)
+    holds for compact nodes and compact objects are written as json like the regular ones. GLTF2.load and
+    GLTF2.from_json call this when compact=True, call it before using the compact classes directly.
+    """
+    for cls, compact_cls in COMPACT_CLASSES.items():
+        cls.register(compact_cls)
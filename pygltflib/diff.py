@@ -0,0 +1,156 @@
+"""
+pygltflib.diff : Structural fingerprints of GLTF2 objects, and the differences between two versions of a file.
+
+The fingerprint of an object is a hash of its own fields together with the fingerprints of the objects it refers
+to, rather than their indices: a mesh's fingerprint covers its accessors and their data, and its materials, whose
+fingerprints cover their textures, samplers and image data. Objects that are only moved to another index keep their
+fingerprint, and an edit to an image or accessor changes the fingerprint of everything that uses it.
+"""
+from collections import namedtuple
+from dataclasses import fields, is_dataclass
+import hashlib
+import json
+from pathlib import Path
+from urllib.parse import unquote
+
+from . import ATTRIBUTES_CLASSES, gltf_asdict, json_serial, map_file
+from .references import object_references
+
+# the kinds of object that are fingerprinted, each after the kinds it refers to (node children, skin joints and
+# animation targets are hashed by index, since nodes refer to each other)
+FINGERPRINT_KINDS = (
+    "bufferViews",
+    "accessors",
+    "images",
+    "samplers",
+    "textures",
+    "materials",
+    "meshes",
+    "cameras",
+    "skins",
+    "nodes",
+    "scenes",
+    "animations",
+)
+
+StructuralDiff = namedtuple("StructuralDiff", ["added", "removed", "changed", "unchanged"])
+
+
+def _buffer_view_digest(gltf, index, buffer_view):
+    digest = hashlib.blake2b(digest_size=16)
+    data = gltf.get_data_from_buffer_view(index)
+    if data is None:  # no data to hash, so hash where it is
+        digest.update(json.dumps(gltf_asdict(buffer_view), sort_keys=True).encode("utf-8"))
+    else:
+        digest.update(data)
+        digest.update(json.dumps([buffer_view.byteLength, buffer_view.byteStride, buffer_view.target]).encode("utf-8"))
+    return digest.digest()
+
+
+def _image_file_digest(gltf, uri):
+    image_path = Path(getattr(gltf, "_path", Path()), unquote(uri))
+    if not image_path.is_file():
+        return b"missing"
+    if image_path.stat().st_size == 0:
+        return hashlib.blake2b(b"", digest_size=16).digest()
+    return hashlib.blake2b(map_file(image_path), digest_size=16).digest()
+
+
+def _copied_containers(obj, copied, containers):
+    # map the id of obj and of every object, list and dict inside it to its copies in copied, from gltf_asdict(obj)
+    containers.setdefault(id(obj), []).append(copied)
+    if isinstance(obj, dict):
+        items = obj.items()
+    elif isinstance(obj, list):
+        items = enumerate(obj)
+    elif isinstance(obj, ATTRIBUTES_CLASSES):  # copied from __dict__, with any custom semantics
+        items = vars(obj).items()
+    elif is_dataclass(obj):
+        items = ((f.name, getattr(obj, f.name)) for f in fields(obj))
+    else:
+        return
+    for key, value in items:
+        if isinstance(value, (dict, list) + ATTRIBUTES_CLASSES) or is_dataclass(value):
+            _copied_containers(value, copied[key], containers)
+
+
+def _object_digest(gltf, kind, obj, digests):
+    # hash obj with its references to fingerprinted kinds replaced by the fingerprints they point to
+    references = [(reference_kind, reference) for reference_kind, reference in object_references(kind, obj)
+                  if reference_kind in digests]
+    values = [reference.get() for _, reference in references]
+    copied = gltf_asdict(obj)
+    containers = {}
+    _copied_containers(obj, copied, containers)
+    for _, reference in references:
+        for container in containers[id(reference.owner)]:
+            container[reference.key] = None
+    encoded = json.dumps(copied, sort_keys=True, default=json_serial)
+
+    digest = hashlib.blake2b(encoded.encode("utf-8"), digest_size=16)
+    for (reference_kind, _), value in zip(references, values):
+        kind_digests = digests[reference_kind]
+        digest.update(kind_digests[value] if isinstance(value, int) and 0 <= value < len(kind_digests) else b"?")
+    if kind == "images" and obj.uri and not obj.uri.startswith("data:"):
+        digest.update(_image_file_digest(gltf, obj.uri))
+    return digest.digest()
+
+
+def fingerprints(gltf):
+    """
+    The fingerprint of every object in a GLTF2.
+
+    Reads all the bufferView data and image files, so a changed vertex or texel changes the fingerprints.
+
+    Returns
+        (dict): {kind: [hex fingerprint of each object]}, eg {"nodes": ["9f0c...", ...], ...}
+    """
+    digests = {}
+    for kind in FINGERPRINT_KINDS:
+        if kind == "bufferViews":
+            digests[kind] = [_buffer_view_digest(gltf, i, buffer_view)
+                             for i, buffer_view in enumerate(gltf.bufferViews)]
+        else:
+            digests[kind] = [_object_digest(gltf, kind, obj, digests) for obj in getattr(gltf, kind)]
+    return {kind: [digest.hex() for digest in kind_digests] for kind, kind_digests in digests.items()}
+
+
+def named_fingerprints(gltf, kind, all_fingerprints=None):
+    """
+    The fingerprints of the objects of kind keyed by name, so versions of a file can be compared even when
+    objects were added or removed before them. A repeated name is keyed by the number of times it has been seen, eg
+    "Tree", "Tree#2", "Tree#3", and unnamed objects as "#1", "#2", etc.
+
+    all_fingerprints (dict): The result of fingerprints(gltf), if already computed
+    """
+    if all_fingerprints is None:
+        all_fingerprints = fingerprints(gltf)
+    keys = []
+    counts = {}
+    for obj in getattr(gltf, kind):
+        name = getattr(obj, "name", None)
+        counts[name] = counts.get(name, 0) + 1
+        if name is None:
+            keys.append(f"#{counts[name]}")
+        else:
+            keys.append(name if counts[name] == 1 else f"{name}#{counts[name]}")
+    return dict(zip(keys, all_fingerprints[kind]))
+
+
+def diff_fingerprints(old, new):
+    """
+    Compare two {key: fingerprint} dicts (eg from named_fingerprints, or loaded from a build manifest).
+
+    Returns
+        (StructuralDiff): sets of the keys that were added, removed, changed and left unchanged
+    """
+    added = set(new) - set(old)
+    removed = set(old) - set(new)
+    changed = {key for key in set(new) & set(old) if new[key] != old[key]}
+    unchanged = set(new) - added - changed
+    return StructuralDiff(added, removed, changed, unchanged)
+
+
+def diff(old, new, kind="nodes"):
+    """ The StructuralDiff of the objects of kind in two GLTF2 objects, matched by name (see named_fingerprints) """
+    return diff_fingerprints(named_fingerprints(old, kind), named_fingerprints(new, kind))
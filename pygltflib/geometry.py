@@ -0,0 +1,707 @@
+"""
+pygltflib.geometry : Process mesh geometry with NumPy: weld duplicate vertices, remove degenerate triangles,
+reorder triangles and vertices for the GPU and quantize vertex attributes.
+
+Vertices are welded by snapping every attribute value to a grid of its epsilon and grouping the vertices whose
+snapped values are all the same, so values closer than epsilon are merged unless they fall either side of a grid
+line. The first vertex of each group is kept. The functions taking arrays can be used on their own, the *_meshes
+functions apply them to the primitives of a GLTF2 and rewrite its accessors.
+"""
+import numpy as np
+
+from . import ARRAY_BUFFER, BYTE, FLOAT, SHORT, TRIANGLES, UNSIGNED_BYTE, UNSIGNED_SHORT, Node
+from .arrays import GeometryBuilder, accessor_array, element_layout
+from .references import _attribute_items
+from .spatial import trs_matrices
+
+# welding tolerances by attribute semantic, TEXCOORD applies to TEXCOORD_0, TEXCOORD_1, etc. Integer values (eg
+# JOINTS_0, normalized colors) are always compared exactly.
+WELD_EPSILONS = {
+    "POSITION": 1e-6,
+    "NORMAL": 1e-4,
+    "TANGENT": 1e-4,
+    "TEXCOORD": 1e-6,
+    "COLOR": 1e-4,
+    "WEIGHTS": 1e-5,
+}
+WELD_EPSILON = 1e-6  # for the semantics not in WELD_EPSILONS, eg custom _ATTRIBUTES
+
+_FNV_OFFSET = np.uint64(14695981039346656037)
+_FNV_PRIME = np.uint64(1099511628211)
+
+
+def _epsilon(name, epsilons):
+    # names are semantics, or (morph target, semantic) for morph targets
+    semantic = name[-1] if isinstance(name, tuple) else name
+    for table in (epsilons or {}, WELD_EPSILONS):
+        if semantic in table:
+            return table[semantic]
+        if semantic.split("_")[0] in table:
+            return table[semantic.split("_")[0]]
+    return WELD_EPSILON
+
+
+def _quantize(values, epsilon):
+    # the grid cell of each value as int64 columns
+    values = np.asarray(values).reshape(len(values), -1)
+    if values.dtype.kind != "f":
+        return values.astype(np.int64)
+    return np.floor(values / epsilon + 0.5).astype(np.int64)
+
+
+def _hash_rows(keys):
+    # a 64 bit FNV style hash of each row of an int64 array
+    hashes = np.full(len(keys), _FNV_OFFSET)
+    with np.errstate(over="ignore"):
+        for column in keys.T:
+            hashes ^= column.view(np.uint64)
+            hashes *= _FNV_PRIME
+    return hashes
+
+
+def _group_rows(keys):
+    # (first, inverse): the first row of each group of equal rows, and the group of each row
+    _, first, inverse = np.unique(_hash_rows(keys), return_index=True, return_inverse=True)
+    if not np.array_equal(keys, keys[first[inverse]]):  # a hash collision, so group by the whole rows instead
+        rows = np.ascontiguousarray(keys).view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1])))[:, 0]
+        _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    return first, inverse.reshape(-1)
+
+
+def weld_vertices(attributes, epsilons=None):
+    """
+    Find the vertices that are the same in every attribute, within the epsilon of each attribute.
+
+    attributes (dict): {name: array of shape (count,) or (count, components)}, one value per vertex
+    epsilons (dict): Tolerances by semantic that replace the ones in WELD_EPSILONS, eg {"POSITION": 1e-4}
+
+    Returns
+        (vertices, remap): vertices is the index of the vertex kept for each welded vertex, in the order they
+        were first seen, remap is the welded vertex of each original vertex
+    """
+    keys = np.concatenate([_quantize(values, _epsilon(name, epsilons)) for name, values in attributes.items()],
+                          axis=1)
+    first, inverse = _group_rows(keys)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty(len(order), np.int64)
+    rank[order] = np.arange(len(order))
+    return first[order], rank[inverse]
+
+
+def degenerate_triangles(triangles, positions=None, area_epsilon=0.0):
+    """
+    Flag the triangles that repeat a vertex, or whose area is at most area_epsilon.
+
+    triangles (array): Vertex indices of shape (count, 3)
+    positions (array): Vertex positions of shape (vertices, 3), to also flag zero area triangles
+
+    Returns
+        (array): bool array of shape (count,), True for the degenerate triangles
+    """
+    triangles = np.asarray(triangles)
+    degenerate = ((triangles[:, 0] == triangles[:, 1]) | (triangles[:, 1] == triangles[:, 2]) |
+                  (triangles[:, 0] == triangles[:, 2]))
+    if positions is not None and len(triangles):
+        positions = np.asarray(positions, np.float64)
+        a, b, c = positions[triangles[:, 0]], positions[triangles[:, 1]], positions[triangles[:, 2]]
+        double_areas = np.linalg.norm(np.cross(b - a, c - a), axis=1)
+        degenerate |= double_areas <= 2 * area_epsilon
+    return degenerate
+
+
+def compact_vertices(indices, count):
+    """
+    Drop the vertices that no index refers to.
+
+    Returns
+        (vertices, remap): the vertices that are used, in their original order, and the new index of each of the
+        count original vertices (-1 for unused ones)
+    """
+    used = np.zeros(count, bool)
+    used[np.asarray(indices).reshape(-1)] = True
+    vertices = np.flatnonzero(used)
+    remap = np.full(count, -1, np.int64)
+    remap[vertices] = np.arange(len(vertices))
+    return vertices, remap
+
+
+def weld(attributes, indices=None, epsilons=None, area_epsilon=0.0):
+    """
+    Weld the vertices of a triangle list and remove its degenerate triangles and the vertices left unused.
+
+    attributes (dict): {semantic: array of shape (count,) or (count, components)}, with a POSITION array to
+        remove zero area triangles
+    indices (array): Triangle list vertex indices, or None for a list of unindexed triangles
+    epsilons (dict): Welding tolerances by semantic (see weld_vertices)
+    area_epsilon (float): Triangles with at most this area are removed
+
+    Returns
+        (attributes, indices): the welded attribute arrays and the triangle list indices into them
+    """
+    count = len(next(iter(attributes.values())))
+    indices = np.arange(count) if indices is None else np.asarray(indices).reshape(-1)
+    vertices, remap = weld_vertices(attributes, epsilons)
+    triangles = remap[indices[:len(indices) - len(indices) % 3]].reshape(-1, 3)
+    positions = np.asarray(attributes["POSITION"])[vertices] if "POSITION" in attributes else None
+    triangles = triangles[~degenerate_triangles(triangles, positions, area_epsilon)]
+    used, compact = compact_vertices(triangles, len(vertices))
+    vertices = vertices[used]
+    return {name: np.asarray(values)[vertices] for name, values in attributes.items()}, compact[triangles].reshape(-1)
+
+
+def _cache_misses(indices, cache_size):
+    # the number of indices that miss a FIFO cache of cache_size vertices
+    stamps = [0] * (max(indices) + 1)  # the time each vertex was last loaded into the cache
+    misses = 0
+    time = cache_size + 1
+    for vertex in indices:
+        if time - stamps[vertex] > cache_size:
+            stamps[vertex] = time
+            time += 1
+            misses += 1
+    return misses
+
+
+def cache_statistics(indices, cache_size=16):
+    """
+    How well a triangle list uses a FIFO post-transform vertex cache of cache_size vertices.
+
+    Returns
+        (acmr, atvr): the average cache miss ratio, vertices transformed per triangle (0.5 at best for large
+        meshes, 3 at worst), and the average transform to vertex ratio, vertices transformed per vertex used (1 at
+        best)
+    """
+    indices = np.asarray(indices).reshape(-1)
+    if not len(indices):
+        return 0.0, 0.0
+    misses = _cache_misses(indices.tolist(), cache_size)
+    return misses / (len(indices) // 3), misses / int(np.count_nonzero(np.bincount(indices)))
+
+
+def _tipsify(indices, cache_size):
+    # Tipsify (Sander, Nehab and Barczak, Fast Triangle Reordering for Vertex Locality and Reduced Overdraw, 2007):
+    # emit all the remaining triangles around a fanning vertex, then fan around the vertex among the ones just
+    # emitted that is still in the cache and has the fewest triangles left, falling back to the most recently
+    # emitted vertex with triangles left, or the next vertex with triangles left
+    vertex_count = int(indices.max()) + 1
+    live = np.bincount(indices, minlength=vertex_count)
+    offsets = np.zeros(vertex_count + 1, np.int64)
+    np.cumsum(live, out=offsets[1:])
+    adjacency = (np.argsort(indices, kind="stable") // 3).tolist()  # the triangles of each vertex
+    offsets = offsets.tolist()
+    live = live.tolist()
+    corners = indices.tolist()
+    stamps = [0] * vertex_count
+    emitted = bytearray(len(corners) // 3)
+    order = []
+    dead_end = []
+    time = cache_size + 1
+    cursor = 0
+    fan = corners[0]
+    while fan >= 0:
+        candidates = []
+        for triangle in adjacency[offsets[fan]:offsets[fan + 1]]:
+            if emitted[triangle]:
+                continue
+            emitted[triangle] = 1
+            order.append(triangle)
+            for vertex in corners[3 * triangle:3 * triangle + 3]:
+                dead_end.append(vertex)
+                candidates.append(vertex)
+                live[vertex] -= 1
+                if time - stamps[vertex] > cache_size:
+                    stamps[vertex] = time
+                    time += 1
+
+        fan = -1
+        best = -1
+        for vertex in candidates:
+            if live[vertex]:
+                age = time - stamps[vertex]
+                priority = age if age + 2 * live[vertex] <= cache_size else 0
+                if priority > best:
+                    fan, best = vertex, priority
+        if fan < 0:
+            while dead_end:
+                vertex = dead_end.pop()
+                if live[vertex]:
+                    fan = vertex
+                    break
+        if fan < 0:
+            while cursor < vertex_count and not live[cursor]:
+                cursor += 1
+            fan = cursor if cursor < vertex_count else -1
+    return np.array(order, np.int64)
+
+
+def optimize_vertex_cache(indices, cache_size=16):
+    """
+    Reorder the triangles of a triangle list to transform fewer vertices with a post-transform vertex cache (see
+    cache_statistics), using Tipsify. Any trailing indices that do not make a whole triangle are dropped.
+
+    Returns
+        (array): The reordered indices, flattened
+    """
+    indices = np.asarray(indices, np.int64).reshape(-1)
+    triangles = indices[:len(indices) - len(indices) % 3].reshape(-1, 3)
+    if not len(triangles):
+        return triangles.reshape(-1)
+    return triangles[_tipsify(triangles.reshape(-1), cache_size)].reshape(-1)
+
+
+def optimize_overdraw(indices, positions, cache_size=16, threshold=0.75):
+    """
+    Reorder clusters of triangles so that the ones facing out of the mesh are drawn first and hide what is behind
+    them, for less overdraw. Run it after optimize_vertex_cache.
+
+    The triangles are cut into runs of consecutive triangles that are each as cache efficient as threshold on their
+    own (their ACMR, see cache_statistics, with an empty cache at the start of each run), and the runs are sorted
+    by how far their average normal points away from the center of the mesh. A higher threshold gives shorter runs,
+    for less overdraw and more vertices transformed.
+
+    positions (array): Vertex positions of shape (vertices, 3)
+
+    Returns
+        (array): The reordered indices, flattened
+    """
+    indices = np.asarray(indices, np.int64).reshape(-1)
+    triangles = indices[:len(indices) - len(indices) % 3].reshape(-1, 3)
+    if not len(triangles):
+        return triangles.reshape(-1)
+
+    starts = [0]
+    stamps = [0] * (int(triangles.max()) + 1)
+    time = cache_size + 1
+    misses = 0
+    for triangle, corners in enumerate(triangles.tolist()):
+        for vertex in corners:
+            if time - stamps[vertex] > cache_size:
+                stamps[vertex] = time
+                time += 1
+                misses += 1
+        if misses <= threshold * (triangle + 1 - starts[-1]) and triangle + 1 < len(triangles):
+            starts.append(triangle + 1)  # start the next run with an empty cache
+            time += cache_size + 1
+            misses = 0
+
+    positions = np.asarray(positions, np.float64)
+    a, b, c = positions[triangles[:, 0]], positions[triangles[:, 1]], positions[triangles[:, 2]]
+    normals = np.cross(b - a, c - a)  # twice the area
+    areas = np.linalg.norm(normals, axis=1)[:, None]
+    centroids = (a + b + c) / 3
+    center = (centroids * areas).sum(axis=0) / max(areas.sum(), np.finfo(float).tiny)
+    run_normals = np.add.reduceat(normals, starts)
+    run_centroids = np.add.reduceat(centroids * areas, starts) / np.maximum(np.add.reduceat(areas, starts),
+                                                                             np.finfo(float).tiny)
+    lengths = np.linalg.norm(run_normals, axis=1)
+    keys = np.einsum("ij,ij->i", run_centroids - center, run_normals) / np.maximum(lengths, np.finfo(float).tiny)
+    ends = starts[1:] + [len(triangles)]
+    order = np.argsort(-keys, kind="stable")
+    return np.concatenate([triangles[starts[i]:ends[i]] for i in order]).reshape(-1)
+
+
+def optimize_vertex_fetch(indices, count):
+    """
+    Order vertices by when they are first used, so that the vertex data is read front to back.
+
+    Returns
+        (vertices, remap): the vertices that are used, in order of first use, and the new index of each of the
+        count original vertices (-1 for unused ones)
+    """
+    indices = np.asarray(indices).reshape(-1)
+    first = np.full(count, len(indices), np.int64)  # the position of the first use of each vertex
+    np.minimum.at(first, indices, np.arange(len(indices)))
+    vertices = np.argsort(first, kind="stable")[:np.count_nonzero(first < len(indices))]
+    remap = np.full(count, -1, np.int64)
+    remap[vertices] = np.arange(len(vertices))
+    return vertices, remap
+
+
+def _triangle_groups(gltf, meshes):
+    # the triangle list primitives of each mesh grouped by their vertex attributes and morph targets, as
+    # (attribute_items, target_items, primitives), skipping primitives with extensions or without POSITION
+    for mesh_index in range(len(gltf.meshes)) if meshes is None else meshes:
+        groups = {}
+        for primitive in gltf.meshes[mesh_index].primitives:
+            attribute_items = tuple(sorted(_attribute_items(primitive.attributes)))
+            if primitive.extensions or primitive.mode not in (None, TRIANGLES):
+                continue
+            if "POSITION" not in dict(attribute_items):
+                continue
+            target_items = tuple(tuple(sorted(_attribute_items(target))) for target in primitive.targets or [])
+            groups.setdefault((attribute_items, target_items), []).append(primitive)
+        for (attribute_items, target_items), primitives in groups.items():
+            yield attribute_items, target_items, primitives
+
+
+def _vertex_arrays(gltf, attribute_items, target_items):
+    # {semantic or (target, semantic): (accessor index, array)} without normalizing, so the values can be written
+    # back with the same componentType
+    arrays = {semantic: (accessor, accessor_array(gltf, accessor, normalized=False))
+              for semantic, accessor in attribute_items}
+    for target, items in enumerate(target_items):
+        for semantic, accessor in items:
+            arrays[(target, semantic)] = (accessor, accessor_array(gltf, accessor, normalized=False))
+    return arrays
+
+
+def _replace_vertices(gltf, builder, arrays, primitives, vertices, index_lists):
+    # write the vertices of arrays (as returned by _vertex_arrays) and the index list of each primitive as new
+    # accessors, returns the accessors they replace
+    replaced = {accessor for accessor, _ in arrays.values()}
+    new_accessors = {}
+    for name, (accessor, values) in arrays.items():
+        old = gltf.accessors[accessor]
+        new_accessors[name] = builder.add_accessor(values[vertices], old.type, old.componentType,
+                                                   target=ARRAY_BUFFER, normalized=bool(old.normalized),
+                                                   name=old.name)
+    for primitive, indices in zip(primitives, index_lists):
+        if primitive.indices is not None:
+            replaced.add(primitive.indices)
+        primitive.indices = builder.add_indices(indices)
+        for name, accessor in new_accessors.items():
+            if isinstance(name, tuple):
+                target = primitive.targets[name[0]]
+                if isinstance(target, dict):
+                    target[name[1]] = accessor
+                else:
+                    setattr(target, name[1], accessor)
+            else:
+                setattr(primitive.attributes, name, accessor)
+    return replaced
+
+
+def _remove_replaced(gltf, replaced):
+    # remove the replaced accessors that nothing else uses, and then their data
+    gltf.invalidate_index()
+    index = gltf.get_index()
+    removed = {i for i in replaced if not index.is_referenced("accessors", i)}
+    released = set()
+    for i in removed:
+        accessor = gltf.accessors[i]
+        released.add(accessor.bufferView)
+        if accessor.sparse:
+            released |= {accessor.sparse.indices.bufferView, accessor.sparse.values.bufferView}
+    gltf._remove_objects("accessors", removed)
+    index = gltf.get_index()
+    gltf._remove_objects("bufferViews", {i for i in released - {None} if not index.is_referenced("bufferViews", i)})
+    gltf.compact_binary_blob()
+
+
+def _weld_group(gltf, builder, arrays, primitives, epsilons, area_epsilon):
+    # weld the primitives sharing one set of vertex attributes, returns (vertices removed, triangles removed,
+    # accessors replaced) or None when nothing changed
+    count = len(arrays["POSITION"][1])
+    index_arrays = [accessor_array(gltf, primitive.indices) if primitive.indices is not None else np.arange(count)
+                    for primitive in primitives]
+
+    vertices, remap = weld_vertices({name: values for name, (_, values) in arrays.items()}, epsilons)
+    positions = arrays["POSITION"][1][vertices]
+    triangle_lists = []
+    triangles_removed = 0
+    for indices in index_arrays:
+        triangles = remap[indices[:len(indices) - len(indices) % 3]].reshape(-1, 3)
+        degenerate = degenerate_triangles(triangles, positions, area_epsilon)
+        triangles_removed += int(degenerate.sum())
+        triangle_lists.append(triangles[~degenerate])
+    if not any(len(triangles) for triangles in triangle_lists):  # leave primitives that would be empty alone
+        return None
+    used, compact = compact_vertices(np.concatenate(triangle_lists), len(vertices))
+    vertices = vertices[used]
+    if len(vertices) == count and not triangles_removed and all(p.indices is not None for p in primitives):
+        return None
+    replaced = _replace_vertices(gltf, builder, arrays, primitives, vertices,
+                                 [compact[triangles] for triangles in triangle_lists])
+    return count - len(vertices), triangles_removed, replaced
+
+
+def weld_meshes(gltf, meshes=None, epsilons=None, area_epsilon=0.0):
+    """
+    Weld the vertices of the triangle list primitives of a GLTF2 and remove their degenerate triangles (see weld).
+
+    Primitives that share their vertex attributes are welded together and keep sharing them. The welded data is
+    appended to the binary blob, and the accessors, bufferViews and bytes it replaces are removed. Primitives with
+    extensions (eg KHR_draco_mesh_compression) or without POSITION are left alone.
+
+    meshes (list): Indices of the meshes to weld, default all of them
+    epsilons (dict): Welding tolerances by semantic (see weld_vertices)
+    area_epsilon (float): Triangles with at most this area are removed
+
+    Returns
+        (dict): {"vertices": vertices removed, "triangles": triangles removed}
+    """
+    report = {"vertices": 0, "triangles": 0}
+    replaced = set()
+    with GeometryBuilder(gltf) as builder:
+        for attribute_items, target_items, primitives in list(_triangle_groups(gltf, meshes)):
+            arrays = _vertex_arrays(gltf, attribute_items, target_items)
+            welded = _weld_group(gltf, builder, arrays, primitives, epsilons, area_epsilon)
+            if welded is not None:
+                report["vertices"] += welded[0]
+                report["triangles"] += welded[1]
+                replaced |= welded[2]
+    if replaced:
+        _remove_replaced(gltf, replaced)
+    return report
+
+
+def _optimize_group(gltf, builder, arrays, primitives, cache_size, overdraw, overdraw_threshold, totals):
+    # reorder the triangles of the primitives sharing one set of vertex attributes and then their vertices, adds
+    # the cache statistics to totals, returns the accessors replaced or None when nothing changed
+    positions = arrays["POSITION"][1]
+    old_lists = [accessor_array(gltf, primitive.indices).astype(np.int64) for primitive in primitives]
+    new_lists = []
+    for indices in old_lists:
+        reordered = optimize_vertex_cache(indices, cache_size)
+        if overdraw:
+            reordered = optimize_overdraw(reordered, positions, cache_size, overdraw_threshold)
+        if len(reordered):
+            totals["triangles"] += len(reordered) // 3
+            totals["vertices"] += int(np.count_nonzero(np.bincount(reordered)))
+            totals["misses_before"] += _cache_misses(indices[:len(reordered)].tolist(), cache_size)
+            totals["misses_after"] += _cache_misses(reordered.tolist(), cache_size)
+        new_lists.append(reordered)
+
+    vertices, remap = optimize_vertex_fetch(np.concatenate(new_lists), len(positions))
+    new_lists = [remap[indices] for indices in new_lists]
+    if (len(vertices) == len(positions) and np.array_equal(vertices, np.arange(len(positions))) and
+            all(np.array_equal(old, new) for old, new in zip(old_lists, new_lists))):
+        return None
+    return _replace_vertices(gltf, builder, arrays, primitives, vertices, new_lists)
+
+
+def optimize_meshes(gltf, meshes=None, cache_size=16, overdraw=False, overdraw_threshold=0.75):
+    """
+    Reorder the triangles and vertices of the indexed triangle list primitives of a GLTF2 for rendering: the
+    triangles for the post-transform vertex cache (optimize_vertex_cache) and optionally for less overdraw
+    (optimize_overdraw), then the vertices in order of first use (optimize_vertex_fetch).
+
+    Primitives that share their vertex attributes keep sharing them. The reordered data is appended to the binary
+    blob, and the accessors, bufferViews and bytes it replaces are removed. Primitives without indices (weld them
+    first), with extensions or without POSITION are left alone.
+
+    meshes (list): Indices of the meshes to optimize, default all of them
+    cache_size (int): Vertices in the simulated FIFO cache
+    overdraw (bool): Also sort clusters of triangles to reduce overdraw, at the cost of some cache efficiency
+    overdraw_threshold (float): The ACMR of a cluster (see optimize_overdraw)
+
+    Returns
+        (dict): {"triangles": triangles reordered, "acmr_before", "acmr_after", "atvr_before", "atvr_after"}
+        cache statistics of all the reordered primitives (see cache_statistics)
+    """
+    totals = {"triangles": 0, "vertices": 0, "misses_before": 0, "misses_after": 0}
+    replaced = set()
+    with GeometryBuilder(gltf) as builder:
+        for attribute_items, target_items, primitives in list(_triangle_groups(gltf, meshes)):
+            if any(primitive.indices is None for primitive in primitives):
+                continue
+            arrays = _vertex_arrays(gltf, attribute_items, target_items)
+            replaced |= _optimize_group(gltf, builder, arrays, primitives, cache_size, overdraw, overdraw_threshold,
+                                        totals) or set()
+    if replaced:
+        _remove_replaced(gltf, replaced)
+
+    triangles = max(totals["triangles"], 1)
+    vertices = max(totals["vertices"], 1)
+    return {
+        "triangles": totals["triangles"],
+        "acmr_before": totals["misses_before"] / triangles,
+        "acmr_after": totals["misses_after"] / triangles,
+        "atvr_before": totals["misses_before"] / vertices,
+        "atvr_after": totals["misses_after"] / vertices,
+    }
+
+
+KHR_MESH_QUANTIZATION = "KHR_mesh_quantization"
+
+
+def quantize_positions(positions, bits=16):
+    """
+    Quantize positions to unsigned integers of bits (at most 16) on a uniform grid covering their bounds.
+
+    Returns
+        (values, offset, step): the integer positions, uint8 for 8 bits or less and uint16 otherwise, and the
+        dequantization transform, positions = offset + values * step
+    """
+    positions = np.asarray(positions, np.float64)
+    offset = positions.min(axis=0)
+    step = float((positions.max(axis=0) - offset).max()) / (2 ** bits - 1) or 1.0
+    dtype = np.uint8 if bits <= 8 else np.uint16
+    return np.rint((positions - offset) / step).astype(dtype), offset, step
+
+
+def quantize_normals(normals, bits=8):
+    """
+    Quantize normals, or tangents with their w sign, to normalized signed integers of bits (at most 16). The x, y
+    and z are normalized first.
+
+    Returns
+        (array): int8 values for 8 bits or less, int16 otherwise, to store as normalized BYTE or SHORT
+    """
+    normals = np.array(normals, np.float64)
+    length = np.linalg.norm(normals[:, :3], axis=1, keepdims=True)
+    normals[:, :3] /= np.where(length > 0, length, 1)
+    dtype = np.int8 if bits <= 8 else np.int16
+    return np.rint(np.clip(normals, -1, 1) * (2 ** (bits - 1) - 1)).astype(dtype)
+
+
+def quantize_texcoords(texcoords, bits=16):
+    """
+    Quantize texture coordinates in the 0 to 1 range to normalized unsigned integers of bits (at most 16).
+
+    Returns
+        (array): uint8 values for 8 bits or less, uint16 otherwise, to store as normalized UNSIGNED_BYTE or
+        UNSIGNED_SHORT, or None when the coordinates go outside 0 to 1 (eg tiling textures) and can not be stored
+        that way
+    """
+    texcoords = np.asarray(texcoords, np.float64)
+    if len(texcoords) and (texcoords.min() < 0 or texcoords.max() > 1):
+        return None
+    dtype = np.uint8 if bits <= 8 else np.uint16
+    return np.rint(texcoords * (2 ** bits - 1)).astype(dtype)
+
+
+def _component_type(dtype):
+    return {np.dtype(np.int8): BYTE, np.dtype(np.uint8): UNSIGNED_BYTE, np.dtype(np.int16): SHORT,
+            np.dtype(np.uint16): UNSIGNED_SHORT}[np.dtype(dtype)]
+
+
+def _vertex_bytes(gltf, accessor):
+    # the bytes the vertices of an accessor take in its bufferView
+    buffer_view = gltf.bufferViews[accessor.bufferView] if accessor.bufferView is not None else None
+    _, _, element_size = element_layout(accessor.componentType, accessor.type)
+    return accessor.count * (buffer_view and buffer_view.byteStride or element_size)
+
+
+def _fold_dequantization(gltf, node_index, offset, step, moved):
+    # apply the dequantization transform of the mesh of a node, directly to its transform when that only affects
+    # the mesh, otherwise on a new child node the mesh is moved to
+    node = gltf.nodes[node_index]
+    if node.children or node.camera is not None or node.extensions or node_index in moved:
+        child = Node(mesh=node.mesh, translation=offset.tolist(), scale=[step] * 3)
+        gltf.nodes.append(child)
+        node.children = (node.children or []) + [len(gltf.nodes) - 1]
+        node.mesh = None
+        return
+    dequantization = np.diag([step, step, step, 1.0])
+    dequantization[:3, 3] = offset
+    if node.matrix is not None:
+        matrix = np.array(node.matrix, np.float64).reshape(4, 4).T @ dequantization
+        node.matrix = matrix.T.reshape(-1).tolist()
+        return
+    translation = np.array(node.translation if node.translation is not None else [0, 0, 0], np.float64)
+    rotation = node.rotation if node.rotation is not None else [0, 0, 0, 1]
+    scale = np.array(node.scale if node.scale is not None else [1, 1, 1], np.float64)
+    matrix = trs_matrices([translation], [rotation], [scale])[0]
+    node.translation = (translation + matrix[:3, :3] @ offset).tolist()
+    node.scale = (scale * step).tolist()
+
+
+def _quantize_attribute(gltf, builder, semantic, accessor_index, bits, position_transform, report):
+    # the index of a quantized copy of a FLOAT accessor, or None to keep it
+    accessor = gltf.accessors[accessor_index]
+    values = accessor_array(gltf, accessor_index)
+    if semantic == "POSITION":
+        offset, step = position_transform
+        quantized = np.rint((values - offset) / step).astype(np.uint8 if bits["POSITION"] <= 8 else np.uint16)
+        dequantized = offset + quantized * step
+        normalized = False
+    elif semantic in ("NORMAL", "TANGENT"):
+        quantized = quantize_normals(values, bits["NORMAL"])
+        dequantized = np.maximum(quantized / np.iinfo(quantized.dtype).max, -1)
+        normalized = True
+    else:
+        quantized = quantize_texcoords(values, bits["TEXCOORD"])
+        if quantized is None:
+            return None
+        dequantized = quantized / np.iinfo(quantized.dtype).max
+        normalized = True
+    if semantic in ("NORMAL", "TANGENT"):  # measure against the normalized vectors that were quantized
+        length = np.linalg.norm(values[:, :3], axis=1, keepdims=True)
+        values = np.concatenate([values[:, :3] / np.where(length > 0, length, 1), values[:, 3:]], axis=1)
+    error = float(np.abs(dequantized - values).max()) if len(values) else 0.0
+    report["errors"][semantic] = max(report["errors"].get(semantic, 0.0), error)
+    new_index = builder.add_accessor(quantized, accessor.type, _component_type(quantized.dtype), target=ARRAY_BUFFER,
+                                     normalized=normalized, name=accessor.name)
+    report["bytes_before"] += _vertex_bytes(gltf, accessor)
+    report["bytes_after"] += _vertex_bytes(gltf, gltf.accessors[new_index])
+    return new_index
+
+
+def quantize_meshes(gltf, meshes=None, position_bits=16, normal_bits=8, texcoord_bits=16):
+    """
+    Store the FLOAT positions, normals, tangents and texture coordinates of mesh primitives as integers, using
+    KHR_mesh_quantization, which is added to extensionsUsed and extensionsRequired.
+
+    Positions become unsigned integers on a grid covering the bounds of each mesh, and the dequantization transform
+    is folded into the nodes that use the mesh, or into a new child node holding the mesh when the node has
+    children, a camera, extensions or animated transforms, or is a joint. Normals and tangents become normalized
+    signed integers, and texture coordinates normalized unsigned integers when they are all between 0 and 1.
+
+    Positions are left alone for meshes that are skinned, instanced with EXT_mesh_gpu_instancing, or not used by
+    any node. Primitives with morph targets or extensions (eg KHR_draco_mesh_compression) are left alone.
+
+    meshes (list): Indices of the meshes to quantize, default all of them
+    position_bits (int): Bits of each position component, at most 16
+    normal_bits (int): Bits of each normal and tangent component, at most 16
+    texcoord_bits (int): Bits of each texture coordinate component, at most 16
+
+    Returns
+        (dict): {"bytes_before": vertex bytes replaced, "bytes_after": vertex bytes written, "errors": {semantic:
+        largest absolute difference of a component from its original value}}
+    """
+    bits = {"POSITION": position_bits, "NORMAL": normal_bits, "TEXCOORD": texcoord_bits}
+    meshes = range(len(gltf.meshes)) if meshes is None else meshes
+    report = {"bytes_before": 0, "bytes_after": 0, "errors": {}}
+    users = {}  # mesh index: the nodes using it
+    for i, node in enumerate(gltf.nodes):
+        if node.mesh is not None:
+            users.setdefault(node.mesh, []).append(i)
+    moved = {joint for skin in gltf.skins for joint in skin.joints or []}
+    moved |= {channel.target.node for animation in gltf.animations for channel in animation.channels
+              if channel.target and channel.target.path != "weights"}
+
+    quantized = {}  # (semantic, accessor, position transform): quantized accessor
+    replaced = set()
+    with GeometryBuilder(gltf) as builder:
+        for mesh_index in meshes:
+            primitives = [primitive for primitive in gltf.meshes[mesh_index].primitives
+                          if not primitive.targets and not primitive.extensions]
+            nodes = users.get(mesh_index, [])
+            position_accessors = [primitive.attributes.POSITION for primitive in primitives]
+            # the node transforms change for all the primitives, so they all need positions that can be quantized
+            transform = None
+            if (nodes and primitives and len(primitives) == len(gltf.meshes[mesh_index].primitives) and
+                    all(i is not None and gltf.accessors[i].componentType == FLOAT for i in position_accessors) and
+                    not any(gltf.nodes[i].skin is not None or "EXT_mesh_gpu_instancing" in (
+                        gltf.nodes[i].extensions or {}) for i in nodes)):
+                _, offset, step = quantize_positions(np.concatenate(
+                    [accessor_array(gltf, i) for i in position_accessors]), position_bits)
+                transform = (offset, step)
+
+            for primitive in primitives:
+                for semantic, accessor_index in _attribute_items(primitive.attributes):
+                    if gltf.accessors[accessor_index].componentType != FLOAT:
+                        continue
+                    if semantic == "POSITION" and transform is None:
+                        continue
+                    if semantic not in ("POSITION", "NORMAL", "TANGENT") and not semantic.startswith("TEXCOORD_"):
+                        continue
+                    key = (semantic, accessor_index, None if semantic != "POSITION" else
+                           (tuple(transform[0].tolist()), transform[1]))
+                    if key not in quantized:
+                        quantized[key] = _quantize_attribute(gltf, builder, semantic, accessor_index, bits,
+                                                             transform, report)
+                    if quantized[key] is not None:
+                        setattr(primitive.attributes, semantic, quantized[key])
+                        replaced.add(accessor_index)
+            if transform is not None:
+                for i in nodes:
+                    _fold_dequantization(gltf, i, transform[0], transform[1], moved)
+
+    if replaced:
+        for extensions in (gltf.extensionsUsed, gltf.extensionsRequired):
+            if KHR_MESH_QUANTIZATION not in extensions:
+                extensions.append(KHR_MESH_QUANTIZATION)
+        _remove_replaced(gltf, replaced)
+    return report
@@ -0,0 +1,352 @@
+"""
+pygltflib.references : Find and remap the indices that GLTF2 objects use to refer to each other.
+
+Every reference is described by the kind of object referred to (the name of a top level GLTF2 array, eg
+"accessors"), the top level object holding the reference (eg ("meshes", 3)) and a Reference to read or rewrite it.
+"""
+from collections import namedtuple
+
+# the top level GLTF2 arrays whose items are referred to by index
+REFERENCE_KINDS = (
+    "accessors",
+    "animations",
+    "buffers",
+    "bufferViews",
+    "cameras",
+    "images",
+    "materials",
+    "meshes",
+    "nodes",
+    "samplers",
+    "scenes",
+    "skins",
+    "textures",
+)
+
+
+class Reference(namedtuple("Reference", ["owner", "key"])):
+    """ An index stored as owner.key, or owner[key] for dicts and lists """
+    __slots__ = ()
+
+    def get(self):
+        if isinstance(self.owner, (dict, list)):
+            return self.owner[self.key]
+        return getattr(self.owner, self.key)
+
+    def set(self, value):
+        if isinstance(self.owner, (dict, list)):
+            self.owner[self.key] = value
+        else:
+            setattr(self.owner, self.key, value)
+
+
+def _attribute_items(attributes):
+    # accessor indices of an Attributes object or of a morph target (a plain dict when loaded from json)
+    items = attributes if isinstance(attributes, dict) else attributes.__dict__
+    return [(name, value) for name, value in items.items() if isinstance(value, int)]
+
+
+def _field(kind, owner, key):
+    # a reference for owner.key if it is set
+    if owner is not None and getattr(owner, key, None) is not None:
+        yield kind, Reference(owner, key)
+
+
+def _list(kind, values):
+    for i in range(len(values or ())):
+        yield kind, Reference(values, i)
+
+
+def _extension_texture_references(value, in_texture=False):
+    # texture infos inside material extensions, eg KHR_materials_clearcoat.clearcoatTexture.index
+    if isinstance(value, dict):
+        if in_texture and isinstance(value.get("index"), int):
+            yield "textures", Reference(value, "index")
+        for key, item in value.items():
+            yield from _extension_texture_references(item, isinstance(key, str) and key.endswith("Texture"))
+
+
+def _mesh_references(mesh):
+    for primitive in mesh.primitives or ():
+        for name, _ in _attribute_items(primitive.attributes):
+            yield "accessors", Reference(primitive.attributes, name)
+        yield from _field("accessors", primitive, "indices")
+        yield from _field("materials", primitive, "material")
+        for target in primitive.targets or ():
+            for name, _ in _attribute_items(target):
+                yield "accessors", Reference(target, name)
+
+
+def _node_references(node):
+    yield from _list("nodes", node.children)
+    yield from _field("meshes", node, "mesh")
+    yield from _field("skins", node, "skin")
+    yield from _field("cameras", node, "camera")
+    instancing = (node.extensions or {}).get("EXT_mesh_gpu_instancing")
+    if isinstance(instancing, dict):
+        for name, value in (instancing.get("attributes") or {}).items():
+            if isinstance(value, int):
+                yield "accessors", Reference(instancing["attributes"], name)
+
+
+def _skin_references(skin):
+    yield from _field("accessors", skin, "inverseBindMatrices")
+    yield from _field("nodes", skin, "skeleton")
+    yield from _list("nodes", skin.joints)
+
+
+def _scene_references(scene):
+    yield from _list("nodes", scene.nodes)
+
+
+def _animation_references(animation):
+    for sampler in animation.samplers or ():
+        yield from _field("accessors", sampler, "input")
+        yield from _field("accessors", sampler, "output")
+    for channel in animation.channels or ():
+        yield from _field("nodes", channel.target, "node")
+
+
+def _accessor_references(accessor):
+    yield from _field("bufferViews", accessor, "bufferView")
+    if accessor.sparse:
+        yield from _field("bufferViews", accessor.sparse.indices, "bufferView")
+        yield from _field("bufferViews", accessor.sparse.values, "bufferView")
+
+
+def _buffer_view_references(buffer_view):
+    yield from _field("buffers", buffer_view, "buffer")
+    for name in ("EXT_meshopt_compression", "KHR_meshopt_compression"):  # the compressed data's buffer
+        compression = (buffer_view.extensions or {}).get(name)
+        if isinstance(compression, dict) and isinstance(compression.get("buffer"), int):
+            yield "buffers", Reference(compression, "buffer")
+
+
+def _image_references(image):
+    yield from _field("bufferViews", image, "bufferView")
+
+
+def _texture_references(texture):
+    yield from _field("samplers", texture, "sampler")
+    yield from _field("images", texture, "source")
+    for extension in (texture.extensions or {}).values():  # eg KHR_texture_basisu, EXT_texture_webp
+        if isinstance(extension, dict) and isinstance(extension.get("source"), int):
+            yield "images", Reference(extension, "source")
+
+
+def _material_references(material):
+    pbr = material.pbrMetallicRoughness
+    if pbr:
+        yield from _field("textures", pbr.baseColorTexture, "index")
+        yield from _field("textures", pbr.metallicRoughnessTexture, "index")
+    yield from _field("textures", material.normalTexture, "index")
+    yield from _field("textures", material.occlusionTexture, "index")
+    yield from _field("textures", material.emissiveTexture, "index")
+    yield from _extension_texture_references(material.extensions or {})
+
+
+OBJECT_REFERENCES = {
+    "accessors": _accessor_references,
+    "animations": _animation_references,
+    "bufferViews": _buffer_view_references,
+    "images": _image_references,
+    "materials": _material_references,
+    "meshes": _mesh_references,
+    "nodes": _node_references,
+    "scenes": _scene_references,
+    "skins": _skin_references,
+    "textures": _texture_references,
+}
+
+# the kinds of object that can hold a reference to each kind
+REFERRER_KINDS = {
+    "accessors": ("animations", "meshes", "nodes", "skins"),
+    "animations": (),
+    "bufferViews": ("accessors", "images"),
+    "buffers": ("bufferViews",),
+    "cameras": ("nodes",),
+    "images": ("textures",),
+    "materials": ("meshes",),
+    "meshes": ("nodes",),
+    "nodes": ("animations", "nodes", "scenes", "skins"),
+    "samplers": ("textures",),
+    "scenes": (),
+    "skins": ("nodes",),
+    "textures": ("materials",),
+}
+
+
+def object_references(kind, obj):
+    """ The (kind, Reference) pairs of the indices held by obj, an item of the top level GLTF2 array kind """
+    function = OBJECT_REFERENCES.get(kind)
+    return function(obj) if function else ()
+
+
+def references(gltf, kind=None):
+    """
+    All the references in a GLTF2, as (kind, referrer, Reference) where referrer is the (kind, index) of the top
+    level object holding the reference, or (None, None) for gltf.scene.
+
+    kind (str): Only the references to this kind of object, eg "accessors"
+    """
+    referrer_kinds = REFERRER_KINDS[kind] if kind else OBJECT_REFERENCES
+    for referrer_kind in referrer_kinds:
+        for index, obj in enumerate(getattr(gltf, referrer_kind)):
+            for reference_kind, reference in object_references(referrer_kind, obj):
+                if kind is None or reference_kind == kind:
+                    yield reference_kind, (referrer_kind, index), reference
+    if (kind is None or kind == "scenes") and gltf.scene is not None:
+        yield "scenes", (None, None), Reference(gltf, "scene")
+
+
+def remap_references(gltf, kind, mapping):
+    """
+    Rewrite every reference to the objects of kind through mapping, a list (or dict) of old index: new index.
+
+    References mapped to None are removed from lists (eg node.children) and set to None elsewhere.
+    """
+    removed_from = {}  # id(list): (list, [positions to remove])
+    for _, _, reference in list(references(gltf, kind)):
+        index = reference.get()
+        if isinstance(mapping, dict):
+            new_index = mapping.get(index, index)
+        else:
+            new_index = mapping[index] if 0 <= index < len(mapping) else index
+        if new_index is None and isinstance(reference.owner, list):
+            removed_from.setdefault(id(reference.owner), (reference.owner, []))[1].append(reference.key)
+        elif new_index != index:
+            reference.set(new_index)
+    for values, positions in removed_from.values():
+        for position in sorted(positions, reverse=True):
+            del values[position]
+
+
+class GLTFIndex:
+    """
+    Name lookups and "what refers to this" queries for a GLTF2, usually created by GLTF2.get_index().
+
+    The tables are built on first use. Items appended to the top level arrays are picked up incrementally, only
+    the new items are indexed by the next query, and a top level array replaced by a new list is indexed again.
+    The GLTF2 mutation helpers (remove_bufferView, deduplicate, merge_buffers, ...) keep the index up to date.
+    Name lookups check their results against the objects and index the names again when they no longer match or
+    nothing is found, but an object renamed to a name that a later object already has is only found first after
+    invalidate(). After changing indices by hand, call invalidate() as well.
+    """
+
+    def __init__(self, gltf):
+        self.gltf = gltf
+        self._names = {}  # kind: [array, number of items indexed, {name: [indices]}]
+        self._referrers = {}  # kind: ({referrer kind: [array, number of items indexed]}, [[(referrer, Reference)]])
+
+    def __reduce__(self):
+        # copies and pickles start with an empty index
+        return GLTFIndex, (self.gltf,)
+
+    def invalidate(self, kind=None):
+        """ Forget the names of kind and the references to and from kind (everything by default) """
+        if kind is None:
+            self._names.clear()
+            self._referrers.clear()
+            return
+        self._names.pop(kind, None)
+        self._referrers.pop(kind, None)
+        for target_kind, referrer_kinds in REFERRER_KINDS.items():
+            if kind in referrer_kinds:
+                self._referrers.pop(target_kind, None)
+
+    def _name_table(self, kind):
+        array = getattr(self.gltf, kind)
+        entry = self._names.get(kind)
+        if entry is None or entry[0] is not array or entry[1] > len(array):
+            entry = self._names[kind] = [array, 0, {}]
+        names = entry[2]
+        for i in range(entry[1], len(array)):
+            name = getattr(array[i], "name", None)
+            if name is not None:
+                names.setdefault(name, []).append(i)
+        entry[1] = len(array)
+        return names
+
+    def _lookup(self, kind, name):
+        # the indices of the objects of kind called name, indexing kind again when the table does not match the
+        # objects, eg after a rename or an item replaced in place
+        indices = self._name_table(kind).get(name)
+        array = getattr(self.gltf, kind)
+        if not indices or any(getattr(array[i], "name", None) != name for i in indices):
+            self._names.pop(kind, None)
+            indices = self._name_table(kind).get(name)
+        return indices or []
+
+    def find(self, kind, name):
+        """ The index of the first object of kind (eg "nodes") called name, or None """
+        indices = self._lookup(kind, name)
+        return indices[0] if indices else None
+
+    def find_all(self, kind, name):
+        """ The indices of all the objects of kind called name """
+        return list(self._lookup(kind, name))
+
+    def _referrer_table(self, kind):
+        referrer_kinds = REFERRER_KINDS[kind]
+        entry = self._referrers.get(kind)
+        if entry is not None:
+            for referrer_kind, (array, indexed) in entry[0].items():
+                current = getattr(self.gltf, referrer_kind)
+                if current is not array or indexed > len(current):
+                    entry = None
+                    break
+        if entry is None:
+            tracked = {referrer_kind: [getattr(self.gltf, referrer_kind), 0] for referrer_kind in referrer_kinds}
+            entry = self._referrers[kind] = (tracked, [])
+        tracked, table = entry
+        for referrer_kind, progress in tracked.items():
+            array, indexed = progress
+            for i in range(indexed, len(array)):
+                for reference_kind, reference in object_references(referrer_kind, array[i]):
+                    target = reference.get()
+                    if reference_kind != kind or not isinstance(target, int) or target < 0:
+                        continue
+                    if target >= len(table):
+                        table.extend([] for _ in range(target + 1 - len(table)))
+                    table[target].append(((referrer_kind, i), reference))
+            progress[1] = len(array)
+        return table
+
+    def references_to(self, kind, index):
+        """
+        The references to item index of kind, as (referrer, Reference) where referrer is the (kind, index) of the
+        top level object holding the reference, eg references_to("accessors", 3) -> [(("meshes", 0), ...)]
+        """
+        table = self._referrer_table(kind)
+        result = list(table[index]) if index < len(table) else []
+        if kind == "scenes" and self.gltf.scene == index:
+            result.append(((None, None), Reference(self.gltf, "scene")))
+        return result
+
+    def referrers(self, kind, index):
+        """ The (kind, index) of each top level object that refers to item index of kind, without repeats """
+        return list(dict.fromkeys(referrer for referrer, _ in self.references_to(kind, index)))
+
+    def is_referenced(self, kind, index):
+        """ True if anything refers to item index of kind """
+        return bool(self.references_to(kind, index))
+
+    def removed(self, kind, index):
+        """
+        Update the index after item index of kind was removed and the references to later items were decremented.
+        References to the removed item itself must have been removed as well, or use invalidate().
+        """
+        self._names.pop(kind, None)
+        entry = self._referrers.get(kind)
+        if entry is not None and index < len(entry[1]):
+            del entry[1][index]
+        for target_kind, referrer_kinds in REFERRER_KINDS.items():
+            entry = self._referrers.get(target_kind)
+            if kind not in referrer_kinds or entry is None:
+                continue
+            tracked, table = entry
+            for position, references in enumerate(table):
+                table[position] = [((referrer_kind, i - (referrer_kind == kind and i > index)), reference)
+                                   for (referrer_kind, i), reference in references
+                                   if referrer_kind != kind or i != index]
+            tracked[kind][1] -= 1
@@ -0,0 +1,221 @@
+"""
+pygltflib.snapshot : An on-disk cache of decoded GLTF2 objects, so loading the same file again skips the json decode.
+
+A snapshot is a pickle of the fields of a GLTF2 as it was decoded from a file. It is keyed by the file's path and
+the load options (lazy, compact), and only used while the file's size, mtime and a blake2b hash of its json still
+match. Binary data (the glb BIN chunk, .bin files, data uris) is never stored in a snapshot, it is read from the
+source file as usual.
+
+Enable snapshots for every GLTF2.load with set_snapshot_cache(SnapshotCache(directory)), or by setting the
+PYGLTFLIB_SNAPSHOT_DIR environment variable (and optionally PYGLTFLIB_SNAPSHOT_SIZE, the size cap in bytes).
+Snapshots are pickles, so only use a cache directory that nobody else can write to.
+"""
+from contextlib import contextmanager
+import gc
+import hashlib
+import os
+from pathlib import Path
+import pickle
+import threading
+import warnings
+
+from . import BIN, JSON, LazyList, __version__, decoder_for, map_file
+
+SNAPSHOT_CACHE_SIZE = 1024 ** 3  # default size cap of a snapshot directory, in bytes
+SNAPSHOT_DIR_VARIABLE = "PYGLTFLIB_SNAPSHOT_DIR"
+SNAPSHOT_SIZE_VARIABLE = "PYGLTFLIB_SNAPSHOT_SIZE"
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_SUFFIX = ".snapshot"
+
+
+def _array_types(compact):
+    if compact:
+        from .compact import GLTF2_ARRAY_TYPES, register
+        register()
+    else:
+        from . import GLTF2_ARRAY_TYPES
+    return GLTF2_ARRAY_TYPES
+
+
+@contextmanager
+def _gc_paused():
+    # (un)pickling a GLTF2 creates a lot of objects and no garbage, so the collector would only slow it down
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class SnapshotCache:
+    """
+    A directory of GLTF2 snapshots holding at most max_bytes of them. When a new snapshot goes over the cap the
+    least recently used snapshots are removed.
+
+    directory (str|Path): Where the snapshots are kept, created when the first snapshot is written
+    max_bytes (int): Size cap of the snapshots in the directory
+    """
+
+    def __init__(self, directory, max_bytes=SNAPSHOT_CACHE_SIZE):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def snapshot_path(self, source, lazy=False, compact=False):
+        """ The snapshot file for a source file loaded with the given options """
+        key = f"{Path(source).resolve()}|{int(lazy)}|{int(compact)}"
+        return self.directory / (hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest() + SNAPSHOT_SUFFIX)
+
+    def load(self, cls, fname, use_mmap=False, lazy=False, compact=False):
+        """
+        Load a .gltf or .glb file into a cls (a GLTF2) as GLTF2.load does, taking the decoded json from a valid
+        snapshot, or decoding it and writing a new snapshot.
+        """
+        path = Path(fname)
+        stat = path.stat()
+        if path.suffix.lower() in [".bin", ".glb"]:
+            if use_mmap:
+                data = map_file(path)
+            else:
+                with open(path, "rb") as f:
+                    data = f.read()
+            chunks = cls.glb_chunks(data)
+        else:
+            with open(path, "rb") as f:
+                data = f.read()
+            chunks = [(JSON, 0, len(data))]
+
+        obj = None
+        for chunk_type, index, chunk_length in chunks:
+            if chunk_type == JSON:
+                obj = self._decode(cls, path, stat, data[index:index + chunk_length], lazy, compact)
+            elif chunk_type == BIN:
+                obj.set_binary_blob(data[index:index + chunk_length])
+        return obj
+
+    def _decode(self, cls, path, stat, raw_json, lazy, compact):
+        # the GLTF2 for raw_json, from its snapshot if it matches the source file
+        header = (SNAPSHOT_FORMAT, __version__, cls.__module__, cls.__qualname__, str(path.resolve()), stat.st_size,
+                  stat.st_mtime_ns, hashlib.blake2b(raw_json, digest_size=32).digest())
+        snapshot_path = self.snapshot_path(path, lazy, compact)
+        obj = self._read(cls, snapshot_path, header, compact)
+        if obj is None:
+            obj = cls.from_json(str(raw_json, "utf-8"), infer_missing=True, lazy=lazy, compact=compact)
+            self._write(snapshot_path, header, obj)
+        return obj
+
+    def _read(self, cls, snapshot_path, header, compact):
+        try:
+            with open(snapshot_path, "rb") as f:
+                if pickle.load(f) != header:
+                    return None
+                with _gc_paused():
+                    fields, lazy_items = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # eg a truncated file or classes that changed
+            warnings.warn(f"Ignoring unreadable snapshot {snapshot_path}: {e}")
+            self._remove(snapshot_path)
+            return None
+        try:
+            os.utime(snapshot_path)  # most recently used
+        except OSError:
+            pass
+        obj = cls()
+        obj.__dict__.update(fields)
+        array_types = _array_types(compact)
+        for name, raw_items in lazy_items.items():
+            setattr(obj, name, LazyList(raw_items, decoder_for(array_types[name])))
+        return obj
+
+    def _write(self, snapshot_path, header, obj):
+        fields = {}
+        lazy_items = {}  # LazyLists are stored as their raw items, so they stay lazy when loaded
+        for name, value in vars(obj).items():
+            if name.startswith("_"):  # binary blob, path, caches
+                continue
+            if isinstance(value, LazyList):
+                lazy_items[name] = value.raw_items()
+            else:
+                fields[name] = value
+        temp_path = snapshot_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "wb") as f, _gc_paused():
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump((fields, lazy_items), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, snapshot_path)
+        except (OSError, pickle.PicklingError) as e:
+            warnings.warn(f"Unable to write snapshot {snapshot_path}: {e}")
+            self._remove(temp_path)
+            return
+        self.evict()
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _snapshots(self):
+        # (last used, size, path) of each snapshot in the directory
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return []
+        snapshots = []
+        for entry in entries:
+            if entry.name.endswith(SNAPSHOT_SUFFIX):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:  # removed by another process
+                    continue
+                snapshots.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return snapshots
+
+    def size(self):
+        """ The total size of the snapshots in the directory, in bytes """
+        return sum(size for _, size, _ in self._snapshots())
+
+    def evict(self):
+        """ Remove the least recently used snapshots until the directory holds at most max_bytes """
+        snapshots = sorted(self._snapshots())
+        total = sum(size for _, size, _ in snapshots)
+        for _, size, path in snapshots:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """ Remove every snapshot """
+        for _, _, path in self._snapshots():
+            self._remove(path)
+
+
+_snapshot_cache = None
+_configured = False
+
+
+def set_snapshot_cache(cache):
+    """ Use cache (a SnapshotCache, or None to turn snapshots off) for every GLTF2.load """
+    global _snapshot_cache, _configured
+    _snapshot_cache = cache
+    _configured = True
+
+
+def snapshot_cache():
+    """
+    The SnapshotCache used by GLTF2.load: the one given to set_snapshot_cache, else one for the directory in the
+    PYGLTFLIB_SNAPSHOT_DIR environment variable, else None
+    """
+    global _snapshot_cache, _configured
+    if not _configured:
+        directory = os.environ.get(SNAPSHOT_DIR_VARIABLE)
+        if directory:
+            max_bytes = int(os.environ.get(SNAPSHOT_SIZE_VARIABLE, SNAPSHOT_CACHE_SIZE))
+            _snapshot_cache = SnapshotCache(directory, max_bytes)
+        _configured = True
+    return _snapshot_cache
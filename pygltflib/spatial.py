@@ -0,0 +1,275 @@
+"""
+pygltflib.spatial : Node world transforms, bounding boxes and a bounding volume hierarchy, computed with NumPy.
+
+Every node is handled at once as rows of an array rather than by walking the scene graph node by node. Matrices
+are (N, 4, 4) float64 arrays in the usual row-major NumPy layout (node.matrix in a gltf is column-major), boxes are
+(N, 2, 3) arrays of minimum and maximum corners with NaN for nodes or meshes that have no bounds.
+"""
+import numpy as np
+
+from .arrays import accessor_array
+
+
+def node_parents(gltf):
+    """ The index of the parent of each node, -1 for nodes that are not a child of another node """
+    parents = np.full(len(gltf.nodes), -1, np.int64)
+    for i, node in enumerate(gltf.nodes):
+        for child in node.children or ():
+            parents[child] = i
+    return parents
+
+
+def node_levels(gltf, parents=None):
+    """
+    The node indices grouped by depth in the node hierarchy, roots first, so each node comes after its parent.
+    Nodes that are part of a cycle (not valid in a gltf) are left out.
+    """
+    if parents is None:
+        parents = node_parents(gltf)
+    level = [i for i in range(len(gltf.nodes)) if parents[i] < 0]
+    levels = []
+    seen = set(level)
+    while level:
+        levels.append(np.array(level, np.int64))
+        next_level = []
+        for i in level:
+            for child in gltf.nodes[i].children or ():
+                if child not in seen:
+                    seen.add(child)
+                    next_level.append(child)
+        level = next_level
+    return levels
+
+
+def quaternion_matrices(quaternions):
+    """ The (N, 3, 3) rotation matrices of (N, 4) quaternions in gltf (x, y, z, w) order, normalized first """
+    quaternions = np.asarray(quaternions, np.float64)
+    length = np.linalg.norm(quaternions, axis=1, keepdims=True)
+    x, y, z, w = (quaternions / np.where(length > 0, length, 1)).T
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)], axis=1),
+        np.stack([2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)], axis=1),
+        np.stack([2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)], axis=1),
+    ], axis=1)
+
+
+def matrix_quaternions(rotations):
+    """ The (N, 4) quaternions, in gltf (x, y, z, w) order, of (N, 3, 3) rotation matrices """
+    m = np.asarray(rotations, np.float64)
+    m00, m01, m02 = m[:, 0, 0], m[:, 0, 1], m[:, 0, 2]
+    m10, m11, m12 = m[:, 1, 0], m[:, 1, 1], m[:, 1, 2]
+    m20, m21, m22 = m[:, 2, 0], m[:, 2, 1], m[:, 2, 2]
+    trace = m00 + m11 + m22
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # the four ways of extracting a quaternion, each stable when its term is the largest
+        s = np.sqrt(np.maximum(np.stack([trace, m00 - m11 - m22, m11 - m00 - m22, m22 - m00 - m11]) + 1, 0)) * 2
+        candidates = np.stack([
+            np.stack([(m21 - m12) / s[0], (m02 - m20) / s[0], (m10 - m01) / s[0], s[0] / 4], axis=1),
+            np.stack([s[1] / 4, (m01 + m10) / s[1], (m02 + m20) / s[1], (m21 - m12) / s[1]], axis=1),
+            np.stack([(m01 + m10) / s[2], s[2] / 4, (m12 + m21) / s[2], (m02 - m20) / s[2]], axis=1),
+            np.stack([(m02 + m20) / s[3], (m12 + m21) / s[3], s[3] / 4, (m10 - m01) / s[3]], axis=1),
+        ])
+    choice = np.argmax(np.stack([trace, m00, m11, m22]), axis=0)
+    quaternions = candidates[choice, np.arange(len(m))]
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    quaternions[quaternions[:, 3] < 0] *= -1  # the same rotation, with w >= 0
+    return quaternions
+
+
+def trs_matrices(translations, rotations, scales):
+    """ The (N, 4, 4) matrices of (N, 3) translations, (N, 4) quaternions and (N, 3) scales, applied S then R then T """
+    count = len(translations)
+    matrices = np.zeros((count, 4, 4))
+    matrices[:, :3, :3] = quaternion_matrices(rotations) * np.asarray(scales, np.float64)[:, None, :]
+    matrices[:, :3, 3] = translations
+    matrices[:, 3, 3] = 1
+    return matrices
+
+
+def decompose(matrices):
+    """
+    Split (N, 4, 4) affine matrices into (N, 3) translations, (N, 4) quaternions and (N, 3) scales. A mirroring
+    matrix gets a negative x scale. Shear can not be represented and is dropped.
+    """
+    matrices = np.asarray(matrices, np.float64)
+    translations = matrices[:, :3, 3].copy()
+    basis = matrices[:, :3, :3]
+    scales = np.linalg.norm(basis, axis=1)
+    scales[np.linalg.det(basis) < 0, 0] *= -1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rotations = basis / scales[:, None, :]
+    degenerate = ~np.isfinite(rotations).all(axis=(1, 2))
+    rotations[degenerate] = np.eye(3)
+    return translations, matrix_quaternions(rotations), scales
+
+
+def local_matrices(gltf):
+    """ The (N, 4, 4) local matrix of each node, from node.matrix or its translation, rotation and scale """
+    count = len(gltf.nodes)
+    translations = np.zeros((count, 3))
+    rotations = np.tile([0.0, 0.0, 0.0, 1.0], (count, 1))
+    scales = np.ones((count, 3))
+    explicit = {}  # node index: column-major matrix
+    for i, node in enumerate(gltf.nodes):
+        if node.matrix is not None:
+            explicit[i] = node.matrix
+            continue
+        if node.translation is not None:
+            translations[i] = node.translation
+        if node.rotation is not None:
+            rotations[i] = node.rotation
+        if node.scale is not None:
+            scales[i] = node.scale
+    matrices = trs_matrices(translations, rotations, scales)
+    if explicit:
+        indices = list(explicit)
+        matrices[indices] = np.array([explicit[i] for i in indices], np.float64).reshape(-1, 4, 4).transpose(0, 2, 1)
+    return matrices
+
+
+def world_matrices(gltf, local=None):
+    """
+    The (N, 4, 4) world matrix of each node: its local matrix multiplied by the world matrix of its parent,
+    evaluated one depth level of the hierarchy at a time with batched matrix products.
+
+    local (array): The local matrices, local_matrices(gltf) by default
+    """
+    parents = node_parents(gltf)
+    world = local_matrices(gltf) if local is None else np.array(local, np.float64)
+    for level in node_levels(gltf, parents)[1:]:
+        world[level] = world[parents[level]] @ world[level]
+    return world
+
+
+def mesh_bounds(gltf, use_data=False):
+    """
+    The (M, 2, 3) local bounds of each mesh, the union of the POSITION bounds of its primitives (morph targets are
+    not included).
+
+    use_data (bool): Compute the bounds from the vertex data instead of the accessor min/max. The data is always
+        used for accessors without min/max and for normalized (quantized) positions.
+    """
+    bounds = np.full((len(gltf.meshes), 2, 3), np.nan)
+    accessor_bounds = {}  # accessor index: (2, 3) bounds, each accessor is read once
+    for m, mesh in enumerate(gltf.meshes):
+        for primitive in mesh.primitives or ():
+            position = getattr(primitive.attributes, "POSITION", None)
+            if position is None:
+                continue
+            if position not in accessor_bounds:
+                accessor = gltf.accessors[position]
+                if (not use_data and not accessor.normalized and accessor.min and accessor.max
+                        and len(accessor.min) == 3 and len(accessor.max) == 3):
+                    accessor_bounds[position] = np.array([accessor.min, accessor.max], np.float64)
+                else:
+                    data = accessor_array(gltf, position)
+                    accessor_bounds[position] = (np.array([data.min(axis=0), data.max(axis=0)], np.float64)
+                                                 if len(data) else np.full((2, 3), np.nan))
+            box = accessor_bounds[position]
+            bounds[m, 0] = np.fmin(bounds[m, 0], box[0])
+            bounds[m, 1] = np.fmax(bounds[m, 1], box[1])
+    return bounds
+
+
+def transform_bounds(boxes, matrices):
+    """ The (N, 2, 3) axis aligned bounds of (N, 2, 3) boxes transformed by (N, 4, 4) matrices """
+    boxes = np.asarray(boxes, np.float64)
+    centers = boxes.mean(axis=1)
+    extents = (boxes[:, 1] - boxes[:, 0]) / 2
+    world_centers = np.einsum("nij,nj->ni", matrices[:, :3, :3], centers) + matrices[:, :3, 3]
+    world_extents = np.einsum("nij,nj->ni", np.abs(matrices[:, :3, :3]), extents)
+    return np.stack([world_centers - world_extents, world_centers + world_extents], axis=1)
+
+
+def world_bounds(gltf, world=None, use_data=False):
+    """
+    The (N, 2, 3) world space bounds of the mesh of each node, NaN for nodes without a mesh.
+
+    world (array): The world matrices, world_matrices(gltf) by default
+    use_data (bool): See mesh_bounds
+    """
+    if world is None:
+        world = world_matrices(gltf)
+    boxes = np.full((len(gltf.nodes), 2, 3), np.nan)
+    mesh_nodes = np.array([i for i, node in enumerate(gltf.nodes) if node.mesh is not None], np.int64)
+    if len(mesh_nodes):
+        meshes = mesh_bounds(gltf, use_data)
+        mesh_indices = [gltf.nodes[i].mesh for i in mesh_nodes]
+        boxes[mesh_nodes] = transform_bounds(meshes[mesh_indices], world[mesh_nodes])
+    return boxes
+
+
+class BVH:
+    """
+    A bounding volume hierarchy over axis aligned boxes, for finding the boxes that overlap a box or contain a
+    point without testing all of them.
+
+    Each tree node is split at the median box center along its longest axis, down to leaves of at most leaf_size
+    boxes. The tree is kept in flat arrays: node_bounds, node_start and node_end (the range of items covered) and
+    node_left and node_right (-1 for leaves).
+
+    boxes (array): (N, 2, 3) minimum and maximum corners, eg from world_bounds. Boxes with NaN are left out.
+    leaf_size (int): Largest number of boxes in a leaf
+    """
+
+    def __init__(self, boxes, leaf_size=4):
+        self.boxes = np.asarray(boxes, np.float64)
+        self.items = np.flatnonzero(~np.isnan(self.boxes).any(axis=(1, 2)))  # box indices, in tree order
+        centers = self.boxes.mean(axis=1)
+        bounds, starts, ends, lefts, rights = [], [], [], [], []
+
+        def add_node(start, end):
+            chunk = self.boxes[self.items[start:end]]
+            bounds.append((chunk[:, 0].min(axis=0), chunk[:, 1].max(axis=0)))
+            starts.append(start)
+            ends.append(end)
+            lefts.append(-1)
+            rights.append(-1)
+            return len(bounds) - 1
+
+        pending = [add_node(0, len(self.items))] if len(self.items) else []
+        while pending:
+            node = pending.pop()
+            start, end = starts[node], ends[node]
+            if end - start <= leaf_size:
+                continue
+            axis = int(np.argmax(bounds[node][1] - bounds[node][0]))
+            chunk = self.items[start:end]
+            middle = (end - start) // 2
+            self.items[start:end] = chunk[np.argpartition(centers[chunk, axis], middle)]
+            lefts[node] = add_node(start, start + middle)
+            rights[node] = add_node(start + middle, end)
+            pending += [lefts[node], rights[node]]
+
+        self.node_bounds = np.array(bounds, np.float64).reshape(-1, 2, 3)
+        self.node_start = np.array(starts, np.int64)
+        self.node_end = np.array(ends, np.int64)
+        self.node_left = np.array(lefts, np.int64)
+        self.node_right = np.array(rights, np.int64)
+
+    def __len__(self):
+        return len(self.items)
+
+    def query(self, minimum, maximum):
+        """ The sorted indices of the boxes that overlap the box from minimum to maximum (touching counts) """
+        minimum = np.asarray(minimum, np.float64)
+        maximum = np.asarray(maximum, np.float64)
+        found = []
+        pending = [0] if len(self.node_bounds) else []
+        while pending:
+            node = pending.pop()
+            node_minimum, node_maximum = self.node_bounds[node]
+            if (node_minimum > maximum).any() or (node_maximum < minimum).any():
+                continue
+            if self.node_left[node] >= 0:
+                pending += [self.node_left[node], self.node_right[node]]
+                continue
+            chunk = self.items[self.node_start[node]:self.node_end[node]]
+            boxes = self.boxes[chunk]
+            hits = (boxes[:, 0] <= maximum).all(axis=1) & (boxes[:, 1] >= minimum).all(axis=1)
+            found.extend(chunk[hits].tolist())
+        return sorted(found)
+
+    def query_point(self, point):
+        """ The sorted indices of the boxes that contain point """
+        return self.query(point, point)
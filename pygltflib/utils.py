@@ -24,12 +24,44 @@ SOFTWARE.
 """
 
 import base64
+import struct
 from struct import calcsize
 import pathlib
+from pathlib import Path
 import warnings
 
 
-from . import *
+from . import (
+    ARRAY_BUFFER,
+    ELEMENT_ARRAY_BUFFER,
+    FLOAT,
+    PERSPECTIVE,
+    SCALAR,
+    UNSIGNED_INT,
+    UNSIGNED_SHORT,
+    VEC3,
+    Accessor,
+    Attributes,
+    Buffer,
+    BufferView,
+    Camera,
+    GLTF2,
+    Mesh,
+    Node,
+    Perspective,
+    Primitive,
+    Scene,
+    encode_data_uri,
+)
+
+
+def __getattr__(name):
+    # this module used to re-export everything in pygltflib with "from . import *", keep those names importable
+    import pygltflib
+    try:
+        return getattr(pygltflib, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
 
 
 # some higher level helper functions
@@ -174,58 +206,50 @@ def add_indexed_geometry(gltf, indices, vertices):
     """
     Add a primitive object to the GLTF that is a list of indices and vertices.
     eg a triangle with indices [(0, 1, 2)] and vertices [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0)]
-    """
-    buffer = Buffer()
-    bufferView1 = BufferView()  # indices buffer view
-    bufferView2 = BufferView()  # vertices buffer view
-    accessor1 = Accessor()
-    accessor2 = Accessor()
 
-    mesh = Mesh()
-    primitive = Primitive()
-    node = Node()
+    The data is stored in a new data uri buffer, with UNSIGNED_SHORT indices (UNSIGNED_INT when they do not fit).
+    See pygltflib.arrays.GeometryBuilder for adding larger geometry from numpy arrays.
+    """
+    flat_indices = [index for triangle in indices for index in triangle]
+    vertices = [tuple(float(x) for x in vertex) for vertex in vertices]
 
-    # add to gltf
-    gltf.meshes.append(mesh)
-    gltf.meshes[-1].primitives.append(primitive)
-    gltf.nodes.append(node)
-    gltf.buffers.append(buffer)
-    gltf.bufferViews.append(bufferView1)
-    gltf.bufferViews.append(bufferView2)
-    gltf.accessors.append(accessor1)
-    gltf.accessors.append(accessor2)
+    # the largest value of each type is reserved for primitive restart
+    if not flat_indices or max(flat_indices) < 65535:
+        index_component_type, index_format = UNSIGNED_SHORT, "H"
+    else:
+        index_component_type, index_format = UNSIGNED_INT, "I"
+    index_data = struct.pack(f"<{len(flat_indices)}{index_format}", *flat_indices)
+    vertex_offset = len(index_data) + -len(index_data) % 4
+    vertex_data = struct.pack(f"<{len(vertices) * 3}f", *(x for vertex in vertices for x in vertex))
 
-    bufferview1_index = len(gltf.bufferViews)-2
-    bufferview2_index = len(gltf.bufferViews)-1
+    gltf.buffers.append(Buffer(uri=encode_data_uri(index_data + bytes(vertex_offset - len(index_data)) + vertex_data),
+                               byteLength=vertex_offset + len(vertex_data)))
     buffer_index = len(gltf.buffers) - 1
-    node_index = len(gltf.nodes)-1
-
-    # accessor for indices
-    accessor1.bufferView = bufferview1_index
-    accessor1.byteOffset = 0
-    accessor1.componentType = UNSIGNED_SHORT
-    accessor1.count = 3
-    accessor1.type = SCALAR
-    accessor1.max = [2]
-    accessor1.min = [0]
-
-    # accessor for vertices
-    accessor2.bufferView = bufferview2_index
-    accessor2.byteOffset = 0
-    accessor2.componentType = FLOAT
-    accessor2.count = 3
-    accessor2.type = VEC3
-    accessor2.max = [1.0, 1.0, 0.0]
-    accessor2.min = [0.0, 0.0, 0.0]
+    gltf.bufferViews.append(BufferView(buffer=buffer_index, byteOffset=0, byteLength=len(index_data),
+                                       target=ELEMENT_ARRAY_BUFFER))
+    gltf.bufferViews.append(BufferView(buffer=buffer_index, byteOffset=vertex_offset, byteLength=len(vertex_data),
+                                       target=ARRAY_BUFFER))
+    gltf.accessors.append(Accessor(bufferView=len(gltf.bufferViews) - 2, byteOffset=0,
+                                   componentType=index_component_type, count=len(flat_indices), type=SCALAR,
+                                   max=[max(flat_indices)] if flat_indices else None,
+                                   min=[min(flat_indices)] if flat_indices else None))
+    gltf.accessors.append(Accessor(bufferView=len(gltf.bufferViews) - 1, byteOffset=0, componentType=FLOAT,
+                                   count=len(vertices), type=VEC3,
+                                   max=[max(axis) for axis in zip(*vertices)] if vertices else None,
+                                   min=[min(axis) for axis in zip(*vertices)] if vertices else None))
+    primitive = Primitive(attributes=Attributes(POSITION=len(gltf.accessors) - 1), indices=len(gltf.accessors) - 2)
+    gltf.meshes.append(Mesh(primitives=[primitive]))
+
+    node = Node(mesh=len(gltf.meshes) - 1)
+    gltf.nodes.append(node)
+    node_index = len(gltf.nodes) - 1
 
-    primitive.attributes = Attributes()
-    primitive.attributes.POSITION = 1
-    node.mesh = 0
     scene = None
     if not gltf.scenes:
         warnings.warn("Adding primitive to GLTF but there is no scene. You may want to add one.")
-    if len(gltf.scenes)>1:
-        warnings.warn("Multiple scenes found, adding to most recent one.")
+    else:
+        if len(gltf.scenes) > 1:
+            warnings.warn("Multiple scenes found, adding to most recent one.")
         scene = gltf.scenes[-1]
 
     if scene:
@@ -233,38 +257,7 @@ def add_indexed_geometry(gltf, indices, vertices):
             scene.nodes = [node_index]
         else:
             scene.nodes.append(node_index)
-
-    # add the data
-    stream = "data:application/octet-stream;base64,"
-    buffer.uri = stream  # first part of the datastream is set up
-
-    chunk = b""
-    pack = "<HHH"
-    for v in indices:
-        chunk += struct.pack(pack, *v)
-
-    bufferView1.buffer = buffer_index
-    bufferView1.byteOffset = 0
-    byte_length = bufferView1.byteLength = len(chunk)
-    bufferView1.target = ELEMENT_ARRAY_BUFFER
-    buffer.uri += base64.b64encode(chunk).decode("utf-8")  # add to data stream
-
-    # DH: we do not need this line.
-    # byte_length += 4 - byte_length % 4  # pad to next chunk
-
-    chunk = b""
-    pack = "<fff"
-    for v in vertices:
-        chunk += struct.pack(pack, *v)
-
-    # record_size = byte_length * num_of_fields
-    bufferView2.buffer = buffer_index
-    bufferView2.byteOffset = byte_length
-    bufferView2.byteLength = len(chunk)
-    bufferView2.target = ARRAY_BUFFER
-    buffer.uri += base64.b64encode(chunk).decode("utf-8")  # add vertices to data stream
-
-    buffer.byteLength = bufferView2.byteOffset + bufferView2.byteLength
+        gltf.invalidate_index("nodes")
     return True
 
 
@@ -1,4 +1,23 @@
-from . import *
+import warnings
+
+from . import (
+    ACCESSOR_SPARSE_INDICES_COMPONENT_TYPES,
+    BUFFERVIEW_TARGETS,
+    COMPONENT_TYPES,
+    FLOAT,
+    GLTF2,
+    MESH_PRIMITIVE_MODES,
+)
+
+
+def __getattr__(name):
+    # this module used to re-export everything in pygltflib with "from . import *", keep those names importable
+    import pygltflib
+    try:
+        return getattr(pygltflib, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
 
 ###
 # Validator
@@ -44,84 +63,281 @@ class MissingRequiredField(GLTFValidatorException):
     pass
 
 
-def validate_accessors(gltf: GLTF2):
+class InvalidByteRange(GLTFValidatorException):
+    pass
+
+
+class InvalidAlignment(GLTFValidatorException):
+    pass
+
+
+class InvalidIndexValue(GLTFValidatorException):
+    pass
+
+
+class InvalidFloatValue(GLTFValidatorException):
+    pass
+
+
+class MismatchedAccessorBounds(GLTFValidatorException):
+    pass
+
+
+class MismatchedVertexCount(GLTFValidatorException):
+    pass
+
+
+def _raise_first(errors):
+    for error in errors:
+        raise error
+
+
+def _each(items, item_errors):
+    # the errors of each item, an unexpected exception checking one item is yielded and the next item is checked
+    for i, item in enumerate(items):
+        try:
+            yield from item_errors(i, item)
+        except Exception as e:
+            yield e
+
+
+def accessor_errors(gltf: GLTF2):
     # pretty complete
-    for accessor in gltf.accessors:
+    def errors(i, accessor):
         if accessor.componentType not in COMPONENT_TYPES:
-            raise InvalidAcccessorComponentTypeException(f"{accessor.componentType} not a valid component type")
+            yield InvalidAcccessorComponentTypeException(f"{accessor.componentType} not a valid component type")
         if accessor.max and len(accessor.max) not in [1, 2, 3, 4, 9, 16]:
-            raise InvalidArrayLengthException(f"{len(accessor.max)} not a valid length for accessor max array")
+            yield InvalidArrayLengthException(f"{len(accessor.max)} not a valid length for accessor max array")
         if accessor.min and len(accessor.min) not in [1, 2, 3, 4, 9, 16]:
-            raise InvalidArrayLengthException(f"{len(accessor.min)} not a valid length for accessor min array")
+            yield InvalidArrayLengthException(f"{len(accessor.min)} not a valid length for accessor min array")
         if accessor.min and accessor.max and len(accessor.min) != len(accessor.max):
-            raise MismatchedArrayLengthException("accessor min and max arrays must be same lengths")
+            yield MismatchedArrayLengthException("accessor min and max arrays must be same lengths")
+    yield from _each(gltf.accessors, errors)
 
 
-def validate_accessors_sparse(gltf: GLTF2):
-    for accessor in gltf.accessors:
+def accessor_sparse_errors(gltf: GLTF2):
+    def errors(i, accessor):
         sparse = accessor.sparse
         if sparse and sparse.indices:
             if sparse.indices.componentType not in ACCESSOR_SPARSE_INDICES_COMPONENT_TYPES:
-                raise InvalidAccessorSparseIndicesComponentTypeException(
+                yield InvalidAccessorSparseIndicesComponentTypeException(
                     f"{sparse.indices.componentType} not a valid sparse indicies component type")
             bufferView = sparse.indices.bufferView
-            if bufferView > len(gltf.bufferViews):
-                raise InvalidBufferViewIndex("accessor.sparse.indices.bufferView refers to non-existent bufferView")
-            if gltf.bufferViews[bufferView].target in BUFFERVIEW_TARGETS:
-                raise InvalidBufferViewTarget("accessor.sparse.indices' referenced bufferView can't have ARRAY_BUFFER or ELEMENT_ARRAY_BUFFER target")
-    #raise InvalidBufferViewTarget("accessor.sparse.indices' referenced bufferView can't have ARRAY_BUFFER or ELEMENT_ARRAY_BUFFER target")
+            if bufferView >= len(gltf.bufferViews):
+                yield InvalidBufferViewIndex("accessor.sparse.indices.bufferView refers to non-existent bufferView")
+            elif gltf.bufferViews[bufferView].target in BUFFERVIEW_TARGETS:
+                yield InvalidBufferViewTarget("accessor.sparse.indices' referenced bufferView can't have ARRAY_BUFFER or ELEMENT_ARRAY_BUFFER target")
+    yield from _each(gltf.accessors, errors)
 
 
-def validate_animation_channel(gltf: GLTF2):
-    for animation in gltf.animations:
+def animation_channel_errors(gltf: GLTF2):
+    def errors(i, animation):
         for channel in animation.channels:
-            if not channel.sampler:
-                raise MissingRequiredField("animation.channel requires sampler")
+            if channel.sampler is None:
+                yield MissingRequiredField("animation.channel requires sampler")
             if not channel.target:
-                raise MissingRequiredField("animation.channel requires sampler")
-    #raise MissingRequiredField("animation.channel requires sampler")
+                yield MissingRequiredField("animation.channel requires target")
+    yield from _each(gltf.animations, errors)
 
 
-def validate_meshes(gltf: GLTF2):
-    for mesh in gltf.meshes:
+def mesh_errors(gltf: GLTF2):
+    def errors(i, mesh):
         if mesh.primitives:
             for primitive in mesh.primitives:
                 if primitive.mode not in MESH_PRIMITIVE_MODES:
-                    raise InvalidMeshPrimitiveMode(f"{primitive.mode} not a valid mesh primitive mode")
+                    yield InvalidMeshPrimitiveMode(f"{primitive.mode} not a valid mesh primitive mode")
+    yield from _each(gltf.meshes, errors)
 
 
-def validate_bufferViews(gltf: GLTF2):
-    for bufferView in gltf.bufferViews:
+def bufferView_errors(gltf: GLTF2):
+    def errors(i, bufferView):
         if bufferView.byteOffset:
             if bufferView.byteOffset < 0:
-                raise InvalidValueError(f"bufferView.byteOffset {bufferView.byteOffset} needs to be >= 0")
+                yield InvalidValueError(f"bufferView.byteOffset {bufferView.byteOffset} needs to be >= 0")
         if bufferView.byteStride:
             if bufferView.byteStride < 4:
-                raise InvalidValueError(f"bufferView.byteStride {bufferView.byteStride} needs to be >= 4")
+                yield InvalidValueError(f"bufferView.byteStride {bufferView.byteStride} needs to be >= 4")
             if bufferView.byteStride > 252:
-                raise InvalidValueError(f"bufferView.byteStride {bufferView.byteStride} needs to be <= 252")
+                yield InvalidValueError(f"bufferView.byteStride {bufferView.byteStride} needs to be <= 252")
             if bufferView.byteStride / 4 != bufferView.byteStride // 4:
-                raise InvalidValueError(f"bufferView.byteStride {bufferView.byteStride} needs to be a multiple of 4")
+                yield InvalidValueError(f"bufferView.byteStride {bufferView.byteStride} needs to be a multiple of 4")
         if bufferView.target and bufferView.target not in BUFFERVIEW_TARGETS:
-            raise InvalidBufferViewTarget(f"{bufferView.target} not a valid bufferView target type")
+            yield InvalidBufferViewTarget(f"{bufferView.target} not a valid bufferView target type")
+    yield from _each(gltf.bufferViews, errors)
+
+
+def _accessor_uses(gltf: GLTF2):
+    # the accessors used as vertex attributes and as POSITION, and the (mesh, primitive, vertex count) of the
+    # primitives using each indices accessor
+    from .references import _attribute_items
+    attributes = set()
+    positions = set()
+    indices = {}
+    counts = []  # (mesh, primitive, [attribute accessors])
+    for m, mesh in enumerate(gltf.meshes):
+        for p, primitive in enumerate(mesh.primitives or ()):
+            primitive_attributes = [value for _, value in _attribute_items(primitive.attributes)]
+            for target in primitive.targets or ():
+                primitive_attributes += [value for _, value in _attribute_items(target)]
+            attributes.update(primitive_attributes)
+            if getattr(primitive.attributes, "POSITION", None) is not None:
+                positions.add(primitive.attributes.POSITION)
+            counts.append((m, p, primitive_attributes))
+            if primitive.indices is not None:
+                indices.setdefault(primitive.indices, []).append((m, p, primitive_attributes))
+    return attributes, positions, indices, counts
+
+
+def _bounds_match(declared, actual):
+    import numpy as np
+    declared = np.asarray(declared, dtype=np.float64)
+    if actual.dtype.kind == "f":  # to float32 precision, as written by most exporters
+        return bool(np.isclose(declared, actual, rtol=1e-6, atol=1e-7).all())
+    return bool((declared == actual).all())
+
+
+def data_errors(gltf: GLTF2):
+    """
+    Check the accessors against the buffer data, one accessor at a time with vectorized NumPy reads. Requires numpy.
+
+    Yields an exception for each bufferView or accessor that does not fit in its buffer or bufferView, each
+    misaligned accessor, each float accessor holding NaN or infinite values, each declared min/max that differs
+    from the data, each primitive whose attributes have different counts and each indices accessor pointing past
+    the vertices of a primitive using it.
+    """
+    import numpy as np
+    from .arrays import COMPONENT_DTYPES, TYPE_COMPONENTS, accessor_array, element_layout
+
+    def bufferView_data_errors(i, bufferView):
+        if bufferView.buffer is None or not 0 <= bufferView.buffer < len(gltf.buffers):
+            yield InvalidValueError(f"bufferView {i} refers to non-existent buffer {bufferView.buffer}")
+            return
+        end = (bufferView.byteOffset or 0) + bufferView.byteLength
+        buffer_length = gltf.buffers[bufferView.buffer].byteLength
+        if end > buffer_length:
+            yield InvalidByteRange(f"bufferView {i} ends at byte {end}, beyond the {buffer_length} bytes of "
+                                   f"buffer {bufferView.buffer}")
+
+    def primitive_count_errors(_, count):
+        m, p, primitive_attributes = count
+        vertex_counts = {gltf.accessors[a].count for a in primitive_attributes if 0 <= a < len(gltf.accessors)}
+        if len(vertex_counts) > 1:
+            yield MismatchedVertexCount(f"mesh {m} primitive {p} has attributes with different counts "
+                                        f"{sorted(vertex_counts)}")
+
+    def accessor_data_errors(i, accessor):
+        if accessor.componentType not in COMPONENT_DTYPES or accessor.type not in TYPE_COMPONENTS:
+            return  # reported by accessor_errors
+        component_size = COMPONENT_DTYPES[accessor.componentType].itemsize
+        if accessor.bufferView is not None:
+            if not 0 <= accessor.bufferView < len(gltf.bufferViews):
+                yield InvalidBufferViewIndex(f"accessor {i} refers to non-existent bufferView {accessor.bufferView}")
+                return
+            bufferView = gltf.bufferViews[accessor.bufferView]
+            _, _, element_size = element_layout(accessor.componentType, accessor.type)
+            stride = bufferView.byteStride or element_size
+            offset = accessor.byteOffset or 0
+            if offset % component_size or (offset + (bufferView.byteOffset or 0)) % component_size:
+                yield InvalidAlignment(f"accessor {i} starts at byte {offset} of bufferView {accessor.bufferView} "
+                                       f"(byte {offset + (bufferView.byteOffset or 0)} of its buffer), which is "
+                                       f"not a multiple of its component size {component_size}")
+            if bufferView.byteStride and bufferView.byteStride < element_size:
+                yield InvalidAlignment(f"accessor {i} elements are {element_size} bytes but bufferView "
+                                       f"{accessor.bufferView} has a byteStride of {bufferView.byteStride}")
+            if i in attributes and (offset % 4 or stride % 4):
+                yield InvalidAlignment(f"vertex attribute accessor {i} elements must be aligned to 4 bytes "
+                                       f"(byteOffset {offset}, stride {stride})")
+            end = offset + stride * (accessor.count - 1) + element_size if accessor.count else 0
+            if end > bufferView.byteLength:
+                yield InvalidByteRange(f"accessor {i} ends at byte {end}, beyond the {bufferView.byteLength} bytes "
+                                       f"of bufferView {accessor.bufferView}")
+                return
+
+        is_float = accessor.componentType == FLOAT
+        if not accessor.count or not (is_float or accessor.min or accessor.max or accessor.sparse or i in indices):
+            return
+        try:
+            array = accessor_array(gltf, i, normalized=False)
+        except (ValueError, IndexError) as e:
+            yield InvalidByteRange(f"accessor {i} can not be read: {e}")
+            return
+        array = array.reshape(len(array), -1)
+
+        minimum, maximum = array.min(axis=0), array.max(axis=0)
+        if is_float and not (np.isfinite(minimum).all() and np.isfinite(maximum).all()):  # min and max keep NaN
+            usage = " (POSITION)" if i in positions else ""
+            yield InvalidFloatValue(f"accessor {i}{usage} contains NaN or infinite values")
+            return
+        for name, declared, actual in (("min", accessor.min, minimum), ("max", accessor.max, maximum)):
+            if declared and len(declared) == len(actual) and not _bounds_match(declared, actual):
+                yield MismatchedAccessorBounds(f"accessor {i} declares {name} {list(declared)} but the data "
+                                               f"{name} is {actual.tolist()}")
+        for m, p, primitive_attributes in indices.get(i, ()):
+            vertex_count = min((gltf.accessors[a].count for a in primitive_attributes
+                                if 0 <= a < len(gltf.accessors)), default=0)
+            if int(maximum[0]) >= vertex_count:
+                yield InvalidIndexValue(f"accessor {i} holds index {int(maximum[0])} but mesh {m} primitive {p} "
+                                        f"has {vertex_count} vertices")
+
+    yield from _each(gltf.bufferViews, bufferView_data_errors)
+    attributes, positions, indices, counts = _accessor_uses(gltf)
+    yield from _each(counts, primitive_count_errors)
+    yield from _each(gltf.accessors, accessor_data_errors)
 
 
-def validate(gltf: GLTF2, warning=False):
+def validate_accessors(gltf: GLTF2):
+    _raise_first(accessor_errors(gltf))
+
+
+def validate_accessors_sparse(gltf: GLTF2):
+    _raise_first(accessor_sparse_errors(gltf))
+
+
+def validate_animation_channel(gltf: GLTF2):
+    _raise_first(animation_channel_errors(gltf))
+
+
+def validate_meshes(gltf: GLTF2):
+    _raise_first(mesh_errors(gltf))
+
+
+def validate_bufferViews(gltf: GLTF2):
+    _raise_first(bufferView_errors(gltf))
+
+
+def validate_data(gltf: GLTF2):
+    """ Check the accessors against the buffer data, raising the first error found (see data_errors) """
+    _raise_first(data_errors(gltf))
+
+
+def validate(gltf: GLTF2, warning=False, data=False):
     """
     Validate a GLTF2 object. Will raises exceptions where validation fails.
 
+    Every check is run to the end, so with warning=True all the errors of the file are returned in one report. An
+    unexpected exception checking one object is reported as an error and the check goes on with the next object.
+
     Args:
           gltf (GLTF2): A gltf2 object
           warning (Bool): If false, all errors throw exceptions, else
+          data (Bool): Also check the accessors against the buffer data (see data_errors), requires numpy
 
     Returns:
          errors List(Exception): A list of errors if warning is True, or an empty list validated correctly
     """
     errors = []
     warnings.warn("pygltf.utils.validator is a provisional function and may not exist in future versions.")
-    for validator in [validate_accessors, validate_accessors_sparse, validate_animation_channel, validate_meshes, validate_bufferViews]:
+    checks = [accessor_errors, accessor_sparse_errors, animation_channel_errors, mesh_errors, bufferView_errors]
+    if data:
+        checks.append(data_errors)
+    for check in checks:
         try:
-            validator(gltf)
+            for error in check(gltf):
+                if not warning:
+                    raise error
+                errors.append(error)
+        except GLTFValidatorException:
+            raise
         except Exception as e:
             if warning:
                 errors.append(e)
@@ -130,11 +346,11 @@ def validate(gltf: GLTF2, warning=False):
     return errors
 
 
-def summary(gltf: GLTF2):
+def summary(gltf: GLTF2, data=False):
     print("start validation.")
-    errors = validate(gltf, warning=True)
+    errors = validate(gltf, warning=True, data=data)
     if errors:
         for error in errors:
             print("E:",error.args[0])
     print(f"{len(errors)} error(s) found.")
-    print("done.")
\ No newline at end of file
+    print("done.")
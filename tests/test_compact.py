@@ -0,0 +1,62 @@
+import subprocess
+import sys
+
+import pygltflib
+from pygltflib import GLTF2, Attributes, Mesh, Node, Primitive, Property, Scene
+from pygltflib import compact
+
+
+def make_json():
+    return GLTF2(
+        scene=0,
+        scenes=[Scene(nodes=[0])],
+        nodes=[Node(name="node", mesh=0, extras={"id": 1})],
+        meshes=[Mesh(primitives=[Primitive(attributes=Attributes(POSITION=0, _CUSTOM=1))])],
+    ).to_json()
+
+
+def test_compact_objects_are_instances_of_the_regular_classes():
+    gltf = GLTF2.from_json(make_json(), compact=True)
+    node = gltf.nodes[0]
+    assert type(node) is compact.Node
+    assert isinstance(node, Node)
+    assert isinstance(node, Property)
+    assert isinstance(gltf.meshes[0].primitives[0].attributes, Attributes)
+    assert not isinstance(node, pygltflib.Mesh)
+
+
+def test_compact_round_trip():
+    data = make_json()
+    assert GLTF2.from_json(data, compact=True).to_json() == data
+
+
+def test_import_does_not_change_pygltflib(tmp_path):
+    script = ("import pygltflib, pygltflib.compact as compact; "
+              "print(isinstance(compact.Node(), pygltflib.Node), pygltflib.ATTRIBUTES_CLASSES); "
+              "compact.register(); "
+              "print(isinstance(compact.Node(), pygltflib.Node))")
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                            cwd=str(tmp_path), env={"PYTHONPATH": pygltflib.__file__.rsplit("/pygltflib/", 1)[0]})
+    assert result.stdout.split("\n")[:2] == ["False (<class 'pygltflib.Attributes'>,)", "True"]
+
+
+def test_unset_extensions_are_not_allocated():
+    node = compact.Node()
+    assert node.extensions == {}
+    assert node.extensions.pop("missing", None) is None
+    assert node._extensions is None
+    node.extensions["KHR_example"] = {}
+    assert node._extensions == {"KHR_example": {}}
+
+
+def test_writes_through_every_pending_handle_are_kept():
+    node = compact.Node()
+    first = node.extensions
+    second = node.extensions
+    first["a"] = 1
+    second["b"] = 2
+    second.update(c=3)
+    assert node.extensions == {"a": 1, "b": 2, "c": 3}
+    assert second == {"a": 1, "b": 2, "c": 3}
+    del second["a"]
+    assert node.extensions == {"b": 2, "c": 3}
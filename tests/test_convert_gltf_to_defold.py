@@ -0,0 +1,19 @@
+from pygltflib import Node
+
+from convert_gltf_to_defold import make_names_unique
+
+
+def names(values):
+    nodes = [Node(name=value) for value in values]
+    make_names_unique(nodes)
+    return [node.name for node in nodes]
+
+
+def test_make_names_unique():
+    assert names(["a", "b", None, None]) == ["a", "b", None, None]
+    assert names(["a", "a", "b", "a"]) == ["a", "a.001", "b", "a.002"]
+
+
+def test_make_names_unique_keeps_names_that_are_already_suffixed():
+    # the node really called a.001 keeps its name, so its output files and manifest key do not move
+    assert names(["a", "a", "a.001"]) == ["a", "a.002", "a.001"]
@@ -0,0 +1,60 @@
+import pygltflib
+from pygltflib import (
+    GLTF2,
+    Accessor,
+    Attributes,
+    Buffer,
+    BufferView,
+    Mesh,
+    Primitive,
+)
+
+
+def make_gltf(chunks, accessors):
+    # a bufferView for each chunk of bytes, and FLOAT SCALAR accessors of (bufferView, name), each used by a mesh
+    gltf = GLTF2()
+    blob = bytearray()
+    for chunk in chunks:
+        gltf.bufferViews.append(BufferView(buffer=0, byteOffset=len(blob), byteLength=len(chunk)))
+        blob += chunk
+    for buffer_view, name in accessors:
+        gltf.accessors.append(Accessor(bufferView=buffer_view, componentType=pygltflib.FLOAT, count=1,
+                                       type=pygltflib.SCALAR, name=name))
+        gltf.meshes.append(Mesh(primitives=[Primitive(attributes=Attributes(POSITION=len(gltf.accessors) - 1))]))
+    gltf.buffers.append(Buffer(byteLength=len(blob)))
+    gltf.set_binary_blob(bytes(blob))
+    return gltf
+
+
+def mesh_accessors(gltf):
+    return [mesh.primitives[0].attributes.POSITION for mesh in gltf.meshes]
+
+
+def test_deduplicate_buffer_views_and_accessors():
+    gltf = make_gltf([b"abcd", b"efgh", b"abcd"], [(0, "a"), (1, "b"), (2, "c")])
+    assert gltf.deduplicate() == {"bufferViews": 1, "accessors": 1, "bytes": 4}
+    assert len(gltf.bufferViews) == 2
+    assert [accessor.name for accessor in gltf.accessors] == ["a", "b"]
+    assert mesh_accessors(gltf) == [0, 1, 0]
+
+
+def test_deduplicate_keeps_different_layouts():
+    gltf = make_gltf([b"abcd", b"abcd"], [(0, "a"), (1, "b")])
+    gltf.bufferViews[1].target = pygltflib.ARRAY_BUFFER
+    gltf.accessors[1].normalized = True
+    assert gltf.deduplicate() == {"bufferViews": 0, "accessors": 0, "bytes": 0}
+    assert mesh_accessors(gltf) == [0, 1]
+
+
+def test_deduplicate_keeps_bounds():
+    gltf = make_gltf([b"abcd"], [(0, "a"), (0, "b")])
+    gltf.accessors[1].min, gltf.accessors[1].max = [1.0], [2.0]
+    assert gltf.deduplicate()["accessors"] == 1
+    assert (gltf.accessors[0].min, gltf.accessors[0].max) == ([1.0], [2.0])
+
+
+def test_deduplicate_skips_extensions():
+    gltf = make_gltf([b"abcd", b"abcd"], [(0, "a"), (1, "b")])
+    gltf.bufferViews[1].extensions = {"EXT_example": {}}
+    assert gltf.deduplicate()["bufferViews"] == 0
+    assert len(gltf.bufferViews) == 2
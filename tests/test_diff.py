@@ -0,0 +1,75 @@
+import pygltflib
+from pygltflib import (
+    GLTF2,
+    Accessor,
+    Attributes,
+    Buffer,
+    BufferView,
+    Material,
+    Mesh,
+    Node,
+    Primitive,
+    Scene,
+)
+from pygltflib import diff
+
+
+def make_gltf(data=b"\x00\x00\x80\x3f" * 3):
+    # two nodes using one mesh, whose POSITION accessor holds data
+    gltf = GLTF2(
+        scenes=[Scene(nodes=[0, 1])],
+        nodes=[Node(name="a", mesh=0), Node(name="b", mesh=0, translation=[1, 0, 0])],
+        meshes=[Mesh(primitives=[Primitive(attributes=Attributes(POSITION=0), material=0)])],
+        materials=[Material(name="material")],
+        accessors=[Accessor(bufferView=0, componentType=pygltflib.FLOAT, count=1, type=pygltflib.VEC3)],
+        bufferViews=[BufferView(buffer=0, byteLength=len(data))],
+        buffers=[Buffer(byteLength=len(data))],
+    )
+    gltf.set_binary_blob(data)
+    return gltf
+
+
+def test_fingerprints_do_not_change_the_gltf():
+    gltf = make_gltf()
+    before = gltf.to_json()
+    diff.fingerprints(gltf)
+    assert gltf.to_json() == before
+    assert gltf.meshes[0].primitives[0].attributes.POSITION == 0
+    assert gltf.scenes[0].nodes == [0, 1]
+
+
+def test_fingerprints_follow_references():
+    old = make_gltf()
+    new = make_gltf(b"\x00\x00\x00\x40" * 3)
+    old_fingerprints = diff.fingerprints(old)
+    new_fingerprints = diff.fingerprints(new)
+    for kind in ("bufferViews", "accessors", "meshes", "nodes"):
+        assert old_fingerprints[kind] != new_fingerprints[kind]
+    assert old_fingerprints["materials"] == new_fingerprints["materials"]
+
+
+def test_fingerprints_ignore_indices():
+    gltf = make_gltf()
+    moved = make_gltf()
+    moved.materials.insert(0, Material(name="unused"))
+    moved.meshes[0].primitives[0].material = 1
+    assert diff.fingerprints(moved)["meshes"] == diff.fingerprints(gltf)["meshes"]
+
+
+def test_named_fingerprints_key_repeated_names_by_count():
+    gltf = make_gltf()
+    gltf.nodes += [Node(name="a", mesh=0, translation=[2, 0, 0]), Node(mesh=0)]
+    assert list(diff.named_fingerprints(gltf, "nodes")) == ["a", "b", "a#2", "#1"]
+
+
+def test_diff_ignores_nodes_added_before_repeated_names():
+    old = make_gltf()
+    old.nodes[1].name = "a"
+    new = make_gltf()
+    new.nodes[1].name = "a"
+    new.nodes.insert(0, Node(name="c"))
+    result = diff.diff(old, new)
+    assert result.added == {"c"}
+    assert result.removed == set()
+    assert result.changed == set()
+    assert result.unchanged == {"a", "a#2"}
@@ -0,0 +1,240 @@
+import numpy as np
+import pytest
+
+from pygltflib import GLTF2, Attributes, Node, Scene
+from pygltflib.arrays import GeometryBuilder, accessor_array
+from pygltflib.spatial import world_matrices
+from pygltflib import ARRAY_BUFFER, BYTE, FLOAT, UNSIGNED_SHORT, VEC3
+from pygltflib.geometry import (
+    cache_statistics,
+    degenerate_triangles,
+    optimize_overdraw,
+    optimize_vertex_cache,
+    optimize_vertex_fetch,
+    quantize_normals,
+    quantize_positions,
+    quantize_texcoords,
+    weld,
+    weld_vertices,
+)
+
+
+def make_grid(size, seed=0):
+    # a size x size grid of quads as a triangle list in random order, and its vertex positions
+    xs, ys = np.meshgrid(np.arange(size + 1), np.arange(size + 1))
+    positions = np.stack([xs.ravel(), ys.ravel(), np.zeros(xs.size)], axis=1).astype(np.float32)
+    corners = (np.arange(size)[:, None] * (size + 1) + np.arange(size)).ravel()
+    triangles = np.concatenate([np.stack([corners, corners + 1, corners + size + 2], axis=1),
+                                np.stack([corners, corners + size + 2, corners + size + 1], axis=1)])
+    return triangles[np.random.default_rng(seed).permutation(len(triangles))], positions
+
+
+def triangle_set(indices):
+    # the triangles of a triangle list, each rotated to start at its smallest index so the winding is kept
+    triangles = np.asarray(indices).reshape(-1, 3)
+    rotation = np.argmin(triangles, axis=1)
+    rotated = np.stack([np.roll(triangle, -r) for triangle, r in zip(triangles, rotation)])
+    return sorted(map(tuple, rotated.tolist()))
+
+
+def world_triangles(gltf, primitive):
+    # the positions of the corners of each triangle of a primitive, sorted
+    positions = accessor_array(gltf, primitive.attributes.POSITION)
+    triangles = positions[accessor_array(gltf, primitive.indices)].reshape(-1, 9)
+    return sorted(map(tuple, triangles.tolist()))
+
+
+def test_cache_statistics():
+    assert cache_statistics([0, 1, 2]) == (3.0, 1.0)
+    assert cache_statistics([0, 1, 2, 2, 1, 3]) == (2.0, 1.0)
+    # with a cache of 3 vertices, vertex 0 is pushed out by 3 before it is used again
+    assert cache_statistics([0, 1, 2, 1, 2, 3, 0, 2, 3], cache_size=3) == (5 / 3, 5 / 4)
+    assert cache_statistics([]) == (0.0, 0.0)
+
+
+def test_optimize_vertex_cache_keeps_triangles_and_improves_acmr():
+    triangles, _ = make_grid(30)
+    indices = triangles.reshape(-1)
+    optimized = optimize_vertex_cache(indices)
+    assert triangle_set(optimized) == triangle_set(indices)
+    assert cache_statistics(indices)[0] > 2.5
+    assert cache_statistics(optimized)[0] < 0.8
+    assert np.array_equal(optimize_vertex_cache(indices), optimized)
+
+
+def test_optimize_vertex_cache_drops_partial_triangles():
+    assert optimize_vertex_cache([0, 1, 2, 3]).tolist() == [0, 1, 2]
+    assert optimize_vertex_cache([0, 1]).tolist() == []
+
+
+def test_optimize_overdraw_draws_outward_facing_triangles_first():
+    positions = np.array([[-1, 0, 0], [-1, 1, 0], [-1, 0, 1], [1, 0, 0], [1, 1, 0], [1, 0, 1]], np.float32)
+    # both triangles face +x, so the one at -x faces the center of the mesh and the one at +x faces away from it
+    inward, outward = [0, 1, 2], [3, 4, 5]
+    assert optimize_overdraw(inward + outward, positions, threshold=3).tolist() == outward + inward
+
+
+def test_optimize_overdraw_keeps_triangles():
+    triangles, positions = make_grid(20)
+    indices = optimize_vertex_cache(triangles.reshape(-1))
+    optimized = optimize_overdraw(indices, positions)
+    assert triangle_set(optimized) == triangle_set(indices)
+
+
+def test_optimize_vertex_fetch_orders_vertices_by_first_use():
+    vertices, remap = optimize_vertex_fetch([3, 1, 3, 0, 1, 3], 5)
+    assert vertices.tolist() == [3, 1, 0]
+    assert remap.tolist() == [2, 1, -1, 0, -1]
+
+
+@pytest.mark.parametrize("overdraw", [False, True])
+def test_optimize_meshes_keeps_shared_vertices(overdraw):
+    triangles, positions = make_grid(20)
+    gltf = GLTF2(scenes=[Scene(nodes=[0])], nodes=[Node(mesh=0)])
+    with GeometryBuilder(gltf) as builder:
+        first = builder.add_primitive(indices=triangles[:400], POSITION=positions)
+        second = builder.add_primitive(indices=triangles[400:])
+        second.attributes = Attributes(POSITION=first.attributes.POSITION)  # both use the same vertices
+        builder.add_mesh([first, second])
+    before = [world_triangles(gltf, primitive) for primitive in gltf.meshes[0].primitives]
+
+    report = gltf.optimize_meshes(overdraw=overdraw)
+    first, second = gltf.meshes[0].primitives
+    assert first.attributes.POSITION == second.attributes.POSITION
+    assert [world_triangles(gltf, primitive) for primitive in (first, second)] == before
+    assert report["triangles"] == len(triangles)
+    assert report["acmr_after"] < report["acmr_before"]
+    assert len(gltf.accessors) == 3
+
+
+def test_weld_vertices_within_epsilon():
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 0, 0], [1, 2e-7, 0], [2, 0, 0]], np.float32)
+    vertices, remap = weld_vertices({"POSITION": positions})
+    assert vertices.tolist() == [0, 1, 4]
+    assert remap.tolist() == [0, 1, 0, 1, 2]
+    vertices, remap = weld_vertices({"POSITION": positions}, epsilons={"POSITION": 1e-8})
+    assert vertices.tolist() == [0, 1, 3, 4]
+
+
+def test_weld_keeps_uv_seams():
+    # the same position with two texture coordinates stays two vertices
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 0]], np.float32)
+    texcoords = np.array([[0, 0], [1, 0], [0, 1], [0.5, 0]], np.float32)
+    attributes, indices = weld({"POSITION": positions, "TEXCOORD_0": texcoords}, [0, 1, 2, 3, 1, 2])
+    assert len(attributes["POSITION"]) == 4
+    attributes, indices = weld({"POSITION": positions}, [0, 1, 2, 3, 1, 2])
+    assert len(attributes["POSITION"]) == 3
+    assert indices.tolist() == [0, 1, 2, 0, 1, 2]
+
+
+def test_degenerate_triangles():
+    positions = np.array([[0, 0, 0], [1, 0, 0], [2, 0, 0], [0, 1, 0]], np.float32)
+    triangles = [[0, 1, 3], [0, 0, 1], [0, 1, 2]]
+    assert degenerate_triangles(triangles).tolist() == [False, True, False]
+    assert degenerate_triangles(triangles, positions).tolist() == [False, True, True]
+
+
+def test_weld_removes_degenerate_triangles_and_unused_vertices():
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [5, 5, 5], [1, 0, 0]], np.float32)
+    attributes, indices = weld({"POSITION": positions}, [0, 1, 2, 1, 4, 3])
+    assert attributes["POSITION"].tolist() == positions[:3].tolist()
+    assert indices.tolist() == [0, 1, 2]
+
+
+def make_unwelded_quad(target_type):
+    # a quad as two unindexed triangles with one morph target, given as an Attributes object or as a plain dict
+    # the way targets are loaded from json
+    corners = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], np.float32)
+    triangles = [0, 1, 2, 0, 2, 3]
+    gltf = GLTF2(scenes=[Scene(nodes=[0])], nodes=[Node(mesh=0)])
+    with GeometryBuilder(gltf) as builder:
+        primitive = builder.add_primitive(POSITION=corners[triangles])
+        offsets = builder.add_accessor(corners[triangles] * 0.5, VEC3, FLOAT, target=ARRAY_BUFFER)
+        primitive.targets = [target_type(POSITION=offsets)]
+        builder.add_mesh([primitive])
+    return gltf
+
+
+@pytest.mark.parametrize("target_type", [Attributes, dict])
+def test_weld_meshes_rewrites_morph_targets(target_type):
+    gltf = make_unwelded_quad(target_type)
+    report = gltf.weld()
+    assert report == {"vertices": 2, "triangles": 0}
+    primitive = gltf.meshes[0].primitives[0]
+    target = primitive.targets[0]
+    assert isinstance(target, target_type)
+    offsets = target["POSITION"] if isinstance(target, dict) else target.POSITION
+    positions = accessor_array(gltf, primitive.attributes.POSITION)
+    assert len(positions) == 4
+    assert np.array_equal(accessor_array(gltf, offsets), positions * 0.5)
+    assert len(gltf.accessors) == 3
+
+
+def test_quantize_positions_round_trip():
+    positions = np.random.default_rng(0).uniform(-5, 3, (100, 3))
+    values, offset, step = quantize_positions(positions)
+    assert values.dtype == np.uint16
+    assert np.abs(offset + values * step - positions).max() <= step / 2 + 1e-12
+    values, offset, step = quantize_positions(positions, bits=8)
+    assert values.dtype == np.uint8
+    assert np.abs(offset + values * step - positions).max() <= step / 2 + 1e-12
+
+
+def test_quantize_normals_round_trip():
+    normals = np.random.default_rng(0).normal(size=(100, 3))
+    values = quantize_normals(normals * 3)  # normalized first
+    assert values.dtype == np.int8
+    unit = normals / np.linalg.norm(normals, axis=1, keepdims=True)
+    assert np.abs(values / 127 - unit).max() <= 0.5 / 127 + 1e-12
+    tangents = np.concatenate([unit, np.where(np.arange(100) % 2, -1.0, 1.0)[:, None]], axis=1)
+    assert quantize_normals(tangents, bits=16)[:, 3].tolist() == [32767, -32767] * 50
+
+
+def test_quantize_texcoords_round_trip():
+    texcoords = np.random.default_rng(0).uniform(0, 1, (100, 2))
+    values = quantize_texcoords(texcoords)
+    assert values.dtype == np.uint16
+    assert np.abs(values / 65535 - texcoords).max() <= 0.5 / 65535 + 1e-12
+    assert quantize_texcoords(texcoords * 2) is None
+
+
+def world_positions(gltf, node_index):
+    # the world space positions of the mesh of a node, or of the child node holding it after quantizing
+    world = world_matrices(gltf)
+    while gltf.nodes[node_index].mesh is None:
+        node_index = gltf.nodes[node_index].children[-1]
+    positions = accessor_array(gltf, gltf.meshes[gltf.nodes[node_index].mesh].primitives[0].attributes.POSITION)
+    return positions @ world[node_index][:3, :3].T + world[node_index][:3, 3]
+
+
+@pytest.mark.parametrize("node", [
+    Node(mesh=0),
+    Node(mesh=0, translation=[1, 2, 3], rotation=[0, 0.7071068, 0, 0.7071068], scale=[2, 2, 2]),
+    Node(mesh=0, matrix=[2, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 5, 0, 0, 1]),
+    Node(mesh=0, translation=[1, 0, 0], children=[1]),
+], ids=["identity", "trs", "matrix", "children"])
+def test_quantize_meshes_keeps_world_positions(node):
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-10, 10, (50, 3)).astype(np.float32)
+    normals = rng.normal(size=(50, 3)).astype(np.float32)
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+    texcoords = rng.uniform(0, 1, (50, 2)).astype(np.float32)
+    gltf = GLTF2(scenes=[Scene(nodes=[0])], nodes=[node, Node(name="child")])
+    with GeometryBuilder(gltf) as builder:
+        builder.add_mesh([builder.add_primitive(indices=np.arange(48), POSITION=positions, NORMAL=normals,
+                                                TEXCOORD_0=texcoords)])
+    before = world_positions(gltf, 0)
+
+    report = gltf.quantize()
+    attributes = gltf.meshes[0].primitives[0].attributes
+    quantized = (attributes.POSITION, attributes.NORMAL, attributes.TEXCOORD_0)
+    assert [gltf.accessors[i].componentType for i in quantized] == [UNSIGNED_SHORT, BYTE, UNSIGNED_SHORT]
+    assert "KHR_mesh_quantization" in gltf.extensionsUsed
+    assert "KHR_mesh_quantization" in gltf.extensionsRequired
+    assert report["bytes_after"] < report["bytes_before"]
+    step = 20 / 65535
+    assert report["errors"]["POSITION"] <= step
+    assert np.abs(world_positions(gltf, 0) - before).max() <= 2 * step
+    assert np.abs(accessor_array(gltf, attributes.NORMAL) - normals).max() <= 1 / 127
+    assert np.abs(accessor_array(gltf, attributes.TEXCOORD_0) - texcoords).max() <= 1 / 65535
+    assert len(gltf.accessors) == 4
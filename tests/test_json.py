@@ -0,0 +1,61 @@
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+import json
+import subprocess
+import sys
+from uuid import UUID
+
+from dataclasses_json.core import _ExtendedEncoder
+import pytest
+
+import pygltflib
+from pygltflib import GLTF2, Asset, Node, Scene
+
+
+class Color(Enum):
+    RED = "red"
+
+
+@pytest.mark.parametrize("value", [
+    datetime(2020, 1, 2, 3, 4, 5),
+    Decimal("1.25"),
+    UUID("12345678-1234-5678-1234-567812345678"),
+    Color.RED,
+    {"a": 1}.keys(),
+    (1, 2),
+    frozenset([3]),
+])
+def test_json_encoder_matches_dataclasses_json(value):
+    assert json.dumps(value, cls=pygltflib.JsonEncoder) == json.dumps(value, cls=_ExtendedEncoder)
+
+
+def test_json_encoder_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        json.dumps(object(), cls=pygltflib.JsonEncoder)
+
+
+def test_to_json_writes_extras_like_dataclasses_json():
+    gltf = GLTF2(asset=Asset(version="2.0"), scenes=[Scene(nodes=[0])], nodes=[Node(name="n")])
+    gltf.extras = {"when": datetime(2020, 1, 2), "amount": Decimal("2.5"), "color": Color.RED}
+    expected = {"when": datetime(2020, 1, 2).timestamp(), "amount": "2.5", "color": "red"}
+    assert json.loads(gltf.to_json())["extras"] == expected
+    assert json.loads(gltf.to_json(ensure_ascii=False, indent=2, sort_keys=True))["extras"] == expected
+
+
+def test_saving_does_not_import_dataclasses_json(tmp_path):
+    # run in a fresh interpreter, since other tests import dataclasses_json
+    script = f"""
+import sys
+import pygltflib
+gltf = pygltflib.GLTF2(scenes=[pygltflib.Scene(nodes=[0])], nodes=[pygltflib.Node(name="n")])
+gltf.extras = {{"a": (1, 2)}}
+gltf.to_json()
+gltf.save_json({str(tmp_path / "a.gltf")!r})
+gltf.save_binary({str(tmp_path / "a.glb")!r})
+pygltflib.GLTF2().load({str(tmp_path / "a.gltf")!r}).to_json(indent=2)
+print(" ".join(m for m in ("dataclasses_json", "marshmallow") if m in sys.modules))
+"""
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                            cwd=str(tmp_path), env={"PYTHONPATH": pygltflib.__file__.rsplit("/pygltflib/", 1)[0]})
+    assert result.stdout.strip() == ""
@@ -0,0 +1,67 @@
+import struct
+
+import pygltflib
+from pygltflib import (
+    GLTF2,
+    Accessor,
+    Attributes,
+    Buffer,
+    BufferView,
+    Material,
+    Mesh,
+    Node,
+    Primitive,
+    Scene,
+)
+
+
+def make_piece(value, double_sided=False):
+    # a file with one node and mesh, whose one FLOAT accessor holds value, and one material
+    data = struct.pack("<3f", value, value, value)
+    gltf = GLTF2(
+        scene=0,
+        scenes=[Scene(nodes=[0])],
+        nodes=[Node(name=f"node {value}", mesh=0)],
+        meshes=[Mesh(primitives=[Primitive(attributes=Attributes(POSITION=0), material=0)])],
+        materials=[Material(name=f"material {value}", doubleSided=double_sided)],
+        accessors=[Accessor(bufferView=0, componentType=pygltflib.FLOAT, count=1, type=pygltflib.VEC3)],
+        bufferViews=[BufferView(buffer=0, byteLength=len(data))],
+        buffers=[Buffer(byteLength=len(data))],
+    )
+    gltf.set_binary_blob(data)
+    return gltf
+
+
+def accessor_values(gltf, index):
+    return struct.unpack("<3f", bytes(gltf.get_data_from_buffer_view(gltf.accessors[index].bufferView)))
+
+
+def test_merge_appends_objects_and_data():
+    gltf = make_piece(1.0)
+    other = make_piece(2.0)
+    before = other.to_json()
+    assert gltf.merge(other)
+    assert other.to_json() == before
+    assert [node.name for node in gltf.nodes] == ["node 1.0", "node 2.0"]
+    assert gltf.scenes[0].nodes == [0, 1]
+    assert gltf.nodes[1].mesh == 1
+    assert gltf.meshes[1].primitives[0].attributes.POSITION == 1
+    assert gltf.meshes[1].primitives[0].material == 1
+    assert len(gltf.buffers) == 1
+    assert accessor_values(gltf, 0) == (1.0, 1.0, 1.0)
+    assert accessor_values(gltf, 1) == (2.0, 2.0, 2.0)
+
+
+def test_merge_accepts_a_generator():
+    gltf = make_piece(1.0)
+    assert gltf.merge(make_piece(value) for value in (2.0, 3.0))
+    assert len(gltf.nodes) == len(gltf.meshes) == len(gltf.accessors) == 3
+    assert accessor_values(gltf, 2) == (3.0, 3.0, 3.0)
+
+
+def test_merge_dedupe_materials():
+    gltf = make_piece(1.0)
+    assert gltf.merge([make_piece(2.0), make_piece(3.0, double_sided=True)], dedupe_materials=True)
+    # materials are compared without their names
+    assert [material.name for material in gltf.materials] == ["material 1.0", "material 3.0"]
+    assert [mesh.primitives[0].material for mesh in gltf.meshes] == [0, 0, 1]
@@ -0,0 +1,84 @@
+import pygltflib
+from pygltflib import (
+    GLTF2,
+    Accessor,
+    Attributes,
+    Buffer,
+    BufferView,
+    Mesh,
+    Node,
+    Primitive,
+    Scene,
+)
+
+
+def make_gltf(chunks):
+    # one FLOAT SCALAR accessor and bufferView for each chunk of bytes, laid out with a 4 byte gap between them
+    gltf = GLTF2()
+    blob = bytearray()
+    for chunk in chunks:
+        blob += bytes(4)
+        gltf.bufferViews.append(BufferView(buffer=0, byteOffset=len(blob), byteLength=len(chunk)))
+        gltf.accessors.append(Accessor(bufferView=len(gltf.bufferViews) - 1, componentType=pygltflib.FLOAT,
+                                       count=len(chunk) // 4, type=pygltflib.SCALAR))
+        blob += chunk
+    gltf.buffers.append(Buffer(byteLength=len(blob)))
+    gltf.set_binary_blob(bytes(blob))
+    return gltf
+
+
+def buffer_view_bytes(gltf, index):
+    buffer_view = gltf.bufferViews[index]
+    return bytes(gltf.binary_blob()[buffer_view.byteOffset:buffer_view.byteOffset + buffer_view.byteLength])
+
+
+def test_compact_binary_blob_removes_gaps():
+    gltf = make_gltf([b"abcdefgh", b"ijkl"])
+    assert gltf.compact_binary_blob() == 8
+    assert bytes(gltf.binary_blob()) == b"abcdefghijkl"
+    assert gltf.buffers[0].byteLength == 12
+    assert buffer_view_bytes(gltf, 0) == b"abcdefgh"
+    assert buffer_view_bytes(gltf, 1) == b"ijkl"
+
+
+def test_compact_binary_blob_keeps_alignment():
+    gltf = make_gltf([b"abcdefgh"])
+    gltf.bufferViews[0].byteOffset = 6  # not a multiple of 4, eg a bufferView of bytes
+    gltf.bufferViews[0].byteLength = 2
+    gltf.compact_binary_blob()
+    assert gltf.bufferViews[0].byteOffset % 4 == 2
+    assert buffer_view_bytes(gltf, 0) == b"cd"
+
+
+def test_compact_binary_blob_keeps_meshopt_ranges():
+    gltf = make_gltf([b"abcd"])
+    blob = bytes(gltf.binary_blob()) + bytes(8) + b"compressed!!"
+    gltf.set_binary_blob(blob)
+    gltf.buffers[0].byteLength = len(blob)
+    compression = {"buffer": 0, "byteOffset": 16, "byteLength": 12, "byteStride": 4, "count": 3,
+                   "mode": "ATTRIBUTES"}
+    gltf.bufferViews[0].extensions = {"EXT_meshopt_compression": compression}
+
+    assert gltf.compact_binary_blob() == 12
+    start = compression["byteOffset"]
+    assert bytes(gltf.binary_blob()[start:start + 12]) == b"compressed!!"
+    assert buffer_view_bytes(gltf, 0) == b"abcd"
+
+
+def test_prune_removes_unreachable_objects():
+    gltf = make_gltf([b"used", b"unused!!"])
+    gltf.meshes.append(Mesh(primitives=[Primitive(attributes=Attributes(POSITION=0))]))
+    gltf.meshes.append(Mesh(primitives=[Primitive(attributes=Attributes(POSITION=1))]))
+    gltf.nodes.append(Node(mesh=0))
+    gltf.nodes.append(Node(mesh=1))  # not in a scene
+    gltf.scenes.append(Scene(nodes=[0]))
+    gltf.scene = 0
+
+    report = gltf.prune()
+    assert report["nodes"] == 1
+    assert report["meshes"] == 1
+    assert report["accessors"] == 1
+    assert report["bufferViews"] == 1
+    assert len(gltf.accessors) == 1 and gltf.meshes[0].primitives[0].attributes.POSITION == 0
+    assert buffer_view_bytes(gltf, 0) == b"used"
+    assert gltf.buffers[0].byteLength == len(gltf.binary_blob()) == 4
@@ -0,0 +1,152 @@
+import pygltflib
+from pygltflib import (
+    GLTF2,
+    Accessor,
+    Attributes,
+    Buffer,
+    BufferView,
+    Image,
+    Mesh,
+    Node,
+    Primitive,
+    Scene,
+)
+from pygltflib.references import remap_references, references
+from pygltflib.utils import find_node_index_by_name, get_accessor_for_bufferview
+
+
+def make_gltf():
+    # node 0 (with children 1 and 2) and node 1 use mesh 0, whose accessors 0 and 1 share bufferView 0, and
+    # image 0 uses bufferView 1
+    return GLTF2(
+        scene=0,
+        scenes=[Scene(nodes=[0])],
+        nodes=[Node(name="root", mesh=0, children=[1, 2]), Node(name="child", mesh=0), Node(name="child")],
+        meshes=[Mesh(primitives=[Primitive(attributes=Attributes(POSITION=0, NORMAL=1))])],
+        accessors=[Accessor(bufferView=0, componentType=pygltflib.FLOAT, count=1, type=pygltflib.VEC3),
+                   Accessor(bufferView=0, byteOffset=12, componentType=pygltflib.FLOAT, count=1,
+                            type=pygltflib.VEC3)],
+        bufferViews=[BufferView(buffer=0, byteLength=24), BufferView(buffer=0, byteOffset=24, byteLength=4)],
+        images=[Image(bufferView=1, mimeType="image/png")],
+        buffers=[Buffer(byteLength=28)],
+    )
+
+
+def test_find():
+    gltf = make_gltf()
+    index = gltf.get_index()
+    assert index.find("nodes", "root") == 0
+    assert index.find("nodes", "child") == 1
+    assert index.find_all("nodes", "child") == [1, 2]
+    assert index.find("nodes", "missing") is None
+
+
+def test_find_picks_up_appended_and_replaced_arrays():
+    gltf = make_gltf()
+    index = gltf.get_index()
+    assert index.find("nodes", "new") is None
+    gltf.nodes.append(Node(name="new"))
+    assert index.find("nodes", "new") == 3
+    gltf.nodes = [Node(name="new")]
+    assert index.find("nodes", "new") == 0
+    assert index.find("nodes", "root") is None
+
+
+def test_find_after_rename():
+    gltf = make_gltf()
+    index = gltf.get_index()
+    assert index.find("nodes", "child") == 1
+    gltf.nodes[1].name = "renamed"
+    assert index.find("nodes", "renamed") == 1
+    assert index.find("nodes", "child") == 2
+    assert index.find_all("nodes", "child") == [2]
+    assert find_node_index_by_name(gltf, "renamed") == 1
+    gltf.nodes[2].name = "other"
+    assert find_node_index_by_name(gltf, "child") == -1
+
+
+def test_find_after_replacing_an_item():
+    gltf = make_gltf()
+    index = gltf.get_index()
+    assert index.find("nodes", "root") == 0
+    gltf.nodes[0] = Node(name="z")
+    assert index.find("nodes", "z") == 0
+    assert index.find("nodes", "root") is None
+    assert find_node_index_by_name(gltf, "z") == 0
+    assert find_node_index_by_name(gltf, "root") == -1
+
+
+def test_get_accessor_for_bufferview_after_edits(recwarn):
+    gltf = make_gltf()
+    assert get_accessor_for_bufferview(gltf, 0) is gltf.accessors[0]
+    gltf.accessors[0].bufferView = 1
+    assert get_accessor_for_bufferview(gltf, 0) is gltf.accessors[1]
+    gltf.accessors[1] = Accessor(bufferView=1, componentType=pygltflib.FLOAT, count=1, type=pygltflib.VEC3)
+    assert get_accessor_for_bufferview(gltf, 0) is None
+
+
+def test_find_after_invalidate():
+    gltf = make_gltf()
+    index = gltf.get_index()
+    assert index.find("nodes", "root") == 0
+    gltf.nodes[0].name = "renamed"
+    gltf.invalidate_index("nodes")
+    assert index.find("nodes", "renamed") == 0
+    assert index.find("nodes", "root") is None
+
+
+def test_referrers():
+    gltf = make_gltf()
+    index = gltf.get_index()
+    assert index.referrers("bufferViews", 0) == [("accessors", 0), ("accessors", 1)]
+    assert index.referrers("bufferViews", 1) == [("images", 0)]
+    assert index.referrers("meshes", 0) == [("nodes", 0), ("nodes", 1)]
+    assert index.referrers("nodes", 2) == [("nodes", 0)]
+    assert index.referrers("scenes", 0) == [(None, None)]
+    assert index.is_referenced("accessors", 1)
+    assert index.is_referenced("nodes", 0)  # by the scene
+    gltf.scenes[0].nodes = []
+    gltf.invalidate_index("scenes")
+    assert not index.is_referenced("nodes", 0)
+
+
+def test_references_to_can_be_set():
+    gltf = make_gltf()
+    for _, reference in gltf.get_index().references_to("accessors", 1):
+        reference.set(0)
+    assert gltf.meshes[0].primitives[0].attributes.NORMAL == 0
+
+
+def test_references():
+    gltf = make_gltf()
+    found = {(kind, referrer, reference.get()) for kind, referrer, reference in references(gltf)}
+    assert ("bufferViews", ("images", 0), 1) in found
+    assert ("nodes", ("nodes", 0), 2) in found
+    assert ("scenes", (None, None), 0) in found
+    assert {kind for kind, _, _ in references(gltf, "meshes")} == {"meshes"}
+
+
+def test_remap_references():
+    gltf = make_gltf()
+    remap_references(gltf, "nodes", [0, None, 1])
+    assert gltf.nodes[0].children == [1]
+    remap_references(gltf, "accessors", {0: 1, 1: 0})
+    assert (gltf.meshes[0].primitives[0].attributes.POSITION, gltf.meshes[0].primitives[0].attributes.NORMAL) == (1, 0)
+    remap_references(gltf, "bufferViews", [None, 0])
+    assert gltf.images[0].bufferView == 0
+    assert gltf.accessors[0].bufferView is None
+
+
+def test_remove_buffer_view_updates_index():
+    gltf = make_gltf()
+    gltf.bufferViews.insert(0, BufferView(buffer=0, byteLength=0))
+    for accessor in gltf.accessors:
+        accessor.bufferView += 1
+    gltf.images[0].bufferView += 1
+    index = gltf.get_index()
+    assert index.referrers("bufferViews", 2) == [("images", 0)]
+    gltf.remove_bufferView(0)
+    assert gltf.images[0].bufferView == 1
+    assert [accessor.bufferView for accessor in gltf.accessors] == [0, 0]
+    assert index.referrers("bufferViews", 1) == [("images", 0)]
+    assert index.referrers("bufferViews", 0) == [("accessors", 0), ("accessors", 1)]
@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from pygltflib import GLTF2, LazyList, Node, Scene
+from pygltflib.snapshot import SnapshotCache, set_snapshot_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SnapshotCache(tmp_path / "snapshots")
+    set_snapshot_cache(cache)
+    yield cache
+    set_snapshot_cache(None)
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    # the number of times json is decoded
+    calls = []
+    from_json = GLTF2.from_json.__func__
+
+    def counting_from_json(cls, *args, **kwargs):
+        calls.append(1)
+        return from_json(cls, *args, **kwargs)
+    monkeypatch.setattr(GLTF2, "from_json", classmethod(counting_from_json))
+    return calls
+
+
+def save_scene(path, names):
+    GLTF2(scene=0, scenes=[Scene(nodes=list(range(len(names))))], nodes=[Node(name=name) for name in names]).save(path)
+
+
+@pytest.mark.parametrize("suffix", [".gltf", ".glb"])
+def test_snapshot_is_used_for_unchanged_files(tmp_path, cache, decodes, suffix):
+    path = tmp_path / f"scene{suffix}"
+    save_scene(path, ["a", "b"])
+    first = GLTF2.load(path)
+    second = GLTF2.load(path)
+    assert len(decodes) == 1
+    assert second.to_json() == first.to_json()
+    assert cache.size() > 0
+
+
+def test_snapshot_is_invalidated_by_a_changed_file(tmp_path, cache, decodes):
+    path = tmp_path / "scene.gltf"
+    save_scene(path, ["a", "b"])
+    GLTF2.load(path)
+    save_scene(path, ["a", "c", "d"])
+    assert [node.name for node in GLTF2.load(path).nodes] == ["a", "c", "d"]
+    assert len(decodes) == 2
+
+
+def test_snapshot_is_invalidated_by_same_size_and_mtime(tmp_path, cache, decodes):
+    # only the hash of the json tells these apart
+    path = tmp_path / "scene.gltf"
+    save_scene(path, ["a", "b"])
+    stat = os.stat(path)
+    GLTF2.load(path)
+    save_scene(path, ["a", "c"])
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(path).st_size == stat.st_size
+    assert [node.name for node in GLTF2.load(path).nodes] == ["a", "c"]
+    assert len(decodes) == 2
+
+
+def test_snapshot_is_kept_per_load_option(tmp_path, cache, decodes):
+    path = tmp_path / "scene.gltf"
+    save_scene(path, ["a", "b"])
+    GLTF2.load(path)
+    lazy = GLTF2.load(path, lazy=True)
+    assert len(decodes) == 2
+    lazy = GLTF2.load(path, lazy=True)
+    assert len(decodes) == 2
+    assert isinstance(lazy.nodes, LazyList)
+    assert lazy.nodes[1].name == "b"
+
+
+def test_unreadable_snapshot_is_dropped(tmp_path, cache, decodes):
+    path = tmp_path / "scene.gltf"
+    save_scene(path, ["a", "b"])
+    GLTF2.load(path)
+    snapshot_path = cache.snapshot_path(path)
+    snapshot_path.write_bytes(snapshot_path.read_bytes()[:-10])
+    with pytest.warns(UserWarning, match="unreadable snapshot"):
+        assert [node.name for node in GLTF2.load(path).nodes] == ["a", "b"]
+    assert len(decodes) == 2
+    assert snapshot_path.is_file()  # written again
+
+
+def test_evict_removes_least_recently_used(tmp_path, cache):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"scene{i}.gltf"
+        save_scene(path, ["a"])
+        GLTF2.load(path)
+        os.utime(cache.snapshot_path(path), ns=(i, i))
+        paths.append(path)
+    cache.max_bytes = cache.size() - 1
+    cache.evict()
+    assert not cache.snapshot_path(paths[0]).is_file()
+    assert cache.snapshot_path(paths[2]).is_file()
+    cache.clear()
+    assert cache.size() == 0
@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import numpy as np
+
+import pygltflib
+from pygltflib import GLTF2, Scene
+from pygltflib.arrays import accessor_array
+from pygltflib.utils import add_indexed_geometry
+
+
+def test_add_indexed_geometry():
+    gltf = GLTF2(scenes=[Scene()])
+    vertices = [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (1.0, 1.0, 2.0)]
+    assert add_indexed_geometry(gltf, [(0, 1, 2), (2, 1, 3)], vertices)
+
+    primitive = gltf.meshes[0].primitives[0]
+    assert gltf.scenes[0].nodes == [0] and gltf.nodes[0].mesh == 0
+    assert accessor_array(gltf, primitive.indices).tolist() == [0, 1, 2, 2, 1, 3]
+    assert accessor_array(gltf, primitive.attributes.POSITION).tolist() == [list(v) for v in vertices]
+    position = gltf.accessors[primitive.attributes.POSITION]
+    assert position.min == [0.0, 0.0, 0.0] and position.max == [1.0, 1.0, 2.0]
+    assert gltf.bufferViews[position.bufferView].byteOffset % 4 == 0
+
+
+def test_add_indexed_geometry_uses_unsigned_int_for_large_indices():
+    gltf = GLTF2(scenes=[Scene()])
+    vertices = np.zeros((70000, 3)).tolist()
+    add_indexed_geometry(gltf, [(0, 1, 69999)], vertices)
+    indices = gltf.accessors[gltf.meshes[0].primitives[0].indices]
+    assert indices.componentType == pygltflib.UNSIGNED_INT
+    assert accessor_array(gltf, gltf.meshes[0].primitives[0].indices).tolist() == [0, 1, 69999]
+
+
+def test_add_indexed_geometry_does_not_need_numpy():
+    script = """
+import sys
+sys.modules["numpy"] = None  # any import of numpy fails
+import pygltflib
+from pygltflib.utils import add_indexed_geometry
+gltf = pygltflib.GLTF2(scenes=[pygltflib.Scene()])
+add_indexed_geometry(gltf, [(0, 1, 2)], [(0, 0, 0), (1, 0, 0), (0, 1, 0)])
+gltf.to_json()
+"""
+    root = pygltflib.__file__.rsplit("/pygltflib/", 1)[0]
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=root)
@@ -0,0 +1,31 @@
+import pytest
+
+import pygltflib
+from pygltflib import GLTF2, Accessor, Buffer, BufferView
+from pygltflib.validator import InvalidAcccessorComponentTypeException, InvalidByteRange, validate
+
+pytestmark = pytest.mark.filterwarnings("ignore:pygltf.utils.validator")
+
+
+def make_accessor(**kwargs):
+    return Accessor(**{"componentType": pygltflib.FLOAT, "count": 1, "type": pygltflib.SCALAR, **kwargs})
+
+
+def test_validate_reports_errors_after_an_unexpected_exception():
+    # accessor 0's max is not a list, the check goes on to accessor 1
+    gltf = GLTF2(accessors=[make_accessor(max=5), make_accessor(componentType=1)])
+    errors = validate(gltf, warning=True)
+    assert [type(error) for error in errors] == [TypeError, InvalidAcccessorComponentTypeException]
+
+
+def test_validate_data_reports_errors_after_an_unexpected_exception():
+    pytest.importorskip("numpy")
+    gltf = GLTF2(bufferViews=[BufferView(buffer=0, byteLength=None), BufferView(buffer=0, byteLength=8)],
+                 buffers=[Buffer(byteLength=4)])
+    errors = validate(gltf, warning=True, data=True)
+    assert [type(error) for error in errors] == [TypeError, InvalidByteRange]
+
+
+def test_validate_raises_an_unexpected_exception():
+    with pytest.raises(TypeError):
+        validate(GLTF2(accessors=[make_accessor(max=5)]))